@@ -1,10 +1,14 @@
 import streamlit as st
+import io
 import json
-import plotly.io as pio
+import pandas as pd
 import uuid
 import os
 from langchain_core.messages import HumanMessage
-from main import create_workflow
+from main import get_workflow
+from src.utils.artifacts import parse_visualization
+from src.utils.streaming import stream_events
+from src.utils.tracing import get_tracer
 
 # Page Config
 st.set_page_config(
@@ -19,8 +23,9 @@ def get_graph():
     """
     Initialize and cache the LangGraph workflow.
     This prevents reloading the heavy agent logic on every interaction.
+    Repeated questions are answered from the answer cache.
     """
-    return create_workflow()
+    return get_workflow()
 
 
 # Initialize graph
@@ -57,9 +62,86 @@ with st.sidebar:
         st.session_state["thread_id"] = str(uuid.uuid4())
         st.rerun()
 
+    # Responsiveness of the last query
+    timings = st.session_state.get("last_timings")
+    if timings:
+        st.markdown("---")
+        st.caption("Last query")
+        st.metric("Time to first feedback", f"{timings['first_feedback']:.2f}s")
+        st.metric("Total time", f"{timings['total']:.1f}s")
+
+    # Where the last query of this conversation spent its time
+    breakdown = get_tracer().breakdown(st.session_state["thread_id"])
+    if breakdown:
+        st.caption("Latency breakdown")
+        st.dataframe(
+            pd.DataFrame(breakdown)
+            .reindex(
+                columns=["kind", "name", "calls", "total_ms", "rows", "tokens_in"]
+            )
+            .round(1),
+            hide_index=True,
+            use_container_width=True,
+        )
+        spans = io.StringIO()
+        get_tracer().export_jsonl(spans, st.session_state["thread_id"])
+        st.download_button(
+            "Export spans (JSONL)",
+            data=spans.getvalue(),
+            file_name="spans.jsonl",
+        )
+        st.download_button(
+            "Export metrics (Prometheus)",
+            data=get_tracer().prometheus(),
+            file_name="metrics.prom",
+        )
+
     st.markdown("---")
     st.caption(f"Thread ID:\n{st.session_state['thread_id']}")
 
+# --- Rendering Helpers ---
+
+
+def render_visualization(viz, key: str):
+    """Render a saved image, a Plotly figure or a table artifact."""
+    kind, value = parse_visualization(viz)
+    if kind == "image":
+        if os.path.exists(value):
+            st.image(value, caption="Analysis Visualization")
+            with open(value, "rb") as file:
+                st.download_button(
+                    label="Download Plot",
+                    data=file,
+                    file_name=os.path.basename(value),
+                    key=key,
+                )
+        else:
+            st.warning(f"Image generated but file not found: {value}")
+    elif kind == "table":
+        st.dataframe(
+            pd.DataFrame(value["data"], columns=value["columns"]),
+            use_container_width=True,
+        )
+    else:
+        # Plotly is only imported once a chart has to be drawn
+        import plotly.io as pio
+
+        fig = pio.from_json(value)
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def render_tool_call(status, call: dict):
+    """Show a tool call (SQL or Python code) in the progress panel."""
+    args = call.get("args", {}) or {}
+    status.markdown(f"🛠️ `{call.get('name', 'tool')}`")
+    if "query" in args:
+        status.code(args["query"], language="sql")
+    elif "code" in args:
+        status.code(args["code"], language="python")
+    else:
+        status.code(json.dumps(args, indent=2, default=str), language="json")
+
+
 # --- Main Chat Area ---
 
 st.title("Agentic Data Analyst 🤖")
@@ -85,26 +167,7 @@ for msg in st.session_state["messages"]:
         if "visualizations" in msg and msg["visualizations"]:
             for viz in msg["visualizations"]:
                 try:
-                    # Check if it's a file path (static image)
-                    if isinstance(viz, str) and viz.strip().endswith(".png"):
-                        import os
-
-                        if os.path.exists(viz):
-                            st.image(viz, caption="Analysis Visualization")
-                            with open(viz, "rb") as file:
-                                st.download_button(
-                                    label="Download Plot",
-                                    data=file,
-                                    file_name=os.path.basename(viz),
-                                    mime="image/png",
-                                    key=f"history_dl_{viz}",
-                                )
-                        else:
-                            st.warning(f"Image generated but file not found: {viz}")
-                    else:
-                        # Fallback for old Plotly JSON
-                        fig = pio.from_json(viz)
-                        st.plotly_chart(fig, use_container_width=True)
+                    render_visualization(viz, key=f"history_dl_{viz}")
                 except Exception as e:
                     # Silent fail or small warning for history
                     st.caption(f"Cannot render chart: {e}")
@@ -119,66 +182,81 @@ if user_input := st.chat_input("Ask about your data..."):
     # Append to state
     st.session_state["messages"].append({"role": "user", "content": user_input})
 
-    # 2. Processing
-    response = None
-    with st.spinner("Analyzing data..."):
+    # 2. Processing: stream routing, tool calls, tokens and plots as they happen
+    ai_content = "No response generated."
+    visualizations = []
+    answered = False
+    first_feedback = None
+    elapsed = 0.0
+
+    with st.chat_message("assistant"):
+        status = st.status("Analyzing data...", expanded=True)
+        answer_box = st.empty()
+        plots_box = st.container()
+        step_text = ""
+
         try:
             # Config for LangGraph to track state
             config = {"configurable": {"thread_id": st.session_state["thread_id"]}}
 
-            # Invoke Graph
-            response = graph.invoke(
-                {"messages": [HumanMessage(content=user_input)]}, config=config
+            for event in stream_events(
+                graph, {"messages": [HumanMessage(content=user_input)]}, config
+            ):
+                elapsed = event.elapsed
+                if first_feedback is None:
+                    first_feedback = event.elapsed
+                    status.update(
+                        label=f"Analyzing data... (first update in {first_feedback:.2f}s)"
+                    )
+
+                if event.kind == "route":
+                    status.markdown(f"🧭 {event.data}")
+                elif event.kind == "token":
+                    step_text += event.data
+                    answer_box.markdown(step_text + "▌")
+                elif event.kind == "tool_call":
+                    # Text streamed before a tool call is the agent's reasoning
+                    if step_text:
+                        status.markdown(step_text)
+                        step_text = ""
+                        answer_box.empty()
+                    render_tool_call(status, event.data)
+                elif event.kind == "tool_result":
+                    result = event.data["content"]
+                    status.caption(result[:500] + ("..." if len(result) > 500 else ""))
+                elif event.kind == "plot":
+                    with plots_box:
+                        try:
+                            render_visualization(
+                                event.data, key=f"live_dl_{event.data}"
+                            )
+                        except Exception as e:
+                            st.error(f"Error rendering visualization: {e}")
+                elif event.kind == "answer":
+                    answered = True
+                    ai_content = event.data["content"] or ai_content
+                    visualizations = list(event.data["visualizations"])
+                    answer_box.markdown(ai_content)
+
+            status.update(
+                label=f"Done in {elapsed:.1f}s", state="complete", expanded=False
             )
         except Exception as e:
+            status.update(label="Analysis failed", state="error")
             st.error(f"Analysis Failed: {e}")
             print(f"Error during graph invocation: {e}")
 
-    # 3. Response Handling (Outside Spinner)
-    if response:
-        messages = response.get("messages", [])
-        visualizations = response.get("visualizations", [])
+        if not answered:
+            answer_box.markdown(step_text or ai_content)
 
-        # Find the last AI message
-        ai_content = "No response generated."
-
-        # Search backwards for the last AIMessage
-        for msg in reversed(messages):
-            if msg.type == "ai":
-                ai_content = msg.content
-                break
-
-        # Display AI Message
-        with st.chat_message("assistant"):
-            st.markdown(ai_content)
-
-        if visualizations:
-            for viz in visualizations:
-                try:
-                    # Check if it's a file path (static image)
-                    if isinstance(viz, str) and viz.strip().endswith(".png"):
-                        import os
-
-                        if os.path.exists(viz):
-                            st.image(viz, caption="Analysis Visualization")
-                            with open(viz, "rb") as file:
-                                st.download_button(
-                                    label="Download Plot",
-                                    data=file,
-                                    file_name=os.path.basename(viz),
-                                    mime="image/png",
-                                    key=f"live_dl_{viz}",
-                                )
-                        else:
-                            st.warning(f"Image generated but file not found: {viz}")
-                    else:
-                        # Fallback for old Plotly JSON
-                        fig = pio.from_json(viz)
-                        st.plotly_chart(fig, use_container_width=True)
-                except Exception as e:
-                    st.error(f"Error rendering visualization: {e}")
+    if first_feedback is not None:
+        st.session_state["last_timings"] = {
+            "first_feedback": first_feedback,
+            "total": elapsed,
+        }
 
-        # Append AI response to state for history with visualizations
+    # 3. Append AI response to state for history with visualizations
+    if answered:
         st.session_state["messages"].append(
             {
                 "role": "assistant",
@@ -0,0 +1,239 @@
+"""
+Startup benchmark of the agent system.
+Breaks down `import main` with -X importtime and times the first request
+(workflow construction plus one scripted question, no Gemini calls). Exits
+non-zero when a budget is exceeded or a deferred module is imported eagerly.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_startup --repeat 5 --import-budget-ms 1500
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_WORKDIR = Path(tempfile.gettempdir()) / "ecommerce-startup-bench"
+RESULT_PREFIX = "RESULT "
+
+# Budgets (milliseconds, medians over the repeats; override via environment)
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "2000"))
+FIRST_REQUEST_BUDGET_MS = float(os.getenv("STARTUP_FIRST_REQUEST_BUDGET_MS", "4000"))
+
+# Modules that must only be imported on first use, never by `import main`
+DEFERRED_MODULES = [
+    "dotenv",
+    "sqlalchemy",
+    "langchain_google_genai",
+    "langchain_experimental",
+    "pandas",
+    "numpy",
+    "plotly",
+    "matplotlib",
+    "scipy",
+    "sklearn",
+]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[int, int, int, str]]:
+    """
+    Parse -X importtime output.
+
+    Returns:
+        (depth, self_us, cumulative_us, module) per imported module
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((depth, int(self_us), int(cumulative_us), name.strip()))
+    return entries
+
+
+def measure_import(workdir: Path) -> Dict[str, Any]:
+    """Import `main` in a fresh interpreter and break the time down."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=workdir,
+        env=_child_env(),
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        print(completed.stderr[-4000:], file=sys.stderr)
+        raise SystemExit("`import main` failed")
+    entries = parse_importtime(completed.stderr)
+    total_us = next(cum for _, _, cum, name in entries if name == "main")
+    packages: Counter = Counter()
+    for _, self_us, _, name in entries:
+        packages[name.split(".")[0]] += self_us
+    return {
+        "total_ms": total_us / 1000,
+        "modules": len(entries),
+        "packages_ms": {name: us / 1000 for name, us in packages.most_common()},
+        "src_ms": {
+            name: cum / 1000
+            for _, _, cum, name in entries
+            if name == "src" or name.startswith("src.")
+        },
+        "eager": sorted(
+            {
+                name.split(".")[0]
+                for _, _, _, name in entries
+                if name.split(".")[0] in DEFERRED_MODULES
+            }
+        ),
+    }
+
+
+def run_first_request() -> Dict[str, Any]:
+    """Child: import, build the workflow and answer one scripted question."""
+    started = time.perf_counter()
+    from langchain_core.messages import HumanMessage
+
+    import main
+
+    imported = time.perf_counter()
+    from benchmarks.fake_llm import SCENARIOS, scripted_llm_factory
+    from src.utils.llm_config import set_llm_factory
+
+    set_llm_factory(scripted_llm_factory(SCENARIOS))
+    scenario = next(s for s in SCENARIOS if s.name == "general_top_products")
+    graph = main.get_workflow()
+    built = time.perf_counter()
+    graph.invoke(
+        {"messages": [HumanMessage(scenario.question)]},
+        {"configurable": {"thread_id": "startup-bench"}},
+        bypass_cache=True,
+    )
+    answered = time.perf_counter()
+    return {
+        "import_ms": (imported - started) * 1000,
+        "build_ms": (built - imported) * 1000,
+        "request_ms": (answered - built) * 1000,
+        "first_request_ms": (answered - started) * 1000,
+    }
+
+
+def measure_first_request(workdir: Path) -> Dict[str, Any]:
+    """Run the first-request child in a fresh interpreter."""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+        cwd=workdir,
+        env=_child_env(),
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    lines = [
+        line for line in completed.stdout.splitlines() if line.startswith(RESULT_PREFIX)
+    ]
+    if completed.returncode != 0 or not lines:
+        print(completed.stderr[-4000:], file=sys.stderr)
+        raise SystemExit("First request failed")
+    return {**json.loads(lines[-1][len(RESULT_PREFIX) :]), "process_ms": wall_ms}
+
+
+def _child_env() -> Dict[str, str]:
+    env = {**os.environ, "PYTHONPATH": str(REPO_ROOT)}
+    env.setdefault("GEMINI_API_KEY", "offline-benchmark")
+    # Every process must pay the full cold start
+    env.setdefault("LLM_CACHE_MODE", "off")
+    env.setdefault("ANSWER_CACHE_ENABLED", "0")
+    env.setdefault("PYTHON_WORKERS", "0")
+    return env
+
+
+def prepare_workdir(workdir: Path) -> Path:
+    """Copy the shipped database so runs never touch the repository's copy."""
+    workdir.mkdir(parents=True, exist_ok=True)
+    target = workdir / "ecommerce.db"
+    if not target.exists():
+        shutil.copy(REPO_ROOT / "ecommerce.db", target)
+    return workdir
+
+
+def print_report(imports: List[Dict[str, Any]], requests: List[Dict[str, Any]]):
+    median_import = statistics.median(run["total_ms"] for run in imports)
+    sample = min(imports, key=lambda run: abs(run["total_ms"] - median_import))
+    print(
+        f"\n`import main`: {median_import:.0f} ms median, {sample['modules']} modules"
+    )
+    print(f"  {'package':<28}{'self ms':>10}")
+    for name, ms in list(sample["packages_ms"].items())[:12]:
+        print(f"  {name:<28}{ms:>10.1f}")
+    print(f"  {'src modules (cumulative)':<28}")
+    top_src = sorted(sample["src_ms"].items(), key=lambda item: -item[1])[:8]
+    for name, ms in top_src:
+        print(f"    {name:<26}{ms:>10.1f}")
+    print("\nFirst request (median ms):")
+    for field in ("import_ms", "build_ms", "request_ms", "first_request_ms"):
+        value = statistics.median(run[field] for run in requests)
+        print(f"  {field[:-3]:<28}{value:>10.1f}")
+    process = statistics.median(run["process_ms"] for run in requests)
+    print(f"  {'process (incl. interpreter)':<28}{process:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument(
+        "--first-request-budget-ms", type=float, default=FIRST_REQUEST_BUDGET_MS
+    )
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR)
+    parser.add_argument("--json", type=Path, help="Also write results to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, str(REPO_ROOT))
+        print(RESULT_PREFIX + json.dumps(run_first_request()), flush=True)
+        return
+
+    workdir = prepare_workdir(args.workdir)
+    imports = [measure_import(workdir) for _ in range(args.repeat)]
+    requests = [measure_first_request(workdir) for _ in range(args.repeat)]
+    print_report(imports, requests)
+
+    failures = []
+    import_ms = statistics.median(run["total_ms"] for run in imports)
+    if import_ms > args.import_budget_ms:
+        failures.append(
+            f"import main took {import_ms:.0f} ms "
+            f"(budget {args.import_budget_ms:.0f} ms)"
+        )
+    first_ms = statistics.median(run["first_request_ms"] for run in requests)
+    if first_ms > args.first_request_budget_ms:
+        failures.append(
+            f"first request took {first_ms:.0f} ms "
+            f"(budget {args.first_request_budget_ms:.0f} ms)"
+        )
+    eager = sorted({name for run in imports for name in run["eager"]})
+    if eager:
+        failures.append(f"imported eagerly by `import main`: {', '.join(eager)}")
+
+    if args.json:
+        args.json.write_text(
+            json.dumps({"imports": imports, "requests": requests}, indent=2)
+        )
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        raise SystemExit(1)
+    print("\nWithin budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""
+Offline end-to-end latency benchmark of the agent workflow.
+Drives create_workflow() with the scripted chat model (no Gemini calls) over
+databases of several sizes and concurrency levels, and reports p50/p95
+latency and peak traced memory per node, per tool and per question.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_workflow --scales 1,10,100 --concurrency 1,4
+"""
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from uuid import UUID
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_WORKDIR = Path(tempfile.gettempdir()) / "ecommerce-bench"
+RESULT_PREFIX = "RESULT "
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class _Frame:
+    __slots__ = ("label", "start", "start_mem", "peak")
+
+    def __init__(self, label: str, start_mem: int):
+        self.label = label
+        self.start = time.perf_counter()
+        self.start_mem = start_mem
+        self.peak = start_mem
+
+
+def _make_recorder():
+    """Build the callback handler (imported lazily: env must be set first)."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class Recorder(BaseCallbackHandler):
+        """
+        Times graph nodes and tools through LangChain callbacks.
+
+        Node runs are labelled with their enclosing node ("AB_Agent/tools").
+        With trace_memory, every start/end folds the tracemalloc peak into
+        all open runs before resetting it, so nested runs each get their own
+        peak (meaningful for sequential runs only).
+        """
+
+        run_inline = True
+
+        def __init__(self):
+            self.trace_memory = False
+            self.samples: Dict[str, List[float]] = {}
+            self.peaks: Dict[str, int] = {}
+            self._open: Dict[UUID, _Frame] = {}
+            self._parents: Dict[UUID, Optional[UUID]] = {}
+            self._lock = threading.Lock()
+
+        def _touch(self) -> None:
+            _, peak = tracemalloc.get_traced_memory()
+            for frame in self._open.values():
+                frame.peak = max(frame.peak, peak)
+            tracemalloc.reset_peak()
+
+        def _label_of(self, run_id: Optional[UUID]) -> Optional[str]:
+            while run_id is not None:
+                frame = self._open.get(run_id)
+                if frame is not None and frame.label.startswith("node:"):
+                    return frame.label[len("node:") :]
+                run_id = self._parents.get(run_id)
+            return None
+
+        def _start(self, run_id: UUID, parent: Optional[UUID], label: str) -> None:
+            with self._lock:
+                self._parents[run_id] = parent
+                if label.startswith("node:"):
+                    outer = self._label_of(parent)
+                    if outer:
+                        label = f"node:{outer}/{label[len('node:'):]}"
+                current = 0
+                if self.trace_memory:
+                    self._touch()
+                    current = tracemalloc.get_traced_memory()[0]
+                self._open[run_id] = _Frame(label, current)
+
+        def _end(self, run_id: UUID) -> None:
+            with self._lock:
+                self._parents.pop(run_id, None)
+                if self.trace_memory:
+                    self._touch()
+                frame = self._open.pop(run_id, None)
+                if frame is None:
+                    return
+                if self.trace_memory:
+                    used = frame.peak - frame.start_mem
+                    self.peaks[frame.label] = max(self.peaks.get(frame.label, 0), used)
+                else:
+                    elapsed = time.perf_counter() - frame.start
+                    self.samples.setdefault(frame.label, []).append(elapsed)
+
+        def add(self, label: str, seconds: float) -> None:
+            with self._lock:
+                self.samples.setdefault(label, []).append(seconds)
+
+        def on_chain_start(
+            self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs
+        ):
+            node = (kwargs.get("metadata") or {}).get("langgraph_node")
+            if node and kwargs.get("name") == node:
+                self._start(run_id, parent_run_id, f"node:{node}")
+            else:
+                with self._lock:
+                    self._parents[run_id] = parent_run_id
+
+        def on_chain_end(self, outputs, *, run_id, **kwargs):
+            self._end(run_id)
+
+        def on_chain_error(self, error, *, run_id, **kwargs):
+            self._end(run_id)
+
+        def on_tool_start(
+            self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs
+        ):
+            name = kwargs.get("name") or (serialized or {}).get("name", "tool")
+            self._start(run_id, parent_run_id, f"tool:{name}")
+
+        def on_tool_end(self, output, *, run_id, **kwargs):
+            self._end(run_id)
+
+        def on_tool_error(self, error, *, run_id, **kwargs):
+            self._end(run_id)
+
+    return Recorder()
+
+
+def _configure_env(inprocess_python: bool) -> None:
+    """Settings applied before the workflow modules are imported."""
+    os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+    # Measure the queries themselves, not the result cache
+    os.environ.setdefault("SQL_CACHE_ENABLED", "0")
+    os.environ.setdefault("CHECKPOINT_DB_PATH", "checkpoints.db")
+    os.environ.setdefault("ROUTING_LOG_PATH", "routing_decisions.jsonl")
+    if inprocess_python:
+        # python_tool runs in this process, so its memory is traced too
+        os.environ["PYTHON_WORKERS"] = "0"
+
+
+def run_levels(levels: List[int], iterations: int) -> List[Dict[str, Any]]:
+    """
+    Benchmark the workflow in the current directory's ecommerce.db.
+
+    Args:
+        levels: Concurrency levels (parallel conversations)
+        iterations: Rounds of all scenarios per level
+
+    Returns:
+        One result dict per level with per-label statistics
+    """
+    from langchain_core.messages import HumanMessage
+
+    from benchmarks.fake_llm import SCENARIOS, scripted_llm_factory
+    from src.utils.llm_config import set_llm_factory
+
+    set_llm_factory(scripted_llm_factory(SCENARIOS))
+    from main import create_workflow
+
+    started = time.perf_counter()
+    graph = create_workflow()
+    build_seconds = time.perf_counter() - started
+
+    by_name = {scenario.name: scenario for scenario in SCENARIOS}
+
+    def ask(recorder, thread_id: str, scenario) -> bool:
+        config = {
+            "configurable": {"thread_id": thread_id},
+            "callbacks": [recorder],
+        }
+        started = time.perf_counter()
+        result = graph.invoke({"messages": [HumanMessage(scenario.question)]}, config)
+        if not recorder.trace_memory:
+            recorder.add(f"query:{scenario.name}", time.perf_counter() - started)
+        content = result["messages"][-1].content
+        if scenario.parallel:
+            # Merged answer: one section per branch
+            return all(by_name[name].answer in content for name in scenario.parallel)
+        return content == scenario.answer
+
+    # Warm-up: kernel start, imports, catalog and plan caches
+    warm = _make_recorder()
+    for scenario in SCENARIOS:
+        ask(warm, f"warmup-{scenario.name}", scenario)
+
+    results = []
+    for level in levels:
+        recorder = _make_recorder()
+        jobs = [
+            (f"c{level}-i{i}-{scenario.name}", scenario)
+            for i in range(iterations)
+            for scenario in SCENARIOS
+        ]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as pool:
+            ok = list(pool.map(lambda job: ask(recorder, *job), jobs))
+        wall = time.perf_counter() - started
+
+        if level == 1:
+            # Separate traced pass: tracemalloc overhead would skew latency
+            recorder.trace_memory = True
+            tracemalloc.start()
+            try:
+                for scenario in SCENARIOS:
+                    ask(recorder, f"mem-{scenario.name}", scenario)
+            finally:
+                tracemalloc.stop()
+
+        stats = {
+            label: {
+                "n": len(values),
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "peak_kib": (
+                    recorder.peaks[label] / 1024 if label in recorder.peaks else None
+                ),
+            }
+            for label, values in sorted(recorder.samples.items())
+        }
+        results.append(
+            {
+                "concurrency": level,
+                "queries": len(jobs),
+                "errors": ok.count(False),
+                "wall_s": wall,
+                "qps": len(jobs) / wall if wall else 0.0,
+                "build_s": build_seconds,
+                "stats": stats,
+            }
+        )
+    return results
+
+
+def prepare_database(workdir: Path, scale: int, rebuild: bool = False) -> Path:
+    """Seed (once) a database of the given scale; returns its directory."""
+    directory = workdir / f"scale_{scale}"
+    db = directory / "ecommerce.db"
+    if rebuild or not db.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        if db.exists():
+            db.unlink()
+        print(f"Seeding scale {scale} into {db} ...", flush=True)
+        subprocess.run(
+            [
+                sys.executable,
+                str(REPO_ROOT / "seed_data.py"),
+                "--db",
+                str(db),
+                "--scale",
+                str(scale),
+            ],
+            cwd=directory,
+            env={**os.environ, "PYTHONPATH": str(REPO_ROOT)},
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+    return directory
+
+
+def print_report(scale: int, rows: Dict[str, int], results: List[Dict[str, Any]]):
+    """Print one table per concurrency level."""
+    sizes = ", ".join(f"{name}={count:,}" for name, count in rows.items())
+    print(f"\n=== scale {scale} ({sizes})")
+    for level in results:
+        print(
+            f"\n-- concurrency {level['concurrency']}: {level['queries']} queries, "
+            f"{level['qps']:.2f} q/s, {level['errors']} unexpected answers, "
+            f"workflow build {level['build_s']:.2f}s"
+        )
+        print(f"{'component':<42}{'n':>5}{'p50 ms':>11}{'p95 ms':>11}{'peak KiB':>11}")
+        for label, stat in level["stats"].items():
+            peak = f"{stat['peak_kib']:.0f}" if stat["peak_kib"] is not None else "-"
+            print(
+                f"{label:<42}{stat['n']:>5}{stat['p50_ms']:>11.1f}"
+                f"{stat['p95_ms']:>11.1f}{peak:>11}"
+            )
+
+
+def _row_counts(db: Path) -> Dict[str, int]:
+    import sqlite3
+
+    conn = sqlite3.connect(db)
+    try:
+        return {
+            table: conn.execute(f"SELECT MAX(rowid) FROM {table}").fetchone()[0] or 0
+            for table in ("website_sessions", "orders", "order_items")
+        }
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", default="1,10", help="Dataset scale factors")
+    parser.add_argument("--concurrency", default="1,4", help="Concurrency levels")
+    parser.add_argument("--iterations", type=int, default=3, help="Rounds per level")
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR)
+    parser.add_argument("--rebuild", action="store_true", help="Reseed databases")
+    parser.add_argument(
+        "--inprocess-python",
+        action="store_true",
+        help="Run python_tool in-process so its memory is included",
+    )
+    parser.add_argument("--json", type=Path, help="Also write results to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    if args.child:
+        # One process per dataset: fresh caches, engines and memory baseline
+        _configure_env(args.inprocess_python)
+        sys.path.insert(0, str(REPO_ROOT))
+        results = run_levels(levels, args.iterations)
+        print(RESULT_PREFIX + json.dumps(results), flush=True)
+        return
+
+    report = []
+    for scale in [int(scale) for scale in args.scales.split(",")]:
+        directory = prepare_database(args.workdir, scale, args.rebuild)
+        command = [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_workflow",
+            "--child",
+            "--concurrency",
+            args.concurrency,
+            "--iterations",
+            str(args.iterations),
+        ]
+        if args.inprocess_python:
+            command.append("--inprocess-python")
+        completed = subprocess.run(
+            command,
+            cwd=directory,
+            env={**os.environ, "PYTHONPATH": str(REPO_ROOT)},
+            capture_output=True,
+            text=True,
+        )
+        lines = [
+            line
+            for line in completed.stdout.splitlines()
+            if line.startswith(RESULT_PREFIX)
+        ]
+        if completed.returncode != 0 or not lines:
+            print(completed.stderr[-4000:], file=sys.stderr)
+            raise SystemExit(f"Benchmark failed for scale {scale}")
+        results = json.loads(lines[-1][len(RESULT_PREFIX) :])
+        rows = _row_counts(directory / "ecommerce.db")
+        print_report(scale, rows, results)
+        report.append({"scale": scale, "rows": rows, "levels": results})
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
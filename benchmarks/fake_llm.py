@@ -0,0 +1,290 @@
+"""
+Scripted chat model for offline benchmarks.
+Replays the supervisor's routing decision and each agent's tool-call sequence
+for a fixed set of representative questions, so the workflow runs end to end
+without Gemini calls.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.agents.merge import BRANCH_TASK_PREFIX
+
+_FRAME_RE = re.compile(r"frame '(df_\d+)'")
+
+
+@dataclass
+class Scenario:
+    """
+    One benchmark question and the model turns that answer it.
+
+    Attributes:
+        name: Short label used in reports
+        question: User message sent to the workflow
+        agent: Agent the supervisor routes to
+        steps: Tool calls, one model turn each ({"name", "args"}); "{frame}"
+            in string arguments is replaced by the last frame handle returned
+        answer: Final answer of the agent
+        parallel: Names of scenarios dispatched together as one compound
+            question (their questions become the branches' sub-tasks)
+    """
+
+    name: str
+    question: str
+    agent: str
+    steps: List[Dict[str, Any]] = field(default_factory=list)
+    answer: str = "Analysis complete."
+    parallel: List[str] = field(default_factory=list)
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario(
+        name="ab_test",
+        question="Compare the conversion rates of Ad_V1 and Ad_V2. Is the "
+        "difference significant?",
+        agent="AB_Agent",
+        steps=[
+            {
+                "name": "sql_tool",
+                "args": {
+                    "query": "SELECT ws.utm_campaign, "
+                    "COUNT(DISTINCT ws.session_id) AS sessions, "
+                    "COUNT(DISTINCT o.order_id) AS conversions "
+                    "FROM website_sessions ws "
+                    "LEFT JOIN orders o ON ws.user_id = o.user_id "
+                    "WHERE ws.utm_campaign IN ('Ad_V1', 'Ad_V2') "
+                    "GROUP BY ws.utm_campaign",
+                    "keep_frame": True,
+                },
+            },
+            {
+                "name": "python_tool",
+                "args": {
+                    "code": "from scipy.stats import chi2_contingency\n"
+                    "df = load_frame('{frame}')\n"
+                    "table = [[r.conversions, r.sessions - r.conversions] "
+                    "for r in df.itertuples()]\n"
+                    "chi2, p, _, _ = chi2_contingency(table)\n"
+                    "df['cr'] = df.conversions / df.sessions\n"
+                    "print(df)\n"
+                    "print(f'p-value: {p:.4g}')"
+                },
+            },
+        ],
+        answer="Ad_V2 converts better than Ad_V1 and the difference is "
+        "statistically significant (p < 0.05).",
+    ),
+    Scenario(
+        name="segmentation",
+        question="Segment our customers with RFM and K-Means clustering.",
+        agent="Segmentation_Agent",
+        steps=[
+            {
+                "name": "sql_tool",
+                "args": {
+                    "query": "SELECT o.user_id, "
+                    "julianday('2024-07-01') - julianday(MAX(o.created_at)) "
+                    "AS recency_days, COUNT(*) AS frequency, "
+                    "SUM(o.price_usd) AS monetary_value "
+                    "FROM orders o GROUP BY o.user_id",
+                    "keep_frame": True,
+                },
+            },
+            {
+                "name": "python_tool",
+                "args": {
+                    "code": "import matplotlib\n"
+                    "matplotlib.use('Agg')\n"
+                    "import matplotlib.pyplot as plt\n"
+                    "from sklearn.cluster import KMeans\n"
+                    "from sklearn.preprocessing import StandardScaler\n"
+                    "data = load_frame('{frame}')\n"
+                    "features = ['recency_days', 'frequency', 'monetary_value']\n"
+                    "X = StandardScaler().fit_transform(data[features])\n"
+                    "data['cluster'] = KMeans(n_clusters=4, random_state=42, "
+                    "n_init=10).fit_predict(X)\n"
+                    "print(data.groupby('cluster')[features].mean())\n"
+                    "fig, ax = plt.subplots()\n"
+                    "ax.scatter(data.frequency, data.monetary_value, "
+                    "c=data.cluster, s=4)\n"
+                    "show_figure(fig)\n"
+                    "plt.close(fig)"
+                },
+            },
+        ],
+        answer="Customers fall into four segments: champions, loyal, "
+        "at-risk and casual buyers.",
+    ),
+    Scenario(
+        name="general_trend",
+        question="Show the monthly revenue trend.",
+        agent="General_Agent",
+        steps=[
+            {
+                "name": "sql_tool",
+                "args": {
+                    "query": "SELECT strftime('%Y-%m', created_at) AS month, "
+                    "SUM(price_usd) AS revenue, COUNT(*) AS orders "
+                    "FROM orders GROUP BY month ORDER BY month",
+                    "keep_frame": True,
+                },
+            },
+            {
+                "name": "python_tool",
+                "args": {
+                    "code": "import matplotlib\n"
+                    "matplotlib.use('Agg')\n"
+                    "import matplotlib.pyplot as plt\n"
+                    "df = load_frame('{frame}')\n"
+                    "fig, ax = plt.subplots()\n"
+                    "ax.plot(df.month, df.revenue, marker='o')\n"
+                    "show_figure(fig)\n"
+                    "plt.close(fig)"
+                },
+            },
+        ],
+        answer="Revenue grew steadily month over month.",
+    ),
+    Scenario(
+        name="general_top_products",
+        question="What are the top products by revenue?",
+        agent="General_Agent",
+        steps=[
+            {
+                "name": "sql_tool",
+                "args": {
+                    "query": "SELECT p.product_name, SUM(oi.price_usd) AS revenue "
+                    "FROM order_items oi "
+                    "JOIN products p ON p.product_id = oi.product_id "
+                    "GROUP BY p.product_name ORDER BY revenue DESC LIMIT 10"
+                },
+            },
+        ],
+        answer="The Premium Widget leads revenue, followed by the Deluxe Bundle.",
+    ),
+    Scenario(
+        name="compound",
+        question="Compare the conversion rates of Ad_V1 and Ad_V2, and segment "
+        "our customers with RFM and K-Means clustering.",
+        agent="AB_Agent",
+        parallel=["ab_test", "segmentation"],
+    ),
+]
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, list):
+        return " ".join(
+            block.get("text", "") for block in content if isinstance(block, dict)
+        )
+    return str(content)
+
+
+def _fill(value: Any, frame: Optional[str]) -> Any:
+    """Substitute the frame handle into (nested) string arguments."""
+    if isinstance(value, str) and frame:
+        return value.replace("{frame}", frame)
+    if isinstance(value, dict):
+        return {key: _fill(item, frame) for key, item in value.items()}
+    return value
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model answering from SCENARIOS instead of an API.
+
+    The response is derived from the messages alone (no per-instance
+    cursor), so one model can serve concurrent conversations: supervisor
+    calls get the scenario's routing JSON, agent calls get the next tool
+    call after the last user message, then the final answer.
+    """
+
+    scenarios: Dict[str, Scenario]
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        return self
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        last_human = max(
+            (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)),
+            default=-1,
+        )
+        question = _text(messages[last_human]) if last_human >= 0 else ""
+        if question.startswith(BRANCH_TASK_PREFIX):
+            # Parallel branch: answer the sub-task's scenario
+            question = question[len(BRANCH_TASK_PREFIX) :]
+        scenario = self.scenarios.get(question.strip())
+        if scenario is None:
+            return AIMessage(
+                content='{"next": "FINISH", "message": "Unknown question."}'
+            )
+
+        system = next((m for m in messages if isinstance(m, SystemMessage)), None)
+        if system is not None and "Supervisor Agent" in _text(system):
+            decision = {
+                "next": scenario.agent,
+                "reasoning": f"{scenario.name} question",
+            }
+            if scenario.parallel:
+                branches = [
+                    s for s in self.scenarios.values() if s.name in scenario.parallel
+                ]
+                decision["next"] = [s.agent for s in branches]
+                decision["tasks"] = {s.agent: s.question for s in branches}
+            return AIMessage(content=json.dumps(decision))
+
+        turn = messages[last_human + 1 :]
+        step = sum(1 for m in turn if isinstance(m, AIMessage) and m.tool_calls)
+        if step >= len(scenario.steps):
+            return AIMessage(content=scenario.answer)
+        frame = None
+        for message in reversed(turn):
+            match = isinstance(message, ToolMessage) and _FRAME_RE.search(
+                _text(message)
+            )
+            if match:
+                frame = match.group(1)
+                break
+        call = scenario.steps[step]
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": call["name"],
+                    "args": _fill(call["args"], frame),
+                    "id": f"call_{scenario.name}_{step}",
+                }
+            ],
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+
+def scripted_llm_factory(scenarios: List[Scenario] = SCENARIOS):
+    """Factory for llm_config.set_llm_factory serving the given scenarios."""
+    model = ScriptedChatModel(scenarios={s.question: s for s in scenarios})
+    return lambda model_name, temperature: model
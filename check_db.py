@@ -1,6 +1,7 @@
-import sqlite3
 import os
 
+from src.utils.catalog import get_catalog
+
 db_path = "ecommerce.db"
 print(f"Checking DB at: {os.path.abspath(db_path)}")
 
@@ -8,20 +9,15 @@ if not os.path.exists(db_path):
     print("❌ Database file not found!")
     exit(1)
 
-conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
-
-cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-tables = cursor.fetchall()
+# Row counts are MAX(rowid) index probes, not full-table scans; distinct counts
+# need sqlite_stat1, written by ANALYZE in seed_data.py and the materialize /
+# index_advisor CLIs. The catalog reads through the read-only engine and never
+# modifies the file
+row_counts = get_catalog(db_path).row_counts()
 
-if not tables:
+if not row_counts:
     print("❌ No tables found in database.")
 else:
-    print(f"✅ Found {len(tables)} tables:")
-    for table in tables:
-        name = table[0]
-        cursor.execute(f"SELECT COUNT(*) FROM {name}")
-        count = cursor.fetchone()[0]
-        print(f"  - {name}: {count} rows")
-
-conn.close()
+    print(f"✅ Found {len(row_counts)} tables:")
+    for name, count in row_counts.items():
+        print(f"  - {name}: ~{count} rows")
@@ -5,24 +5,82 @@ This module sets up the LangGraph workflow with the Supervisor routing
 to specialized agents (A/B Test, Segmentation, General Analytics).
 """
 
+import asyncio
+import importlib
 import os
-from typing import Dict, Any, Literal
-from dotenv import load_dotenv
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional
 
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
 
 from src.states.state import AgentState
 from src.agents.supervisor import create_supervisor_node, get_next_agent
-from src.agents.ab_test_agent import create_ab_test_agent
-from src.agents.segmentation_agent import create_segmentation_agent
-from src.agents.general_agent import create_general_agent
-from src.utils.llm_config import DEFAULT_MODEL
+from src.agents.merge import after_agent, as_branch_result, merge_node
+from src.utils.llm_config import DEFAULT_MODEL, load_env
+from src.utils.answer_cache import CachedWorkflow
+from src.utils.checkpointer import get_checkpointer
+from src.utils.tracing import TRACING_ENABLED, get_tracer
+
+# Specialist agent factories (module, function), imported on first use
+AGENT_FACTORIES = {
+    "AB_Agent": ("src.agents.ab_test_agent", "create_ab_test_agent"),
+    "Segmentation_Agent": (
+        "src.agents.segmentation_agent",
+        "create_segmentation_agent",
+    ),
+    "General_Agent": ("src.agents.general_agent", "create_general_agent"),
+}
+
+# Compiled workflows (wrapped in the answer cache) per model name
+_workflows: Dict[str, CachedWorkflow] = {}
+_workflows_lock = threading.Lock()
+# Construction time in seconds: "<model>" for workflows, "<model>/<node>" for agents
+_setup_timings: Dict[str, float] = {}
+
+
+def _lazy_agent(name: str, model_name: str) -> RunnableLambda:
+    """
+    Wrap an agent so its module is imported and the agent built when first
+    routed to.
+
+    Args:
+        name: Node name (key of AGENT_FACTORIES)
+        model_name: Gemini model passed to the factory
+
+    Returns:
+        A runnable node (sync and async) delegating to the built agent; in a
+        parallel turn its answer is reported as a branch result for Merge
+    """
+    node: Optional[RunnableLambda] = None
+    lock = threading.Lock()
+
+    def build() -> RunnableLambda:
+        nonlocal node
+        with lock:
+            if node is None:
+                started = time.perf_counter()
+                module, factory = AGENT_FACTORIES[name]
+                create = getattr(importlib.import_module(module), factory)
+                node = create(model_name)
+                _setup_timings[f"{model_name}/{name}"] = time.perf_counter() - started
+            return node
+
+    def output(state: AgentState, update: Dict[str, Any]) -> Dict[str, Any]:
+        return as_branch_result(name, update) if state.get("branches") else update
 
+    def run(state: AgentState) -> Dict[str, Any]:
+        return output(state, build().func(state))
 
-# Load environment variables
-load_dotenv(override=True)
+    async def arun(state: AgentState) -> Dict[str, Any]:
+        # Prompt loading and graph construction stay off the event loop
+        agent = node or await asyncio.to_thread(build)
+        return output(state, await agent.afunc(state))
+
+    return RunnableLambda(run, afunc=arun)
 
 
 def create_workflow(model_name: str = DEFAULT_MODEL) -> StateGraph:
@@ -35,11 +93,11 @@ def create_workflow(model_name: str = DEFAULT_MODEL) -> StateGraph:
     Returns:
         Compiled LangGraph workflow
     """
-    # Create agent nodes
+    # Create agent nodes (specialists are built on their first use)
     supervisor_node = create_supervisor_node(model_name)
-    ab_test_node = create_ab_test_agent(model_name)
-    segmentation_node = create_segmentation_agent(model_name)
-    general_node = create_general_agent(model_name)
+    ab_test_node = _lazy_agent("AB_Agent", model_name)
+    segmentation_node = _lazy_agent("Segmentation_Agent", model_name)
+    general_node = _lazy_agent("General_Agent", model_name)
 
     # Build the graph
     workflow = StateGraph(AgentState)
@@ -49,6 +107,7 @@ def create_workflow(model_name: str = DEFAULT_MODEL) -> StateGraph:
     workflow.add_node("AB_Agent", ab_test_node)
     workflow.add_node("Segmentation_Agent", segmentation_node)
     workflow.add_node("General_Agent", general_node)
+    workflow.add_node("Merge", merge_node)
 
     # Set entry point
     workflow.set_entry_point("Supervisor")
@@ -65,38 +124,79 @@ def create_workflow(model_name: str = DEFAULT_MODEL) -> StateGraph:
         },
     )
 
-    # All specialized agents route to END after completion
-    workflow.add_edge("AB_Agent", END)
-    workflow.add_edge("Segmentation_Agent", END)
-    workflow.add_edge("General_Agent", END)
+    # Specialists finish the turn, or report to Merge when dispatched in
+    # parallel (Merge runs once, after the slowest branch)
+    for agent in ("AB_Agent", "Segmentation_Agent", "General_Agent"):
+        workflow.add_conditional_edges(agent, after_agent, {"Merge": "Merge", END: END})
+    workflow.add_edge("Merge", END)
 
-    workflow.add_edge("General_Agent", END)
+    # Add checkpointer for memory persistence (SQLite file, bounded retention)
+    memory = get_checkpointer()
 
-    # Add checkpointer for memory persistence
-    memory = MemorySaver()
+    graph = workflow.compile(checkpointer=memory)
+    if TRACING_ENABLED:
+        # Spans for every node, LLM call and tool (see src/utils/tracing.py)
+        graph = graph.with_config(callbacks=[get_tracer()])
+    return graph
 
-    return workflow.compile(checkpointer=memory)
 
+def get_workflow(model_name: str = DEFAULT_MODEL) -> CachedWorkflow:
+    """
+    Get the compiled workflow for a model, building it on first use.
 
-def run_query(query: str, model_name: str = DEFAULT_MODEL) -> Dict[str, Any]:
+    Args:
+        model_name: Gemini model to use for all agents
+
+    Returns:
+        Compiled workflow wrapped in the answer cache, shared process-wide
+    """
+    with _workflows_lock:
+        if model_name not in _workflows:
+            started = time.perf_counter()
+            # Environment variables from .env (once per process)
+            load_env()
+            _workflows[model_name] = CachedWorkflow(
+                create_workflow(model_name), model_name=model_name
+            )
+            _setup_timings[model_name] = time.perf_counter() - started
+        return _workflows[model_name]
+
+
+def setup_timings() -> Dict[str, float]:
+    """Get construction times (seconds) of workflows and lazily built agents."""
+    return dict(_setup_timings)
+
+
+def run_query(
+    query: str,
+    model_name: str = DEFAULT_MODEL,
+    bypass_cache: bool = False,
+    thread_id: Optional[str] = None,
+) -> Dict[str, Any]:
     """
     Run a user query through the agent system.
 
     Args:
         query: User's natural language question
         model_name: Gemini model to use
+        bypass_cache: Always run the workflow, even for a cached question
+        thread_id: Conversation thread (a new one per call if omitted)
 
     Returns:
         Final state containing messages and visualizations
     """
-    # Create the workflow
-    app = create_workflow(model_name)
+    # Reuse the compiled workflow (repeated questions hit the answer cache)
+    built_before = set(_setup_timings)
+    started = time.perf_counter()
+    app = get_workflow(model_name)
+    setup_seconds = time.perf_counter() - started
 
     # Initialize state
     initial_state: AgentState = {
         "messages": [HumanMessage(content=query)],
         "next": "",
         "visualizations": [],
+        "active_agent": "",
     }
 
     # Run the workflow
@@ -104,7 +204,18 @@ def run_query(query: str, model_name: str = DEFAULT_MODEL) -> Dict[str, Any]:
     print(f"USER QUERY: {query}")
     print("=" * 60)
 
-    final_state = app.invoke(initial_state)
+    config = {"configurable": {"thread_id": thread_id or str(uuid.uuid4())}}
+    final_state = app.invoke(initial_state, config=config, bypass_cache=bypass_cache)
+
+    built = {k: v for k, v in _setup_timings.items() if k not in built_before}
+    cold = model_name in built
+    print(
+        f"\n⏱️  Workflow setup: {setup_seconds:.3f}s "
+        f"({'cold start' if cold else 'cached'})"
+    )
+    for key, seconds in built.items():
+        if key != model_name:
+            print(f"   Built {key.split('/', 1)[1]} on first use: {seconds:.3f}s")
 
     # Print results
     print(f"\n{'=' * 60}")
@@ -125,8 +236,39 @@ def run_query(query: str, model_name: str = DEFAULT_MODEL) -> Dict[str, Any]:
     return final_state
 
 
+async def arun_query(
+    query: str,
+    model_name: str = DEFAULT_MODEL,
+    thread_id: Optional[str] = None,
+    bypass_cache: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run a user query through the agent system on the event loop.
+
+    Nodes await the LLM and offload SQL/Python work to threads and worker
+    processes, so many queries can run concurrently in one loop.
+
+    Args:
+        query: User's natural language question
+        model_name: Gemini model to use
+        thread_id: Conversation thread (a new one per call if omitted)
+        bypass_cache: Always run the workflow, even for a cached question
+
+    Returns:
+        Final state containing messages and visualizations
+    """
+    app = get_workflow(model_name)
+    config = {"configurable": {"thread_id": thread_id or str(uuid.uuid4())}}
+    return await app.ainvoke(
+        {"messages": [HumanMessage(content=query)]},
+        config=config,
+        bypass_cache=bypass_cache,
+    )
+
+
 def main():
     """Main entry point with test query."""
+    load_env()
     # Verify API key is set
     if not os.getenv("GEMINI_API_KEY"):
         print("⚠️  Warning: GEMINI_API_KEY not set in environment.")
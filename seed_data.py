@@ -4,12 +4,24 @@ Seed Data Generator for E-commerce Database.
 Generates synthetic data with detectable patterns for:
 - A/B Testing: Ad_V1 (~4% conversion) vs Ad_V2 (~8% conversion)
 - Segmentation: "Whales" (high frequency/spend) vs "Casuals" (low frequency/spend)
+
+With --scale N every volume (users, sessions, conversions) is multiplied by N
+and generated with vectorized NumPy sampling in parallel chunks.
 """
+import argparse
+import os
 import sqlite3
 import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import numpy as np
+
+from src.utils.index_advisor import create_default_indexes
+from src.utils.materialize import SUMMARY_TABLES, install as install_summaries
+
 
 # Configuration
 DB_PATH = "ecommerce.db"
@@ -27,6 +39,26 @@ AD_V2_SESSIONS = 2000
 AD_V1_CONVERSION_RATE = 0.04  # 4%
 AD_V2_CONVERSION_RATE = 0.08  # 8%
 
+# Scaled generation: rows per chunk (one task and one transaction each)
+CHUNK_ROWS = 250_000
+BASE_DATE = np.datetime64("2024-01-01T00:00:00")
+DAYS = 181  # dates span days 0-180 like the row-by-row generator
+UTM_SOURCES = ["google", "facebook", "twitter", "email", "organic"]
+DEVICES = ["desktop", "mobile", "tablet"]
+
+# Per-segment order pattern: (users before the segment, users, orders per
+# user, price range, max items per order); user counts are multiplied by the
+# scale factor, so segment boundaries move with it
+SEGMENTS = {
+    "whale": (0, NUM_WHALE_USERS, (5, 15), (80, 150), 3),
+    "regular": (NUM_WHALE_USERS, NUM_REGULAR_USERS, (2, 4), (40, 80), 2),
+    "casual": (
+        NUM_WHALE_USERS + NUM_REGULAR_USERS, NUM_CASUAL_USERS, (1, 2), (15, 40), 1
+    ),
+}
+# Users 1-300 (x scale) see Ad_V1, users 301-600 (x scale) see Ad_V2
+AB_POOL_USERS = 300
+
 # Products
 PRODUCTS = [
     {"product_id": 1, "product_name": "Premium Widget", "created_at": "2023-01-15"},
@@ -41,7 +73,9 @@ def create_database(db_path: str = DB_PATH):
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
-    # Drop existing tables
+    # Drop existing tables (summaries are rebuilt after seeding)
+    for name in [*SUMMARY_TABLES, "summary_state"]:
+        cursor.execute(f"DROP TABLE IF EXISTS {name}")
     cursor.execute("DROP TABLE IF EXISTS order_items")
     cursor.execute("DROP TABLE IF EXISTS orders")
     cursor.execute("DROP TABLE IF EXISTS website_sessions")
@@ -342,7 +376,189 @@ def seed_orders_and_items(conn, user_campaigns: dict):
     print(f"  ✓ Inserted {len(order_items)} order items")
 
 
-def print_summary(conn):
+# --- Scaled, vectorized generation ------------------------------------------
+
+
+def _timestamps(units: np.ndarray, unit: str) -> list:
+    """ISO timestamps (like datetime.isoformat()) offset from BASE_DATE."""
+    stamps = BASE_DATE + units.astype(f"timedelta64[{unit}]")
+    return np.datetime_as_string(stamps, unit="s").tolist()
+
+
+def _plan_tasks(scale: int) -> list:
+    """
+    Split the scaled dataset into generation tasks.
+
+    Every task is small enough to generate and write in one step, and the
+    list only depends on the scale, so the output for a given seed does not
+    depend on the number of worker processes.
+    """
+    tasks = []
+    for campaign, sessions in (("Ad_V1", AD_V1_SESSIONS), ("Ad_V2", AD_V2_SESSIONS)):
+        total = sessions * scale
+        for start in range(0, total, CHUNK_ROWS):
+            tasks.append(("sessions", campaign, scale, min(CHUNK_ROWS, total - start)))
+    for segment, (before, users, (lo, hi), _, _) in SEGMENTS.items():
+        first, total = before * scale + 1, users * scale
+        # Chunks of users producing about CHUNK_ROWS orders each
+        step = max(1, CHUNK_ROWS * 2 // (lo + hi))
+        for start in range(0, total, step):
+            tasks.append(("orders", segment, first + start, min(step, total - start)))
+    tasks.append(("conversions", "Ad_V1", scale, 0))
+    tasks.append(("conversions", "Ad_V2", scale, 0))
+    return tasks
+
+
+def _generate_chunk(task: tuple, seed: np.random.SeedSequence) -> tuple:
+    """
+    Generate the rows of one task (runs in a worker process).
+
+    Returns:
+        (kind, columns) with sessions as (user_id, source, campaign, device,
+        created_at) lists, or orders as (created_at, user_id, price, cogs) plus
+        items as (local order index, product_id, price, cogs)
+    """
+    kind, name, arg, count = task
+    rng = np.random.default_rng(seed)
+
+    if kind == "sessions":
+        scale = arg
+        low = 1 if name == "Ad_V1" else AB_POOL_USERS * scale + 1
+        users = rng.integers(low, low + AB_POOL_USERS * scale, size=count)
+        sources = np.array(UTM_SOURCES)[rng.integers(0, len(UTM_SOURCES), count)]
+        devices = np.array(DEVICES)[rng.integers(0, len(DEVICES), count)]
+        minutes = rng.integers(0, DAYS * 24 * 60, size=count)
+        return kind, (
+            users.tolist(), sources.tolist(), name, devices.tolist(),
+            _timestamps(minutes, "m"),
+        )
+
+    if kind == "orders":
+        _, _, (lo, hi), (price_lo, price_hi), max_items = SEGMENTS[name]
+        per_user = rng.integers(lo, hi + 1, size=count)
+        user_ids = np.repeat(np.arange(arg, arg + count), per_user)
+        n = len(user_ids)
+        created = _timestamps(rng.integers(0, DAYS * 24, size=n), "h")
+        price = np.round(rng.uniform(price_lo, price_hi, n), 2)
+        cogs = np.round(price * rng.uniform(0.3, 0.5, n), 2)
+        num_items = rng.integers(1, max_items + 1, size=n)
+    else:
+        # A/B conversions: one extra order for a sample of each pool
+        scale = arg
+        rate = AD_V1_CONVERSION_RATE if name == "Ad_V1" else AD_V2_CONVERSION_RATE
+        sessions = AD_V1_SESSIONS if name == "Ad_V1" else AD_V2_SESSIONS
+        pool = AB_POOL_USERS * scale
+        first = 1 if name == "Ad_V1" else pool + 1
+        user_ids = first + rng.choice(pool, int(sessions * scale * rate), replace=False)
+        if name == "Ad_V1":
+            # Skip users already covered by the whale/regular segments
+            segmented = (NUM_WHALE_USERS + NUM_REGULAR_USERS) * scale
+            user_ids = user_ids[user_ids > segmented]
+        n = len(user_ids)
+        created = _timestamps(rng.integers(0, DAYS, size=n), "D")
+        price = np.round(rng.uniform(25, 60, n), 2)
+        cogs = np.round(price * 0.4, 2)
+        num_items = np.ones(n, dtype=np.int64)
+        max_items = 1
+
+    item_order = np.repeat(np.arange(n), num_items)
+    if max_items == 1:
+        # Single item carrying the order's price and cost
+        item_price, item_cogs = price, cogs
+    else:
+        item_price = np.round(price[item_order] / num_items[item_order], 2)
+        item_cogs = np.round(item_price * rng.uniform(0.3, 0.5, len(item_order)), 2)
+    products = rng.integers(1, len(PRODUCTS) + 1, size=len(item_order))
+    return kind, (
+        (created, user_ids.tolist(), price.tolist(), cogs.tolist()),
+        (item_order.tolist(), products.tolist(), item_price.tolist(), item_cogs.tolist()),
+    )
+
+
+def _write_chunk(conn, kind: str, columns: tuple, next_order_id: int) -> int:
+    """Insert one generated chunk in its own transaction; returns the next order_id."""
+    if kind == "sessions":
+        users, sources, campaign, devices, created = columns
+        content = "version_1" if campaign == "Ad_V1" else "version_2"
+        conn.executemany(
+            """INSERT INTO website_sessions
+               (user_id, utm_source, utm_campaign, utm_content, device_type, created_at)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            zip(users, sources, [campaign] * len(users), [content] * len(users),
+                devices, created)
+        )
+    else:
+        (created, user_ids, price, cogs), (item_order, products, item_price, item_cogs) = columns
+        order_ids = range(next_order_id, next_order_id + len(user_ids))
+        conn.executemany(
+            """INSERT INTO orders (order_id, created_at, user_id, price_usd, cogs_usd)
+               VALUES (?, ?, ?, ?, ?)""",
+            zip(order_ids, created, user_ids, price, cogs)
+        )
+        conn.executemany(
+            """INSERT INTO order_items (order_id, product_id, price_usd, cogs_usd)
+               VALUES (?, ?, ?, ?)""",
+            zip((next_order_id + i for i in item_order), products, item_price, item_cogs)
+        )
+        next_order_id += len(user_ids)
+    conn.commit()
+    return next_order_id
+
+
+def seed_scaled(conn, scale: int, seed: int = RANDOM_SEED, workers: int = 1):
+    """
+    Generate the dataset at `scale` times the default volume.
+
+    Tasks are generated by a process pool (each with its own child of one
+    SeedSequence, so results are reproducible for a seed whatever the number
+    of workers) and written in task order by this single writer, one
+    transaction per chunk, with durability turned off for the bulk load.
+
+    Args:
+        conn: Connection to a freshly created database
+        scale: Multiplier for users, sessions and conversions
+        seed: Random seed
+        workers: Generator processes (1 generates inline)
+    """
+    for pragma in (
+        "journal_mode = OFF", "synchronous = OFF", "locking_mode = EXCLUSIVE",
+        "temp_store = MEMORY", "cache_size = -262144",
+    ):
+        conn.execute(f"PRAGMA {pragma}")
+
+    tasks = _plan_tasks(scale)
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    counts = {"sessions": 0, "orders": 0}
+    next_order_id = 1
+
+    def write(kind, columns):
+        nonlocal next_order_id
+        next_order_id = _write_chunk(conn, kind, columns, next_order_id)
+        key = "sessions" if kind == "sessions" else "orders"
+        counts[key] += len(columns[0]) if kind == "sessions" else len(columns[0][0])
+
+    if workers <= 1:
+        for task, task_seed in zip(tasks, seeds):
+            write(*_generate_chunk(task, task_seed))
+    else:
+        # Bounded look-ahead keeps at most 2 chunks per worker in memory
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for task, task_seed in zip(tasks, seeds):
+                pending.append(pool.submit(_generate_chunk, task, task_seed))
+                if len(pending) >= workers * 2:
+                    write(*pending.popleft().result())
+            while pending:
+                write(*pending.popleft().result())
+
+    conn.execute("PRAGMA locking_mode = NORMAL")
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.execute("PRAGMA synchronous = FULL")
+    print(f"  ✓ Inserted {counts['sessions']:,} website sessions")
+    print(f"  ✓ Inserted {counts['orders']:,} orders")
+
+
+def print_summary(conn, scale: int = 1):
     """Print a summary of the generated data."""
     cursor = conn.cursor()
     
@@ -384,19 +600,25 @@ def print_summary(conn):
     seg_query = """
         SELECT 
             CASE 
-                WHEN user_id <= 50 THEN 'Whales (1-50)'
-                WHEN user_id <= 100 THEN 'Regular (51-100)'
-                ELSE 'Casual (101+)'
+                WHEN user_id <= {whales} THEN 'Whales (1-{whales})'
+                WHEN user_id <= {regulars} THEN 'Regular ({whales_next}-{regulars})'
+                ELSE 'Casual ({regulars_next}+)'
             END as segment,
             COUNT(DISTINCT user_id) as users,
             COUNT(*) as orders,
             ROUND(AVG(price_usd), 2) as avg_order_value,
             ROUND(SUM(price_usd), 2) as total_revenue
         FROM orders
-        WHERE user_id <= 300
+        WHERE user_id <= {pool}
         GROUP BY segment
         ORDER BY avg_order_value DESC
-    """
+    """.format(
+        whales=NUM_WHALE_USERS * scale,
+        whales_next=NUM_WHALE_USERS * scale + 1,
+        regulars=(NUM_WHALE_USERS + NUM_REGULAR_USERS) * scale,
+        regulars_next=(NUM_WHALE_USERS + NUM_REGULAR_USERS) * scale + 1,
+        pool=AB_POOL_USERS * scale,
+    )
     results = cursor.execute(seg_query).fetchall()
     for segment, users, orders, aov, revenue in results:
         print(f"  {segment}: {users} users, {orders} orders, ${aov} AOV, ${revenue} revenue")
@@ -404,25 +626,50 @@ def print_summary(conn):
 
 def main():
     """Main function to seed the database."""
+    parser = argparse.ArgumentParser(description="Seed the e-commerce database.")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database path")
+    parser.add_argument(
+        "--scale", type=int, default=None,
+        help="Multiply all volumes by N using the vectorized generator "
+             "(e.g. 10000 for ~40M sessions)"
+    )
+    parser.add_argument("--seed", type=int, default=RANDOM_SEED, help="Random seed")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="Generator processes for --scale"
+    )
+    args = parser.parse_args()
+
     print("="*50)
     print("E-COMMERCE DATABASE SEEDER")
     print("="*50)
-    print(f"\nCreating database: {DB_PATH}")
+    print(f"\nCreating database: {args.db}")
     
     # Create and seed
-    conn = create_database(DB_PATH)
+    conn = create_database(args.db)
     
     print("\nSeeding data...")
     seed_products(conn)
-    user_campaigns = seed_website_sessions(conn)
-    seed_orders_and_items(conn, user_campaigns)
+    if args.scale is None:
+        user_campaigns = seed_website_sessions(conn)
+        seed_orders_and_items(conn, user_campaigns)
+    else:
+        seed_scaled(conn, args.scale, seed=args.seed, workers=args.workers)
+
+    # Indexes are built once, after the bulk load
+    print("\nBuilding indexes...")
+    create_default_indexes(conn)
     
     # Print summary
-    print_summary(conn)
+    print_summary(conn, scale=args.scale or 1)
     
     conn.close()
+
+    print("\nBuilding summary tables...")
+    for name, rows in install_summaries(args.db).items():
+        print(f"  {name}: {rows} rows")
     print("\n✓ Database seeding complete!")
-    print(f"  Database saved to: {Path(DB_PATH).absolute()}")
+    print(f"  Database saved to: {Path(args.db).absolute()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+"""
+Parallel fan-out of compound questions and the Merge node.
+The supervisor dispatches several specialists at once with LangGraph's Send;
+each branch reports into branch_results and Merge combines their answers.
+"""
+
+from typing import Dict, Any, List
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END
+
+from src.states.state import AgentState
+
+# Value of `next` when the supervisor dispatched several branches
+PARALLEL = "PARALLEL"
+# Start of the user message carrying a branch's sub-task
+BRANCH_TASK_PREFIX = "Your part of this request: "
+
+# Section headings of the merged answer
+AGENT_TITLES = {
+    "AB_Agent": "A/B Test Analysis",
+    "Segmentation_Agent": "Customer Segmentation",
+    "General_Agent": "General Analytics",
+}
+
+
+def branch_input(state: AgentState, branch: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Build the state a parallel branch runs on.
+
+    The branch's sub-task is appended as a user message so each specialist
+    only answers its part of the compound question (not persisted).
+    """
+    messages = list(state.get("messages", []))
+    if branch.get("task"):
+        messages.append(HumanMessage(content=BRANCH_TASK_PREFIX + branch["task"]))
+    return {**state, "messages": messages}
+
+
+def as_branch_result(agent: str, update: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn a specialist's state update into a branch result for Merge.
+
+    Branches run in the same step, so they only write the branch_results
+    channel (its reducer appends) instead of messages/visualizations.
+    """
+    messages = update.get("messages", [])
+    return {
+        "branch_results": [
+            {
+                "agent": agent,
+                "content": str(messages[-1].content) if messages else "",
+                "visualizations": list(update.get("visualizations", [])),
+            }
+        ]
+    }
+
+
+def after_agent(state: AgentState) -> str:
+    """Conditional edge after a specialist: Merge for parallel turns, else END."""
+    return "Merge" if state.get("branches") else END
+
+
+def merge_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Combine the answers and visualizations of the parallel branches.
+
+    Sections follow the supervisor's dispatch order; the first branch becomes
+    the active agent for follow-up questions.
+    """
+    order = [branch["agent"] for branch in state.get("branches", [])]
+    results = sorted(
+        state.get("branch_results", []),
+        key=lambda r: order.index(r["agent"]) if r["agent"] in order else len(order),
+    )
+
+    sections: List[str] = []
+    visualizations: List[str] = []
+    for result in results:
+        title = AGENT_TITLES.get(result["agent"], result["agent"])
+        sections.append(f"### {title}\n\n{result['content']}")
+        for viz in result["visualizations"]:
+            if viz not in visualizations:
+                visualizations.append(viz)
+
+    return {
+        "messages": [AIMessage(content="\n\n".join(sections))],
+        "next": "FINISH",
+        "visualizations": visualizations,
+        "active_agent": order[0] if order else state.get("active_agent", ""),
+        # The turn is complete: clear the fan-out bookkeeping
+        "branches": [],
+        "branch_results": None,
+    }
@@ -0,0 +1,350 @@
+"""
+Fast-path router for the Supervisor.
+Routes confidently classifiable queries locally (keyword rules plus a small
+TF-IDF/logistic model trained on logged LLM decisions) and keeps follow-up
+turns with the agent that handled the previous turn.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+# Minimum confidence for routing without an LLM call
+ROUTER_CONFIDENCE = float(os.getenv("ROUTER_CONFIDENCE", "0.8"))
+ROUTER_FAST_PATH = os.getenv("ROUTER_FAST_PATH", "1") != "0"
+
+# LLM routing decisions are appended here and used as training data
+ROUTING_LOG_PATH = Path(os.getenv("ROUTING_LOG_PATH", "logs/routing_decisions.jsonl"))
+MIN_TRAINING_EXAMPLES = 20
+# Keyword score at which a question clearly involves an agent; questions
+# involving several agents go to the LLM, which can dispatch them in parallel
+COMPOUND_MIN_SCORE = 3.0
+RETRAIN_EVERY = 25
+
+AGENTS = ["AB_Agent", "Segmentation_Agent", "General_Agent"]
+
+# Weighted keyword rules per agent
+KEYWORD_RULES: Dict[str, List[Tuple[str, float]]] = {
+    "AB_Agent": [
+        (r"\ba\s*/\s*b\b|\bab[ _-]?test", 3.0),
+        (r"\bad[_ ]?v\d\b", 3.0),
+        (r"\bvariant", 2.0),
+        (r"\bexperiment", 2.0),
+        (r"significan|p[- ]?value|chi[- ]?squared?|z[- ]?test|t[- ]?test", 2.0),
+        (r"\bconversion", 1.5),
+        (r"\bcampaign|utm_campaign", 1.5),
+        (r"\blift\b|converts? better|which ad\b", 1.5),
+    ],
+    "Segmentation_Agent": [
+        (r"\bsegment", 3.0),
+        (r"\bclusters?\b|clustering|k-?means", 3.0),
+        (r"\brfm\b|recency", 3.0),
+        (r"\bwhales?\b|personas?\b|cohorts?\b", 2.0),
+        (r"customer (groups?|value|types?)|user groups?|lifetime value|\bclv\b", 2.0),
+        (r"\bbehaviou?ral patterns?", 1.5),
+    ],
+    "General_Agent": [
+        (r"\brevenue|\bsales\b", 2.0),
+        (r"average order value|\baov\b", 3.0),
+        (r"\btop \d+|best[- ]sell|top products?", 2.0),
+        (r"\btrends?\b|over time|\bmonthly|\bdaily|\bweekly|\bby month", 1.5),
+        (r"\bhow many\b|\btotal\b|\bcount\b", 1.0),
+        (r"\bproducts?\b|\borders?\b|\bsessions?\b|traffic|utm_source|devices?", 1.0),
+    ],
+}
+_COMPILED_RULES = {
+    agent: [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in rules]
+    for agent, rules in KEYWORD_RULES.items()
+}
+
+# Openings of short turns that continue the previous analysis
+_FOLLOW_UP_RE = re.compile(
+    r"^\s*(and|also|now|then|what about|how about|same|instead|again|why|"
+    r"ok|okay)\b",
+    re.IGNORECASE,
+)
+# References to the previous answer; only decisive when nothing else matched
+_REFERENCE_RE = re.compile(
+    r"\b(it|that|this|those|these|them|above|previous|same)\b", re.IGNORECASE
+)
+FOLLOW_UP_MAX_WORDS = 12
+
+# Mentions of the store's own data; without one a question may be general
+# knowledge ("what is revenue?") and the supervisor decides whether to reject it
+_DATA_REFERENCE_RE = re.compile(
+    r"\b(our|we|my|orders?|sessions?|customers?|users?|buyers?|products?|items?|"
+    r"ad[_ ]?v\d|variants?|campaigns?|utm_\w+|devices?|mobile|desktop|"
+    r"segments?|clusters?|rfm|cohorts?|data|database|dataset|table|"
+    r"how many|total|average|avg|sum|count|top \d+|trends?|over time|"
+    r"daily|weekly|monthly|yearly|quarterly|by (day|week|month|quarter|year|"
+    r"device|source|campaign|product)|per (day|week|month|user|customer|order)|"
+    r"last (week|month|quarter|year)|(19|20)\d\d)\b",
+    re.IGNORECASE,
+)
+# Requests the database cannot answer (the supervisor prompt rejects these)
+_OUT_OF_SCOPE_RE = re.compile(
+    r"\b(weather|stock prices?|share prices?|crypto|bitcoin|"
+    r"exchange rates?|news|competitors?|amazon|shopify|poem|joke|story|recipe|"
+    r"translate|write (a|an|me)|capital of|definition|meaning of|"
+    r"tips|advice|best practices?|in general|industry|market (size|share))\b",
+    re.IGNORECASE,
+)
+
+
+def keyword_scores(text: str) -> Dict[str, float]:
+    """Sum the weights of matching keyword rules per agent."""
+    return {
+        agent: sum(weight for pattern, weight in rules if pattern.search(text))
+        for agent, rules in _COMPILED_RULES.items()
+    }
+
+
+def compound_agents(text: str) -> List[str]:
+    """Agents a question clearly involves (more than one: a compound question)."""
+    return [
+        agent
+        for agent, score in keyword_scores(text).items()
+        if score >= COMPOUND_MIN_SCORE
+    ]
+
+
+def looks_like_follow_up(text: str) -> bool:
+    """Heuristic for short turns that open by continuing the previous analysis."""
+    return len(text.split()) <= FOLLOW_UP_MAX_WORDS and bool(_FOLLOW_UP_RE.match(text))
+
+
+def refers_back(text: str) -> bool:
+    """Heuristic for short turns referring to the previous answer ("plot that")."""
+    return len(text.split()) <= FOLLOW_UP_MAX_WORDS and bool(_REFERENCE_RE.search(text))
+
+
+class FastPathRouter:
+    """
+    Local router consulted before the Supervisor's LLM call.
+
+    route() returns (agent, reason) when confident, or None to fall back to
+    the LLM. LLM decisions are logged via record() and periodically used to
+    retrain the model in a background thread.
+    """
+
+    def __init__(
+        self,
+        threshold: float = ROUTER_CONFIDENCE,
+        log_path: Path = ROUTING_LOG_PATH,
+    ):
+        self.threshold = threshold
+        self.log_path = Path(log_path)
+        self._model = None
+        self._trained_on = 0
+        self._pending = 0
+        self._loaded = False
+        self._training = False
+        self._lock = threading.Lock()
+        self._stats = {
+            "fast_path": 0,
+            "sticky": 0,
+            "llm_fallback": 0,
+            "route_seconds": 0.0,
+        }
+
+    # --- Model -------------------------------------------------------------
+
+    def _load_examples(self) -> Tuple[List[str], List[str]]:
+        """Read logged (question, agent) pairs."""
+        texts, labels = [], []
+        if not self.log_path.exists():
+            return texts, labels
+        with self.log_path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("agent") in AGENTS and entry.get("question"):
+                    texts.append(entry["question"])
+                    labels.append(entry["agent"])
+        return texts, labels
+
+    def _train(self) -> None:
+        """Fit TF-IDF + logistic regression on the routing log."""
+        try:
+            texts, labels = self._load_examples()
+            if len(texts) < MIN_TRAINING_EXAMPLES or len(set(labels)) < 2:
+                return
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            from sklearn.linear_model import LogisticRegression
+            from sklearn.pipeline import make_pipeline
+
+            model = make_pipeline(
+                TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, min_df=1),
+                LogisticRegression(max_iter=1000, class_weight="balanced"),
+            )
+            model.fit(texts, labels)
+            with self._lock:
+                self._model = model
+                self._trained_on = len(texts)
+        finally:
+            with self._lock:
+                self._training = False
+
+    def _start_training(self) -> None:
+        """Fit the model in a background thread (one at a time)."""
+        with self._lock:
+            if self._training:
+                return
+            self._training = True
+            self._pending = 0
+        threading.Thread(target=self._train, daemon=True).start()
+
+    def _count(self, field: str, value: float = 1) -> None:
+        with self._lock:
+            self._stats[field] += value
+
+    def _model_predict(self, text: str) -> Optional[Tuple[str, float]]:
+        """Most likely agent and its probability, if a model is trained."""
+        with self._lock:
+            model = self._model
+        if model is None:
+            return None
+        probabilities = model.predict_proba([text])[0]
+        best = int(probabilities.argmax())
+        return model.classes_[best], float(probabilities[best])
+
+    # --- Routing -----------------------------------------------------------
+
+    def classify(self, text: str) -> Optional[Tuple[str, float, str]]:
+        """
+        Classify a query locally.
+
+        Returns:
+            (agent, confidence, source) or None when nothing matched
+        """
+        scores = keyword_scores(text)
+        total = sum(scores.values())
+        keyword = None
+        if total > 0:
+            agent = max(scores, key=scores.get)
+            # Require a decisive margin and at least one strong rule
+            keyword = (agent, scores[agent] / total if scores[agent] >= 2.0 else 0.0)
+
+        model = self._model_predict(text)
+        if keyword and model:
+            if keyword[0] == model[0]:
+                return keyword[0], max(keyword[1], model[1]), "keywords+model"
+            # Disagreement: only the margin between the two counts as confidence
+            winner = model if model[1] > keyword[1] else keyword
+            margin = abs(model[1] - keyword[1])
+            return winner[0], margin, "model" if winner is model else "keywords"
+        if model:
+            return model[0], model[1], "model"
+        if keyword:
+            return keyword[0], keyword[1], "keywords"
+        return None
+
+    def route(
+        self, text: str, active_agent: Optional[str] = None
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Decide the agent without an LLM call when possible.
+
+        Out-of-scope requests, and questions that never mention the store's
+        data, go to the LLM so the supervisor can reject them (FINISH).
+
+        Args:
+            text: The latest user message
+            active_agent: Agent that handled the previous turn in this thread
+
+        Returns:
+            (agent, reason) or None to fall back to the LLM
+        """
+        start = time.perf_counter()
+        with self._lock:
+            first_call, self._loaded = not self._loaded, True
+        if first_call:
+            # Train on previously logged decisions once per process
+            self._start_training()
+        try:
+            if not ROUTER_FAST_PATH:
+                self._count("llm_fallback")
+                return None
+
+            # Out-of-scope requests need the supervisor's rejection (FINISH)
+            if _OUT_OF_SCOPE_RE.search(text):
+                self._count("llm_fallback")
+                return None
+
+            decision = self.classify(text)
+            confident = decision is not None and decision[1] >= self.threshold
+
+            if active_agent in AGENTS:
+                # Stay with the previous agent unless the intent clearly changed;
+                # a bare reference ("plot that") only counts without any match
+                if (
+                    looks_like_follow_up(text)
+                    and (not confident or decision[0] == active_agent)
+                ) or (decision is None and refers_back(text)):
+                    self._count("sticky")
+                    return active_agent, "Follow-up to the previous analysis"
+
+            if len(compound_agents(text)) > 1:
+                self._count("llm_fallback")
+                return None
+
+            if confident and _DATA_REFERENCE_RE.search(text):
+                self._count("fast_path")
+                agent, confidence, source = decision
+                return agent, f"Matched by {source} (confidence {confidence:.2f})"
+
+            self._count("llm_fallback")
+            return None
+        finally:
+            self._count("route_seconds", time.perf_counter() - start)
+
+    def record(self, text: str, agent: str) -> None:
+        """Append an LLM routing decision to the training log."""
+        try:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.log_path.open("a", encoding="utf-8") as f:
+                f.write(
+                    json.dumps({"question": text, "agent": agent, "ts": time.time()})
+                    + "\n"
+                )
+        except OSError:
+            return
+        with self._lock:
+            self._pending += 1
+            retrain = self._model is None or self._pending >= RETRAIN_EVERY
+        if retrain:
+            self._start_training()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get routing counters and average routing latency."""
+        with self._lock:
+            stats = dict(self._stats)
+            trained_on = self._trained_on
+        calls = stats["fast_path"] + stats["sticky"] + stats["llm_fallback"]
+        return {
+            **stats,
+            "model_trained_on": trained_on,
+            "avg_route_us": (
+                round(stats["route_seconds"] / calls * 1e6, 1) if calls else 0.0
+            ),
+        }
+
+
+_router: Optional[FastPathRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> FastPathRouter:
+    """Get the process-wide fast-path router."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = FastPathRouter()
+    return _router
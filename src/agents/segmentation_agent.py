@@ -3,13 +3,19 @@ Segmentation Agent for customer clustering and RFM analysis.
 """
 
 from typing import Dict, Any
-from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.prebuilt import create_react_agent
 
 from src.utils.prompt_loader import load_prompt
+from src.utils.catalog import with_summary_tables
 from src.utils.llm_config import get_llm, DEFAULT_MODEL
+from src.utils.artifacts import extract_response
+from src.utils.history import compact_history, AGENT_HISTORY_TOKENS
 from src.states.state import AgentState
 from src.tools.analysis_tools import get_all_tools
+from src.tools.rfm import get_rfm_tool
+from src.tools.tool_node import ConcurrentToolNode
 
 
 def create_segmentation_agent(model_name: str = DEFAULT_MODEL):
@@ -20,105 +26,63 @@ def create_segmentation_agent(model_name: str = DEFAULT_MODEL):
         model_name: Gemini model to use
 
     Returns:
-        A function that performs customer segmentation analysis
+        A runnable node (sync and async) that performs customer segmentation analysis
     """
     llm = get_llm(model_name)
-    tools = get_all_tools()
+    # sql_tool calls of a step run concurrently, python_tool calls in order
+    tools = ConcurrentToolNode(get_all_tools() + [get_rfm_tool()])
 
     # Load the segmentation prompt
-    system_prompt = load_prompt("segmentation_prompt.md")
+    system_prompt = with_summary_tables(load_prompt("segmentation_prompt.md"))
 
     # Create the agent using LangGraph's prebuilt React agent
     agent = create_react_agent(llm, tools, prompt=system_prompt)
 
+    def _respond(result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Turn the ReAct agent's final state into a graph state update.
+        """
+        # Visualizations of this turn only: artifacts attached to tool results
+        output, visualizations = extract_response(result.get("messages", []))
+        return {
+            "messages": [AIMessage(content=output)],
+            "next": "FINISH",
+            "visualizations": visualizations,
+        }
+
+    def _error(e: Exception) -> Dict[str, Any]:
+        """Build the state update for a failed analysis."""
+        error_msg = f"Segmentation analysis error: {str(e)}"
+        return {
+            "messages": [AIMessage(content=error_msg)],
+            "next": "FINISH",
+            "visualizations": [],
+        }
+
     def segmentation_node(state: AgentState) -> Dict[str, Any]:
         """
         Execute customer segmentation analysis using SQL and Python tools.
         """
-        messages = state.get("messages", [])
-        # Reset visualizations for this turn to avoid accumulating history
-        visualizations = []
-
+        messages = compact_history(state.get("messages", []), AGENT_HISTORY_TOKENS)
         try:
-            # Run the agent
             result = agent.invoke(
                 {"messages": messages}, config={"recursion_limit": 100}
             )
+            return _respond(result)
+        except Exception as e:
+            return _error(e)
 
-            result_messages = result.get("messages", [])
-
-            if result_messages:
-                last_msg = result_messages[-1]
-                content = last_msg.content
-                if isinstance(content, list):
-                    output = " ".join(
-                        block.get("text", "")
-                        for block in content
-                        if isinstance(block, dict) and "text" in block
-                    )
-                    if not output:
-                        output = str(content)
-                else:
-                    output = str(content)
-            else:
-                output = "Segmentation analysis complete."
-
-            # Extract Generated Images from ToolMessages (Source of Truth)
-            import re
-
-            for msg in result_messages:
-                if isinstance(msg, ToolMessage) and "IMAGE_GENERATED:" in msg.content:
-                    matches = re.findall(
-                        r"IMAGE_GENERATED:\s*([^\s]+\.png)", msg.content
-                    )
-                    if matches:
-                        visualizations.extend(matches)
-
-            # Also check final output just in case (fallback)
-            if "IMAGE_GENERATED:" in output:
-                matches = re.findall(r"IMAGE_GENERATED:\s*([^\s]+\.png)", output)
-                if matches:
-                    # Avoid duplicates
-                    for m in matches:
-                        if m not in visualizations:
-                            visualizations.append(m)
-
-            # Legacy JSON check
-            elif "plotly" in output.lower() or '{"data":' in output:
-                import json
-
-                try:
-                    start_idx = output.find('{"data":')
-                    if start_idx != -1:
-                        # ... simplistic extraction ...
-                        brace_count = 0
-                        end_idx = start_idx
-                        for i, char in enumerate(output[start_idx:]):
-                            if char == "{":
-                                brace_count += 1
-                            elif char == "}":
-                                brace_count -= 1
-                                if brace_count == 0:
-                                    end_idx = start_idx + i + 1
-                                    break
-                        json_str = output[start_idx:end_idx]
-                        json.loads(json_str)
-                        visualizations = visualizations + [json_str]
-                except (json.JSONDecodeError, ValueError):
-                    pass
-
-            return {
-                "messages": [AIMessage(content=output)],
-                "next": "FINISH",
-                "visualizations": visualizations,
-            }
-
+    async def asegmentation_node(state: AgentState) -> Dict[str, Any]:
+        """
+        Async variant of segmentation_node (awaits the ReAct agent).
+        """
+        messages = compact_history(state.get("messages", []), AGENT_HISTORY_TOKENS)
+        try:
+            result = await agent.ainvoke(
+                {"messages": messages}, config={"recursion_limit": 100}
+            )
+            return _respond(result)
         except Exception as e:
-            error_msg = f"Segmentation analysis error: {str(e)}"
-            return {
-                "messages": [AIMessage(content=error_msg)],
-                "next": "FINISH",
-                "visualizations": visualizations,
-            }
+            return _error(e)
 
-    return segmentation_node
+    return RunnableLambda(segmentation_node, afunc=asegmentation_node)
@@ -4,12 +4,18 @@ Uses LLM to analyze the query and determine the appropriate handler.
 """
 
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple, Union
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.types import Send
 
-from src.utils.prompt_loader import load_prompt, get_schema_string
+from src.utils.prompt_loader import load_prompt
+from src.utils.catalog import get_catalog
+from src.utils.history import compact_history, SUPERVISOR_HISTORY_TOKENS
 from src.utils.llm_config import get_llm, DEFAULT_MODEL
 from src.states.state import AgentState
+from src.agents.router import AGENTS, get_router
+from src.agents.merge import PARALLEL, branch_input
 
 
 def create_supervisor_node(model_name: str = DEFAULT_MODEL):
@@ -20,44 +26,84 @@ def create_supervisor_node(model_name: str = DEFAULT_MODEL):
         model_name: Gemini model to use for routing decisions
 
     Returns:
-        A function that takes AgentState and returns updated state with routing decision
+        A runnable node (sync and async) that takes AgentState and returns
+        updated state with routing decision
     """
-    llm = get_llm(model_name)
+    # The routing model is fetched on first use (fast-path turns never need it)
+    router = get_router()
 
-    def supervisor_node(state: AgentState) -> Dict[str, Any]:
+    def _prepare(
+        state: AgentState,
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[List], str]:
         """
-        Analyze user query and route to appropriate agent.
+        Resolve the turn without the LLM when possible.
 
-        Returns updated state with 'next' field set to one of:
-        - "AB_Agent"
-        - "Segmentation_Agent"
-        - "General_Agent"
-        - "FINISH"
+        Returns:
+            (state update, None, question) when routed locally, otherwise
+            (None, messages for the routing LLM call, question)
         """
-        # Get the database schema for context
-        try:
-            schema = get_schema_string()
-        except Exception:
-            schema = "Schema unavailable - database not initialized"
-
-        # Load the supervisor prompt with schema injected
-        system_prompt = load_prompt("supervisor_prompt.md", schema=schema)
-
         # Get the last user message
         messages = state.get("messages", [])
         if not messages:
-            return {
-                "next": "FINISH",
-                "messages": [AIMessage(content="No query provided.")],
-            }
+            return (
+                {
+                    "next": "FINISH",
+                    "messages": [AIMessage(content="No query provided.")],
+                },
+                None,
+                "",
+            )
+
+        question = next(
+            (m.content for m in reversed(messages) if isinstance(m, HumanMessage)),
+            "",
+        )
+        if isinstance(question, list):
+            question = " ".join(
+                block.get("text", "")
+                for block in question
+                if isinstance(block, dict) and "text" in block
+            )
+
+        # Fast path: route locally when confident (no LLM round trip)
+        fast_decision = router.route(str(question), state.get("active_agent"))
+        if fast_decision:
+            next_agent, reasoning = fast_decision
+            return (
+                {
+                    "next": next_agent,
+                    "active_agent": next_agent,
+                    "messages": [
+                        AIMessage(
+                            content=f"Routing to {next_agent}. Reason: {reasoning}"
+                        )
+                    ],
+                },
+                None,
+                question,
+            )
+
+        # Supervisor prompt with schema injected (memoized per schema version)
+        try:
+            system_prompt = get_catalog().render_prompt("supervisor_prompt.md")
+        except Exception:
+            system_prompt = load_prompt(
+                "supervisor_prompt.md",
+                schema="Schema unavailable - database not initialized",
+            )
 
         # Build conversation for LLM
-        # Include system prompt and all messages
-        llm_messages = [SystemMessage(content=system_prompt)] + messages
+        # Include system prompt and the token-budgeted history
+        llm_messages = [SystemMessage(content=system_prompt)] + compact_history(
+            messages, SUPERVISOR_HISTORY_TOKENS
+        )
 
-        # Get routing decision
-        response = llm.invoke(llm_messages)
+        return None, llm_messages, question
 
+    def _decide(response, state: AgentState, question: str) -> Dict[str, Any]:
+        """
+        Parse the routing LLM's response into a state update.
+        """
         # Parse the JSON response
         try:
             # Extract content, handling potential list format (multimodal)
@@ -82,6 +128,29 @@ def create_supervisor_node(model_name: str = DEFAULT_MODEL):
             reasoning = decision.get("reasoning", "")
             finish_message = decision.get("message", "")
 
+            if isinstance(next_agent, list):
+                # Compound question: several specialists, each on its sub-task
+                agents = list(dict.fromkeys(a for a in next_agent if a in AGENTS))
+                if len(agents) > 1:
+                    tasks = decision.get("tasks") or {}
+                    branches = [
+                        {"agent": agent, "task": str(tasks.get(agent, ""))}
+                        for agent in agents
+                    ]
+                    return {
+                        "next": PARALLEL,
+                        "branches": branches,
+                        "branch_results": None,
+                        "active_agent": agents[0],
+                        "messages": [
+                            AIMessage(
+                                content=f"Routing to {', '.join(agents)} in "
+                                f"parallel. Reason: {reasoning}"
+                            )
+                        ],
+                    }
+                next_agent = agents[0] if agents else "General_Agent"
+
             # Validate next agent
             valid_agents = ["AB_Agent", "Segmentation_Agent", "General_Agent", "FINISH"]
             if next_agent not in valid_agents:
@@ -92,9 +161,16 @@ def create_supervisor_node(model_name: str = DEFAULT_MODEL):
                 response_content = finish_message or "Analysis not supported."
             else:
                 response_content = f"Routing to {next_agent}. Reason: {reasoning}"
+                # Log the decision as training data for the fast-path router
+                router.record(str(question), next_agent)
 
             return {
                 "next": next_agent,
+                "active_agent": (
+                    next_agent
+                    if next_agent != "FINISH"
+                    else state.get("active_agent", "")
+                ),
                 "messages": [AIMessage(content=response_content)],
             }
 
@@ -120,15 +196,52 @@ def create_supervisor_node(model_name: str = DEFAULT_MODEL):
 
             return {
                 "next": next_agent,
+                "active_agent": next_agent,
                 "messages": [AIMessage(content=f"Routing to {next_agent}")],
             }
 
-    return supervisor_node
+    def supervisor_node(state: AgentState) -> Dict[str, Any]:
+        """
+        Analyze user query and route to appropriate agent.
+
+        Returns updated state with 'next' field set to one of:
+        - "AB_Agent"
+        - "Segmentation_Agent"
+        - "General_Agent"
+        - "FINISH"
+        """
+        update, llm_messages, question = _prepare(state)
+        if update is None:
+            # Get routing decision
+            response = get_llm(model_name).invoke(llm_messages)
+            update = _decide(response, state, question)
+        # Single-agent turns must not inherit a previous fan-out
+        update.setdefault("branches", [])
+        return update
+
+    async def asupervisor_node(state: AgentState) -> Dict[str, Any]:
+        """
+        Async variant of supervisor_node (awaits the routing LLM call).
+        """
+        update, llm_messages, question = _prepare(state)
+        if update is None:
+            response = await get_llm(model_name).ainvoke(llm_messages)
+            update = _decide(response, state, question)
+        update.setdefault("branches", [])
+        return update
+
+    return RunnableLambda(supervisor_node, afunc=asupervisor_node)
 
 
-def get_next_agent(state: AgentState) -> str:
+def get_next_agent(state: AgentState) -> Union[str, List[Send]]:
     """
     Router function for LangGraph conditional edges.
-    Returns the next agent name from state.
+    Returns the next agent name from state, or one Send per branch when the
+    supervisor dispatched several agents in parallel.
     """
+    if state.get("next") == PARALLEL:
+        return [
+            Send(branch["agent"], branch_input(state, branch))
+            for branch in state.get("branches", [])
+        ]
     return state.get("next", "FINISH")
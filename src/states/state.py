@@ -2,11 +2,22 @@
 State definitions for the Data Science Agent System.
 Defines the AgentState TypedDict used across all agents.
 """
-from typing import TypedDict, List, Annotated
+from typing import TypedDict, List, Annotated, Dict, Any, Optional
 from langchain_core.messages import BaseMessage
 import operator
 
 
+def merge_branch_results(
+    left: Optional[List[Dict[str, Any]]], right: Optional[List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """
+    Reducer for branch_results: parallel branches append, None resets.
+    """
+    if right is None:
+        return []
+    return (left or []) + right
+
+
 class AgentState(TypedDict):
     """
     Shared state across all agents in the LangGraph workflow.
@@ -14,8 +25,16 @@ class AgentState(TypedDict):
     Attributes:
         messages: List of conversation messages (HumanMessage, AIMessage, etc.)
         next: The next agent to route to (or "FINISH" to end)
-        visualizations: Accumulated Plotly JSON strings for frontend rendering
+        visualizations: Artifacts of the latest turn for frontend rendering
+            (image paths, Plotly figure JSON, table JSON)
+        active_agent: Specialist that handled the latest turn (for sticky routing)
+        branches: Specialists dispatched in parallel this turn (empty when one
+            agent handles the turn)
+        branch_results: Answers of the parallel branches, combined by Merge
     """
     messages: Annotated[List[BaseMessage], operator.add]
     next: str
     visualizations: List[str]
+    active_agent: str
+    branches: List[str]
+    branch_results: Annotated[List[Dict[str, Any]], merge_branch_results]
@@ -3,65 +3,127 @@ Analysis tools for the Data Science Agent System.
 Provides SQL query execution and Python REPL for data analysis.
 """
 
-import pandas as pd
-from sqlalchemy import create_engine, text
-from langchain_core.tools import tool
-from langchain_experimental.utilities import PythonREPL
-from typing import Optional
+import asyncio
+from langchain_core.tools import StructuredTool
+from typing import List, Optional, Tuple
 
+from src.utils.db import DB_PATH, get_engine
+from src.utils.result_encoder import encode_result, encode_rows
+from src.utils.index_advisor import INDEX_ADVISOR_ENABLED, get_index_advisor
+from src.utils.sql_cache import SQL_CACHE_ENABLED, get_data_version, get_sql_cache
+from src.tools.worker_pool import get_worker_pool
+from src.tools.frame_store import get_frame_store, read_frame
+from src.utils.artifacts import Artifact, describe_artifacts
+from src.utils.tracing import annotate
 
-# Default database path
-DB_PATH = "ecommerce.db"
+# Rows shown when a result is kept as a frame instead of returned as text
+FRAME_PREVIEW_ROWS = 5
 
-# Initialize Python REPL
-_python_repl = PythonREPL()
 
-
-@tool
-def sql_tool(query: str, db_path: str = DB_PATH) -> str:
+def _run_sql(query: str, db_path: str = DB_PATH, keep_frame: bool = False) -> str:
     """
     Execute a SQL query against the ecommerce SQLite database.
     Use this tool to extract data before performing analysis.
 
+    Set keep_frame=True when the rows will be analyzed in python_tool: the full
+    result is kept as a DataFrame and a short handle (e.g. 'df_1') is returned.
+    Load it in python_tool with: df = load_frame('df_1')
+
     Args:
         query: SQL query to execute (SELECT queries only for safety)
         db_path: Path to the SQLite database (default: ecommerce.db)
+        keep_frame: Keep the result as a DataFrame for python_tool
 
     Returns:
-        Query results as a formatted string (CSV-like format)
+        Query results as compact CSV. Large results are truncated and end
+        with the total row count and per-column summary statistics.
+        With keep_frame=True, the frame handle, its shape and a preview.
     """
     try:
-        engine = create_engine(f"sqlite:///{db_path}")
-
         # Basic SQL injection prevention - only allow SELECT
         query_upper = query.strip().upper()
         if not query_upper.startswith("SELECT"):
             return "Error: Only SELECT queries are allowed for safety."
 
-        df = pd.read_sql(query, engine)
+        # Every query counts for the index advisor, cache hits included
+        _advise(query, db_path)
+
+        if keep_frame:
+            return _keep_frame(query, db_path)
 
-        if df.empty:
-            return "Query returned no results."
+        # Serve repeated queries from the cache while the data is unchanged
+        cache = get_sql_cache()
+        if SQL_CACHE_ENABLED:
+            key = cache.make_key(query, db_path)
+            token = get_data_version(db_path)
+            cached = cache.get(key, token)
+            if cached is not None:
+                annotate(cache_hit=True)
+                return cached
 
-        # Return as string for LLM processing
-        return df.to_string(index=False)
+        # Pooled, read-only engine shared across calls
+        engine = get_engine(db_path)
+
+        # Stream rows into a size-bounded encoding for LLM processing
+        with engine.connect() as conn:
+            output = encode_result(conn, query)
+
+        if SQL_CACHE_ENABLED:
+            cache.put(key, token, output)
+        return output
 
     except Exception as e:
         return f"SQL Error: {str(e)}"
 
 
-@tool
-def python_tool(code: str) -> str:
+def _advise(query: str, db_path: str) -> None:
+    """Log the query plan with the index advisor (never fails the query)."""
+    if not INDEX_ADVISOR_ENABLED:
+        return
+    try:
+        get_index_advisor().observe(None, query, db_path)
+    except Exception:
+        pass
+
+
+def _keep_frame(query: str, db_path: str) -> str:
+    """Run a query into the frame registry and describe the new handle."""
+    with get_engine(db_path).connect() as conn:
+        df = read_frame(conn, query)
+
+    handle = get_frame_store().put(df)
+    annotate(rows=len(df))
+    preview, _ = encode_rows(
+        list(df.columns), df.head(FRAME_PREVIEW_ROWS).itertuples(index=False)
+    )
+    dtypes = ", ".join(f"{col}:{dtype}" for col, dtype in df.dtypes.items())
+    return (
+        f"Saved result as frame '{handle}' ({len(df)} rows x {len(df.columns)} columns).\n"
+        f"Load it in python_tool with: df = load_frame('{handle}')\n"
+        f"Columns: {dtypes}\n"
+        "Preview:\n" + "\n".join(preview)
+    )
+
+
+async def _arun_sql(
+    query: str, db_path: str = DB_PATH, keep_frame: bool = False
+) -> str:
+    """Async variant of sql_tool: SQLite work is offloaded to a thread."""
+    return await asyncio.to_thread(_run_sql, query, db_path, keep_frame)
+
+
+def _run_python(code: str) -> Tuple[str, List[Artifact]]:
     """
     Execute Python code for data analysis, statistical tests, and visualization.
     Use this after fetching data with sql_tool.
 
-    Execute Python code for data analysis, statistical tests, and visualization.
-    Use this after fetching data with sql_tool.
+    To analyze a result saved by sql_tool(keep_frame=True), use
+    df = load_frame('df_1') instead of copying rows into the code.
 
-    IMPORTANT: For visualizations, use matplotlib or seaborn.
-    Save the plot to a file named 'plots/plot_TIMESTAMP.png' (use current timestamp).
-    PRINT the filename in the format: "IMAGE_GENERATED: plots/plot_TIMESTAMP.png"
+    IMPORTANT: For visualizations, use matplotlib or seaborn and save the plot
+    to 'plots/plot_TIMESTAMP.png' (use current timestamp); saved images are
+    shown to the user automatically. Display Plotly figures with
+    show_figure(fig) and DataFrames with show_table(df).
 
     Available libraries:
     - pandas as pd
@@ -76,41 +138,46 @@ def python_tool(code: str) -> str:
     Returns:
         Output of the code execution (stdout/result)
     """
-    # Pre-import common libraries
-    setup_code = """
-import pandas as pd
-import numpy as np
-from scipy import stats
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-import plotly.express as px
-import plotly.graph_objects as go
-import matplotlib
-matplotlib.use('Agg') # Required for Streamlit Cloud
-import matplotlib.pyplot as plt
-import seaborn as sns
-import json
-import time
-import os
-
-# Ensure plots directory exists
-os.makedirs('plots', exist_ok=True)
-"""
-
     try:
-        # Run setup imports (silent)
-        _python_repl.run(setup_code)
+        # Sticky per-thread namespace in a warm worker process
+        output, artifacts = get_worker_pool().run(code)
+        return _python_result(output, artifacts)
 
-        # Run the actual code
-        result = _python_repl.run(code)
+    except Exception as e:
+        return f"Python Error: {str(e)}", []
 
-        if result:
-            return result
-        else:
-            return "Code executed successfully (no output)."
 
+async def _arun_python(code: str) -> Tuple[str, List[Artifact]]:
+    """Async variant of python_tool: waits on the worker without blocking the loop."""
+    try:
+        output, artifacts = await get_worker_pool().arun(code)
+        return _python_result(output, artifacts)
     except Exception as e:
-        return f"Python Error: {str(e)}"
+        return f"Python Error: {str(e)}", []
+
+
+def _python_result(
+    output: str, artifacts: List[Artifact]
+) -> Tuple[str, List[Artifact]]:
+    """Tool content for the model plus the artifacts as the tool's artifact."""
+    content = "\n".join(
+        part for part in (output.rstrip(), describe_artifacts(artifacts)) if part
+    )
+    return content or "Code executed successfully (no output).", artifacts
+
+
+# Tools expose both sync (invoke) and async (ainvoke) entry points
+sql_tool = StructuredTool.from_function(
+    func=_run_sql, coroutine=_arun_sql, name="sql_tool"
+)
+# python_tool returns (content, artifacts): images, Plotly specs and tables
+# travel on ToolMessage.artifact instead of being parsed out of the text
+python_tool = StructuredTool.from_function(
+    func=_run_python,
+    coroutine=_arun_python,
+    name="python_tool",
+    response_format="content_and_artifact",
+)
 
 
 def get_sql_tool():
@@ -0,0 +1,197 @@
+"""
+Per-thread registry of query results kept as DataFrames.
+Lets sql_tool hand python_tool a short handle instead of text the LLM must copy.
+Frames are shared by reference only with in-process kernels (PYTHON_WORKERS=0);
+worker processes receive a pickled copy of each frame once per thread.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from src.utils.checkpointer import on_thread_deleted
+from src.utils.context import get_thread_id
+
+# Limits per conversation thread (override via environment)
+FRAME_MAX_ROWS = int(os.getenv("FRAME_MAX_ROWS", "5000000"))
+FRAMES_PER_THREAD = int(os.getenv("FRAMES_PER_THREAD", "16"))
+# Limits of the whole registry: least recently used threads are dropped first
+FRAME_MAX_THREADS = int(os.getenv("FRAME_MAX_THREADS", "64"))
+FRAME_MAX_BYTES = int(os.getenv("FRAME_MAX_BYTES", str(1024 * 1024 * 1024)))
+# Threads whose frames were not used for this long are dropped
+FRAME_TTL_SECONDS = float(os.getenv("FRAME_TTL_SECONDS", "3600"))
+
+
+def _has_pyarrow() -> bool:
+    """Arrow-backed columns are used when the optional pyarrow is installed."""
+    try:
+        import pyarrow  # noqa: F401
+
+        return True
+    except ImportError:
+        return False
+
+
+def read_frame(conn, query: str, max_rows: int = FRAME_MAX_ROWS):
+    """
+    Run a query into a columnar DataFrame.
+
+    Args:
+        conn: SQLAlchemy connection
+        query: SELECT statement to execute
+        max_rows: Refuse results larger than this many rows
+
+    Returns:
+        pandas DataFrame with Arrow-backed columns if pyarrow is installed,
+        NumPy-backed otherwise
+
+    Raises:
+        ValueError: If the result exceeds max_rows
+    """
+    import pandas as pd
+
+    result = conn.exec_driver_sql(query)
+    columns = list(result.keys()) if result.returns_rows else []
+    rows = result.fetchmany(max_rows + 1) if result.returns_rows else []
+    result.close()
+    if len(rows) > max_rows:
+        raise ValueError(
+            f"Result exceeds {max_rows} rows; aggregate in SQL before keeping a frame"
+        )
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    if _has_pyarrow():
+        df = df.convert_dtypes(dtype_backend="pyarrow")
+    return df
+
+
+def _frame_bytes(df) -> int:
+    """Memory held by a frame's columns (object values are not inspected)."""
+    try:
+        return int(df.memory_usage(index=True).sum())
+    except Exception:
+        return 0
+
+
+class FrameStore:
+    """
+    Thread-safe registry of DataFrames grouped by conversation thread.
+
+    Handles are short, per-thread names (df_1, df_2, ...). Each thread keeps
+    at most FRAMES_PER_THREAD frames; the oldest is dropped first. Across
+    threads the registry holds at most max_threads threads and max_bytes of
+    frames: threads idle for ttl_seconds go first, then the least recently
+    used ones. The thread being served always keeps its newest frame.
+    """
+
+    def __init__(
+        self,
+        frames_per_thread: int = FRAMES_PER_THREAD,
+        max_threads: int = FRAME_MAX_THREADS,
+        max_bytes: int = FRAME_MAX_BYTES,
+        ttl_seconds: float = FRAME_TTL_SECONDS,
+    ):
+        self.frames_per_thread = frames_per_thread
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # thread_id -> {handle: DataFrame}, least recently used thread first
+        self._frames = OrderedDict()
+        # Kept when a thread is evicted so its handles are never reused
+        self._counters: Dict[str, int] = {}
+        self._sizes: Dict[Tuple[str, str], int] = {}
+        self._last_used: Dict[str, float] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _touch(self, thread_id: str) -> None:
+        self._frames.move_to_end(thread_id)
+        self._last_used[thread_id] = time.monotonic()
+
+    def _pop_frame(self, thread_id: str, handle: str) -> None:
+        del self._frames[thread_id][handle]
+        self._bytes -= self._sizes.pop((thread_id, handle), 0)
+
+    def _pop_thread(self, thread_id: str) -> None:
+        for handle in list(self._frames.pop(thread_id, {})):
+            self._bytes -= self._sizes.pop((thread_id, handle), 0)
+        self._last_used.pop(thread_id, None)
+
+    def _evict(self, current: str) -> None:
+        """Apply the TTL and the thread/byte limits, sparing `current` last."""
+        deadline = time.monotonic() - self.ttl_seconds
+        for thread_id in [t for t in self._frames if t != current]:
+            if self._last_used.get(thread_id, 0) < deadline:
+                self._pop_thread(thread_id)
+        while len(self._frames) > 1 and (
+            len(self._frames) > self.max_threads or self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._frames))
+            self._pop_thread(oldest if oldest != current else list(self._frames)[1])
+        frames = self._frames.get(current, {})
+        while self._bytes > self.max_bytes and len(frames) > 1:
+            self._pop_frame(current, next(iter(frames)))
+
+    def put(self, df, thread_id: Optional[str] = None) -> str:
+        """Register a frame and return its handle."""
+        thread_id = thread_id or get_thread_id()
+        size = _frame_bytes(df)
+        with self._lock:
+            frames = self._frames.setdefault(thread_id, OrderedDict())
+            self._touch(thread_id)
+            self._counters[thread_id] = self._counters.get(thread_id, 0) + 1
+            handle = f"df_{self._counters[thread_id]}"
+            frames[handle] = df
+            self._sizes[(thread_id, handle)] = size
+            self._bytes += size
+            while len(frames) > self.frames_per_thread:
+                self._pop_frame(thread_id, next(iter(frames)))
+            self._evict(thread_id)
+        return handle
+
+    def get(self, handle: str, thread_id: Optional[str] = None):
+        """Get a frame by handle (KeyError if unknown or evicted)."""
+        thread_id = thread_id or get_thread_id()
+        with self._lock:
+            frames = self._frames.get(thread_id, {})
+            if frames:
+                self._touch(thread_id)
+            if handle not in frames:
+                raise KeyError(
+                    f"Unknown frame handle '{handle}'. "
+                    f"Available: {', '.join(frames) or 'none'}"
+                )
+            return frames[handle]
+
+    def handles(self, thread_id: Optional[str] = None) -> Dict[str, Tuple[int, int]]:
+        """List handles of a thread with their (rows, columns) shapes."""
+        thread_id = thread_id or get_thread_id()
+        with self._lock:
+            return {h: df.shape for h, df in self._frames.get(thread_id, {}).items()}
+
+    def drop_thread(self, thread_id: str) -> None:
+        """Forget all frames of a conversation thread."""
+        with self._lock:
+            self._pop_thread(thread_id)
+            self._counters.pop(thread_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Get the number of threads and frames held and their bytes."""
+        with self._lock:
+            return {
+                "threads": len(self._frames),
+                "frames": len(self._sizes),
+                "bytes": self._bytes,
+            }
+
+
+# Process-wide frame registry shared by sql_tool and python_tool
+_frame_store = FrameStore()
+# Conversations removed by the checkpointer's retention policy release frames
+on_thread_deleted(_frame_store.drop_thread)
+
+
+def get_frame_store() -> FrameStore:
+    """Get the process-wide frame registry."""
+    return _frame_store
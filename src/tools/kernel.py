@@ -0,0 +1,218 @@
+"""
+Persistent Python kernel for the python_tool.
+Initializes the REPL namespace once and imports heavy libraries on first use.
+"""
+
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from io import StringIO
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+
+from src.utils.artifacts import (
+    Artifact,
+    capture_artifacts,
+    install_savefig_hook,
+    show_figure,
+    show_table,
+)
+
+if TYPE_CHECKING:
+    # PythonREPL is imported when the first kernel is created
+    from langchain_experimental.utilities import PythonREPL
+
+# Run once when the kernel starts (cheap, always-needed libraries)
+INIT_CODE = """
+import pandas as pd
+import numpy as np
+import json
+import time
+import os
+import matplotlib
+matplotlib.use('Agg') # Required for Streamlit Cloud
+
+# Ensure plots directory exists
+os.makedirs('plots', exist_ok=True)
+"""
+
+# Names exposed lazily: imported only when the submitted code references them
+LAZY_IMPORTS = {
+    "stats": "from scipy import stats",
+    "KMeans": "from sklearn.cluster import KMeans",
+    "StandardScaler": "from sklearn.preprocessing import StandardScaler",
+    "px": "import plotly.express as px",
+    "go": "import plotly.graph_objects as go",
+    "plt": "import matplotlib.pyplot as plt",
+    "sns": "import seaborn as sns",
+}
+
+_LAZY_NAME_RE = re.compile(r"\b(" + "|".join(map(re.escape, LAZY_IMPORTS)) + r")\b")
+
+# Output buffer of the execution running in this context
+_capture: ContextVar[Optional[StringIO]] = ContextVar("kernel_stdout", default=None)
+_stdout_lock = threading.Lock()
+
+
+class _RoutedStdout:
+    """
+    sys.stdout replacement that sends writes to the calling context's buffer.
+
+    Kernels running concurrently in one process (PYTHON_WORKERS=0) each see
+    only their own output; writes outside an execution reach the original
+    stream.
+    """
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+
+    def _target(self):
+        buffer = _capture.get()
+        return self._fallback if buffer is None else buffer
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def __getattr__(self, name: str):
+        return getattr(self._target(), name)
+
+
+def _route_stdout() -> None:
+    """Install the routing stream (again, if something replaced sys.stdout)."""
+    with _stdout_lock:
+        if not isinstance(sys.stdout, _RoutedStdout):
+            sys.stdout = _RoutedStdout(sys.stdout)
+
+
+class PythonKernel:
+    """
+    Long-lived wrapper around a PythonREPL namespace.
+
+    The namespace is initialized on the first call and kept for the lifetime
+    of the kernel; later calls only pay for lazy imports of libraries they
+    have not used before.
+    """
+
+    def __init__(self, repl: Optional["PythonREPL"] = None):
+        if repl is None:
+            from langchain_experimental.utilities import PythonREPL
+
+            repl = PythonREPL()
+        self.repl = repl
+        # Frames handed over by sql_tool (handle -> DataFrame)
+        self.frames: Dict[str, Any] = {}
+        self._initialized = False
+        self._lock = threading.RLock()
+        self._stats = {
+            "calls": 0,
+            "init_seconds": 0.0,
+            "lazy_import_seconds": 0.0,
+            "exec_seconds": 0.0,
+            "overhead_seconds": 0.0,
+            "last_overhead_ms": 0.0,
+            "lazy_imports": [],
+        }
+
+    @property
+    def namespace(self) -> Dict[str, Any]:
+        """Variables visible to executed code."""
+        return self.repl.locals
+
+    def _exec(self, code: str) -> str:
+        """Execute code in the kernel namespace and capture stdout."""
+        _route_stdout()
+        buffer = StringIO()
+        token = _capture.set(buffer)
+        try:
+            exec(code, self.repl.globals, self.repl.locals)
+            return buffer.getvalue()
+        except Exception as e:
+            return buffer.getvalue() + repr(e)
+        finally:
+            _capture.reset(token)
+
+    def start(self) -> None:
+        """Initialize the namespace (idempotent)."""
+        with self._lock:
+            if self._initialized:
+                return
+            start = time.perf_counter()
+            self._exec(INIT_CODE)
+            install_savefig_hook()
+            self.namespace["load_frame"] = self.load_frame
+            self.namespace["show_figure"] = show_figure
+            self.namespace["show_table"] = show_table
+            self._initialized = True
+            self._stats["init_seconds"] = time.perf_counter() - start
+
+    def load_frame(self, handle: str):
+        """
+        Get a frame saved by sql_tool(keep_frame=True).
+
+        Returns a shallow copy, so the frame held by this kernel is not
+        copied again but cannot be modified by the caller's code. Kernels in
+        worker processes hold a copy unpickled from the parent's frame.
+        """
+        if handle not in self.frames:
+            raise KeyError(
+                f"Unknown frame handle '{handle}'. "
+                f"Available: {', '.join(self.frames) or 'none'}"
+            )
+        return self.frames[handle].copy(deep=False)
+
+    def _ensure_imports(self, code: str) -> None:
+        """Import the lazily exposed libraries referenced by code."""
+        namespace = self.namespace
+        for name in set(_LAZY_NAME_RE.findall(code)):
+            if name in namespace:
+                continue
+            start = time.perf_counter()
+            self._exec(LAZY_IMPORTS[name])
+            self._stats["lazy_import_seconds"] += time.perf_counter() - start
+            self._stats["lazy_imports"].append(name)
+
+    def run(self, code: str) -> Tuple[str, List[Artifact]]:
+        """
+        Run code in the persistent namespace.
+
+        Args:
+            code: Python code to execute
+
+        Returns:
+            (captured stdout or the exception repr on failure, artifacts
+            registered by the code: saved images, show_figure/show_table)
+        """
+        with self._lock:
+            call_start = time.perf_counter()
+            self.start()
+            code = type(self.repl).sanitize_input(code)
+            self._ensure_imports(code)
+
+            exec_start = time.perf_counter()
+            with capture_artifacts() as artifacts:
+                output = self._exec(code)
+            exec_end = time.perf_counter()
+
+            overhead = exec_start - call_start
+            self._stats["calls"] += 1
+            self._stats["exec_seconds"] += exec_end - exec_start
+            self._stats["overhead_seconds"] += overhead
+            self._stats["last_overhead_ms"] = round(overhead * 1000, 3)
+            return output, artifacts
+
+    def stats(self) -> Dict[str, Any]:
+        """Get per-call overhead statistics."""
+        calls = self._stats["calls"]
+        return {
+            **self._stats,
+            "lazy_imports": list(self._stats["lazy_imports"]),
+            "avg_overhead_ms": (
+                round(self._stats["overhead_seconds"] / calls * 1000, 3)
+                if calls
+                else 0.0
+            ),
+        }
@@ -0,0 +1,328 @@
+"""
+Native RFM segmentation tool for the Segmentation agent.
+Computes recency/frequency/monetary in one SQL aggregate, clusters the scaled
+NumPy features with MiniBatchKMeans and returns compact segment profiles.
+"""
+
+import asyncio
+import os
+from typing import Dict, Any, List, Optional, Tuple
+
+from langchain_core.tools import StructuredTool
+
+from src.tools.frame_store import get_frame_store
+from src.utils.db import DB_PATH, get_engine
+from src.utils.result_encoder import encode_rows
+from src.utils.tracing import annotate
+
+# Range of cluster counts tried; the best silhouette score wins
+RFM_MIN_K = int(os.getenv("RFM_MIN_K", "2"))
+RFM_MAX_K = int(os.getenv("RFM_MAX_K", "6"))
+# Customers sampled for the silhouette score (pairwise distances are O(n^2))
+RFM_SILHOUETTE_SAMPLE = int(os.getenv("RFM_SILHOUETTE_SAMPLE", "2000"))
+RFM_BATCH_SIZE = int(os.getenv("RFM_BATCH_SIZE", "4096"))
+RFM_RANDOM_STATE = 42
+
+# Recency is measured against the latest order in the data, not the wall
+# clock, so a historical dataset does not make every customer look lapsed
+_SUMMARY_SQL = """
+    SELECT
+        user_id,
+        julianday((SELECT MAX(last_order_at) FROM user_rfm))
+            - julianday(last_order_at) AS recency_days,
+        frequency,
+        monetary
+    FROM user_rfm
+"""
+_ORDERS_SQL = """
+    WITH per_user AS (
+        SELECT user_id, MAX(created_at) AS last_order_at,
+               COUNT(*) AS frequency, SUM(price_usd) AS monetary
+        FROM orders
+        GROUP BY user_id
+    )
+    SELECT
+        user_id,
+        julianday((SELECT MAX(last_order_at) FROM per_user))
+            - julianday(last_order_at) AS recency_days,
+        frequency,
+        monetary
+    FROM per_user
+"""
+FEATURES = ["recency_days", "frequency", "monetary"]
+
+
+def _use_summary(conn) -> bool:
+    """True when the user_rfm summary table exists and is up to date."""
+    exists = conn.exec_driver_sql(
+        "SELECT COUNT(*) FROM sqlite_master "
+        "WHERE name IN ('user_rfm', 'summary_state')"
+    ).scalar()
+    if exists < 2:
+        return False
+    dirty = conn.exec_driver_sql(
+        "SELECT dirty FROM summary_state WHERE name = 'user_rfm'"
+    ).scalar()
+    return dirty == 0
+
+
+def load_rfm(db_path: str = DB_PATH):
+    """
+    Aggregate recency, frequency and monetary value per customer.
+
+    Args:
+        db_path: Path to the SQLite database
+
+    Returns:
+        Tuple of (user ids, float matrix with FEATURES columns, source table)
+    """
+    import numpy as np
+
+    with get_engine(db_path).connect() as conn:
+        source = "user_rfm" if _use_summary(conn) else "orders"
+        rows = conn.exec_driver_sql(
+            _SUMMARY_SQL if source == "user_rfm" else _ORDERS_SQL
+        ).fetchall()
+    data = np.asarray(rows, dtype=np.float64).reshape(-1, len(FEATURES) + 1)
+    return data[:, 0].astype(np.int64), data[:, 1:], source
+
+
+def scale(values):
+    """
+    Standardize RFM features for clustering.
+
+    Frequency and monetary value are heavy-tailed, so they are log-scaled
+    before the z-score; constant columns are left at zero.
+    """
+    import numpy as np
+
+    X = values.copy()
+    X[:, 1:] = np.log1p(np.clip(X[:, 1:], 0, None))
+    std = X.std(axis=0)
+    return (X - X.mean(axis=0)) / np.where(std > 0, std, 1.0)
+
+
+def silhouette(distances, labels, k: int) -> float:
+    """
+    Mean silhouette coefficient from a precomputed distance matrix.
+
+    Args:
+        distances: (n, n) pairwise distances of the sampled points
+        labels: Cluster of each sampled point
+        k: Number of clusters
+
+    Returns:
+        Score in [-1, 1]; points alone in their cluster count as 0
+    """
+    import numpy as np
+
+    n = len(labels)
+    one_hot = np.zeros((n, k))
+    one_hot[np.arange(n), labels] = 1.0
+    counts = one_hot.sum(axis=0)
+    # Summed distance from every point to every cluster in one product
+    totals = distances @ one_hot
+    own = counts[labels]
+    a = totals[np.arange(n), labels] / np.maximum(own - 1, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_other = totals / counts
+    mean_other[np.arange(n), labels] = np.inf
+    mean_other[:, counts == 0] = np.inf
+    b = mean_other.min(axis=1)
+    scores = np.where(own > 1, (b - a) / np.maximum(np.maximum(a, b), 1e-12), 0.0)
+    return float(scores.mean())
+
+
+def _centers(X, labels, k: int):
+    """Mean scaled features per cluster (zeros for empty clusters)."""
+    import numpy as np
+
+    counts = np.maximum(np.bincount(labels, minlength=k), 1)
+    return (
+        np.stack(
+            [np.bincount(labels, weights=X[:, i], minlength=k) for i in range(3)],
+            axis=1,
+        )
+        / counts[:, None]
+    )
+
+
+def _name_segments(centers) -> List[str]:
+    """Name clusters from their scaled centers (recency, frequency, monetary)."""
+    names = []
+    for recency, frequency, monetary in centers:
+        recent = recency < 0
+        valuable = frequency > 0 or monetary > 0
+        if recent and frequency > 0 and monetary > 0:
+            name = "Champions"
+        elif recent and valuable:
+            name = "Loyal"
+        elif recent:
+            name = "Recent / Promising"
+        elif valuable:
+            name = "At Risk"
+        else:
+            name = "Hibernating"
+        if name in names:
+            name = f"{name} {sum(n.startswith(name) for n in names) + 1}"
+        names.append(name)
+    return names
+
+
+def segment(
+    X, min_k: int = RFM_MIN_K, max_k: int = RFM_MAX_K
+) -> Tuple[Any, Dict[int, float]]:
+    """
+    Cluster customers, choosing k by silhouette score on a fixed sample.
+
+    Args:
+        X: (n, 3) scaled features (see scale())
+        min_k: Smallest number of clusters tried
+        max_k: Largest number of clusters tried
+
+    Returns:
+        Tuple of (cluster label per customer, silhouette score per k tried)
+    """
+    import numpy as np
+    from sklearn.cluster import MiniBatchKMeans
+
+    rng = np.random.default_rng(RFM_RANDOM_STATE)
+    sample = rng.choice(len(X), min(len(X), RFM_SILHOUETTE_SAMPLE), replace=False)
+    S = X[sample]
+    # Distances of the sample are computed once and shared by every k
+    squared = (S**2).sum(axis=1)
+    distances = np.sqrt(
+        np.maximum(squared[:, None] + squared[None, :] - 2 * S @ S.T, 0)
+    )
+
+    scores: Dict[int, float] = {}
+    best = None
+    for k in range(min_k, min(max_k, len(X) - 1) + 1):
+        model = MiniBatchKMeans(
+            n_clusters=k,
+            batch_size=RFM_BATCH_SIZE,
+            n_init=3,
+            random_state=RFM_RANDOM_STATE,
+        ).fit(X)
+        scores[k] = silhouette(distances, model.labels_[sample], k)
+        if best is None or scores[k] > scores[best[0]]:
+            best = (k, model)
+    if best is None:
+        raise ValueError(f"Not enough customers for {min_k} segments")
+    return best[1].labels_, scores
+
+
+def profile(values, labels, names: Optional[List[str]] = None) -> List[Tuple[Any, ...]]:
+    """
+    Summarize each segment, largest first.
+
+    Returns:
+        Rows of (segment, customers, share, avg recency_days, avg frequency,
+        avg monetary, revenue_share)
+    """
+    import numpy as np
+
+    k = int(labels.max()) + 1
+    counts = np.bincount(labels, minlength=k)
+    sums = np.stack(
+        [np.bincount(labels, weights=values[:, i], minlength=k) for i in range(3)],
+        axis=1,
+    )
+    means = sums / np.maximum(counts, 1)[:, None]
+    revenue = max(values[:, 2].sum(), 1e-12)
+    names = names or [str(c) for c in range(k)]
+    rows = [
+        (
+            names[c],
+            int(counts[c]),
+            round(counts[c] / len(labels), 3),
+            round(means[c, 0], 1),
+            round(means[c, 1], 2),
+            round(means[c, 2], 2),
+            round(sums[c, 2] / revenue, 3),
+        )
+        for c in range(k)
+    ]
+    return sorted((row for row in rows if row[1]), key=lambda row: -row[1])
+
+
+def _run_rfm(db_path: str = DB_PATH, keep_frame: bool = True) -> str:
+    """
+    Segment customers by RFM (recency, frequency, monetary) in one call.
+    Prefer this over writing clustering code in python_tool.
+
+    Recency is days since the customer's last order, relative to the latest
+    order in the data. Features are log-scaled and standardized, clustered
+    with MiniBatchKMeans, and the number of segments is chosen by silhouette
+    score.
+
+    Args:
+        db_path: Path to the SQLite database (default: ecommerce.db)
+        keep_frame: Keep per-customer RFM values and segments as a frame
+            for python_tool (e.g. for charts)
+
+    Returns:
+        Segment profiles as compact CSV (customers, share, average RFM
+        values, share of revenue), the silhouette score per k tried and,
+        with keep_frame=True, the frame handle.
+    """
+    try:
+        user_ids, values, source = load_rfm(db_path)
+        annotate(rows=len(user_ids))
+        if len(user_ids) <= RFM_MIN_K:
+            return f"RFM Error: only {len(user_ids)} customers with orders."
+
+        X = scale(values)
+        labels, scores = segment(X)
+        k = int(labels.max()) + 1
+        names = _name_segments(_centers(X, labels, k))
+        lines, _ = encode_rows(
+            [
+                "segment",
+                "customers",
+                "share",
+                "recency_days",
+                "frequency",
+                "monetary",
+                "revenue_share",
+            ],
+            profile(values, labels, names),
+        )
+        tried = ", ".join(f"k={n}: {s:.3f}" for n, s in scores.items())
+        output = [
+            f"RFM segments of {len(user_ids)} customers "
+            f"(from {source}, k={k}, silhouette {scores[k]:.3f}; tried {tried})",
+            *lines,
+        ]
+
+        if keep_frame:
+            import pandas as pd
+
+            df = pd.DataFrame(values, columns=FEATURES)
+            df.insert(0, "user_id", user_ids)
+            df["segment"] = [names[c] for c in labels]
+            handle = get_frame_store().put(df)
+            output.append(
+                f"Per-customer values saved as frame '{handle}' "
+                f"(columns: user_id, {', '.join(FEATURES)}, segment). "
+                f"Load it in python_tool with: df = load_frame('{handle}')"
+            )
+        return "\n".join(output)
+
+    except Exception as e:
+        return f"RFM Error: {str(e)}"
+
+
+async def _arun_rfm(db_path: str = DB_PATH, keep_frame: bool = True) -> str:
+    """Async variant of rfm_segment: the work is offloaded to a thread."""
+    return await asyncio.to_thread(_run_rfm, db_path, keep_frame)
+
+
+rfm_segment = StructuredTool.from_function(
+    func=_run_rfm, coroutine=_arun_rfm, name="rfm_segment"
+)
+
+
+def get_rfm_tool():
+    """Get the RFM segmentation tool instance."""
+    return rfm_segment
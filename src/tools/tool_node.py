@@ -0,0 +1,106 @@
+"""
+Tool execution node for the specialists' ReAct agents.
+Runs a step's sql_tool calls concurrently (bounded) and its python_tool calls in
+the order the model emitted them; results keep the order of the tool calls.
+"""
+
+import asyncio
+import os
+import threading
+from contextvars import ContextVar
+from typing import Callable, Dict, Any, List, Optional
+
+from langgraph.prebuilt import ToolNode
+
+# Tool calls of one step executed at the same time (SQL queries are read-only)
+TOOL_CONCURRENCY = int(os.getenv("TOOL_CONCURRENCY", "4"))
+# Tools sharing state (the thread's Python namespace): run one at a time, in order
+SERIAL_TOOLS = {"python_tool"}
+
+
+class _Step:
+    """
+    Ordering of one step's tool calls.
+
+    Each serial call waits for the previous serial call of the step; other
+    calls only wait for a free slot.
+    """
+
+    def __init__(self, tool_calls: List[Dict[str, Any]], make_event: Callable):
+        self.previous: Dict[str, Optional[str]] = {}
+        self.done: Dict[str, Any] = {}
+        last = None
+        for call in tool_calls:
+            if call["name"] in SERIAL_TOOLS:
+                self.previous[call["id"]] = last
+                self.done[call["id"]] = make_event()
+                last = call["id"]
+        self.slots: Optional[asyncio.Semaphore] = None
+
+
+# Step being executed by the current graph task (copied into worker threads/tasks)
+_current_step: ContextVar[Optional[_Step]] = ContextVar(
+    "current_tool_step", default=None
+)
+
+
+class ConcurrentToolNode(ToolNode):
+    """
+    ToolNode with bounded concurrency and ordered python_tool calls.
+
+    The prebuilt node starts every call of a step at once; python_tool calls
+    then race for the namespace and may run out of order. Here the sync path
+    runs on a pool of TOOL_CONCURRENCY threads and the async path under a
+    semaphore of the same size, while serial tools are chained in call order.
+    Results are combined in tool-call order either way.
+    """
+
+    # Parameter names matter: LangGraph injects `config` and `runtime` by name
+    def _func(self, input, config, runtime):
+        tool_calls, _ = self._parse_input(input)
+        token = _current_step.set(_Step(tool_calls, threading.Event))
+        try:
+            # Bounded pool: calls are submitted in order, so a waiting serial
+            # call's predecessor is always already running or finished
+            config = {**config, "max_concurrency": TOOL_CONCURRENCY}
+            return super()._func(input, config, runtime)
+        finally:
+            _current_step.reset(token)
+
+    async def _afunc(self, input, config, runtime):
+        tool_calls, _ = self._parse_input(input)
+        step = _Step(tool_calls, asyncio.Event)
+        step.slots = asyncio.Semaphore(TOOL_CONCURRENCY)
+        token = _current_step.set(step)
+        try:
+            return await super()._afunc(input, config, runtime)
+        finally:
+            _current_step.reset(token)
+
+    def _run_one(self, call, *args, **kwargs):
+        step = _current_step.get()
+        if step is None or call["id"] not in step.done:
+            return super()._run_one(call, *args, **kwargs)
+        previous = step.previous[call["id"]]
+        if previous is not None:
+            step.done[previous].wait()
+        try:
+            return super()._run_one(call, *args, **kwargs)
+        finally:
+            step.done[call["id"]].set()
+
+    async def _arun_one(self, call, *args, **kwargs):
+        step = _current_step.get()
+        if step is None:
+            return await super()._arun_one(call, *args, **kwargs)
+        if call["id"] not in step.done:
+            async with step.slots:
+                return await super()._arun_one(call, *args, **kwargs)
+        previous = step.previous[call["id"]]
+        try:
+            if previous is not None:
+                await step.done[previous].wait()
+            async with step.slots:
+                return await super()._arun_one(call, *args, **kwargs)
+        finally:
+            step.done[call["id"]].set()
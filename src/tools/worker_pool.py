@@ -0,0 +1,413 @@
+"""
+Process pool for python_tool execution.
+Warm worker processes are forked from a forkserver that has already imported the
+analysis libraries; each conversation thread gets a sticky, isolated namespace.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from src.tools.kernel import PythonKernel
+from src.tools.frame_store import get_frame_store
+from src.utils.artifacts import Artifact
+from src.utils.checkpointer import on_thread_deleted
+from src.utils.context import get_thread_id
+
+# Number of worker processes (0 runs code in-process, still one namespace per thread)
+PYTHON_WORKERS = int(os.getenv("PYTHON_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Seconds before a running call is killed and its worker restarted (0 = no limit)
+PYTHON_TIMEOUT = float(os.getenv("PYTHON_TIMEOUT", "120"))
+# Namespaces kept per worker before the least recently used one is dropped
+MAX_NAMESPACES_PER_WORKER = int(os.getenv("PYTHON_MAX_NAMESPACES", "32"))
+
+# Imported by the forkserver before it forks workers, so they start warm
+PRELOAD_MODULES = [
+    "pandas",
+    "numpy",
+    "matplotlib.figure",
+    "sklearn.cluster",
+    "sklearn.preprocessing",
+]
+
+_LOAD_FRAME_RE = re.compile(r"load_frame\(\s*['\"]([\w-]+)['\"]")
+
+
+def _get_kernel(
+    kernels: "OrderedDict[str, PythonKernel]",
+    thread_id: str,
+    evicted: Optional[List[str]] = None,
+) -> PythonKernel:
+    """
+    Get (or create) the kernel for a thread, evicting the LRU one if full.
+
+    The threads whose kernels were evicted are appended to `evicted`.
+    """
+    kernel = kernels.get(thread_id)
+    if kernel is None:
+        kernel = PythonKernel()
+        kernels[thread_id] = kernel
+        while len(kernels) > MAX_NAMESPACES_PER_WORKER:
+            dropped, _ = kernels.popitem(last=False)
+            if evicted is not None:
+                evicted.append(dropped)
+    kernels.move_to_end(thread_id)
+    return kernel
+
+
+def _worker_main(conn) -> None:
+    """
+    Worker loop: execute requests against per-thread kernels.
+
+    Every reply is (result, evicted thread ids) so the parent can forget
+    which frames it shipped to namespaces that no longer exist.
+    """
+    kernels: "OrderedDict[str, PythonKernel]" = OrderedDict()
+    while True:
+        try:
+            op, thread_id, payload = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        evicted: List[str] = []
+        result = None
+        if op == "run":
+            result = _get_kernel(kernels, thread_id, evicted).run(payload)
+        elif op == "frame":
+            handle, df = payload
+            _get_kernel(kernels, thread_id, evicted).frames[handle] = df
+        elif op == "drop":
+            for dropped in payload:
+                kernels.pop(dropped, None)
+        elif op == "stats":
+            result = {
+                "pid": os.getpid(),
+                "namespaces": list(kernels),
+                "kernels": {tid: k.stats() for tid, k in kernels.items()},
+            }
+        elif op == "stop":
+            break
+        conn.send((result, evicted))
+    conn.close()
+
+
+class _Worker:
+    """
+    Parent-side handle of one worker process.
+
+    `lock` is held for a whole exchange with the process; `frames_sent` is
+    only read or changed under it. Drops are queued under the short
+    `_drops_lock` so callers never wait for a busy worker.
+    """
+
+    def __init__(self, ctx, on_evicted=None):
+        self._ctx = ctx
+        self._on_evicted = on_evicted
+        self.lock = threading.Lock()
+        self.process = None
+        self.conn = None
+        self.frames_sent = set()
+        # Threads whose namespaces are dropped before the next request
+        self.pending_drops = set()
+        self._drops_lock = threading.Lock()
+        self.spawn()
+
+    def spawn(self) -> None:
+        self.frames_sent = set()
+        parent_conn, child_conn = self._ctx.Pipe()
+        self.process = self._ctx.Process(
+            target=_worker_main, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def restart(self) -> None:
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=5)
+        self.conn.close()
+        self.spawn()
+
+    def forget(self, thread_ids) -> None:
+        """Drop the record of frames shipped to these threads' namespaces."""
+        thread_ids = set(thread_ids)
+        self.frames_sent = {
+            sent for sent in self.frames_sent if sent[0] not in thread_ids
+        }
+
+    def queue_drop(self, thread_id: str) -> None:
+        """Drop a thread's namespace ahead of the next request."""
+        with self._drops_lock:
+            self.pending_drops.add(thread_id)
+
+    def _exchange(
+        self,
+        op: str,
+        thread_id: Optional[str],
+        payload,
+        timeout: float,
+        evicted: List[str],
+    ):
+        self.conn.send((op, thread_id, payload))
+        if timeout and not self.conn.poll(timeout):
+            self.restart()
+            raise TimeoutError(f"Execution timed out after {timeout:g}s")
+        try:
+            result, dropped = self.conn.recv()
+        except EOFError:
+            self.restart()
+            raise RuntimeError("Python worker crashed; namespace was reset")
+        if dropped:
+            self.forget(dropped)
+            evicted.extend(dropped)
+        return result
+
+    def request(
+        self,
+        op: str,
+        thread_id: Optional[str],
+        payload=None,
+        timeout: float = 0,
+        frames: Optional[Callable[[str], Any]] = None,
+        handles=(),
+    ):
+        """
+        Send one request and wait for its reply (one in flight per worker).
+
+        Queued drops go first. For "run", the frames in `handles` that the
+        thread's namespace lacks are fetched with `frames` and shipped in the
+        same locked step, so a concurrent restart cannot lose them.
+        """
+        evicted: List[str] = []
+        try:
+            with self.lock:
+                with self._drops_lock:
+                    drops, self.pending_drops = list(self.pending_drops), set()
+                if drops:
+                    self._exchange("drop", None, drops, 0, evicted)
+                    self.forget(drops)
+                for handle in handles:
+                    if (thread_id, handle) in self.frames_sent:
+                        continue
+                    try:
+                        df = frames(handle)
+                    except KeyError:
+                        continue
+                    self._exchange("frame", thread_id, (handle, df), 0, evicted)
+                    self.frames_sent.add((thread_id, handle))
+                return self._exchange(op, thread_id, payload, timeout, evicted)
+        finally:
+            # Outside self.lock: the callback takes the pool's lock
+            if evicted and self._on_evicted is not None:
+                self._on_evicted(self, evicted)
+
+    def stop(self) -> None:
+        """Ask the process to exit and wait for it."""
+        try:
+            with self.lock:
+                self.conn.send(("stop", None, None))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=5)
+
+
+class WorkerPool:
+    """
+    Pool of warm Python worker processes with sticky per-thread namespaces.
+
+    A thread_id is assigned to the least loaded worker the first time it is
+    seen and keeps that worker afterwards, so its variables persist between
+    calls while other conversations run in parallel on other cores.
+    """
+
+    def __init__(self, size: int = PYTHON_WORKERS, timeout: float = PYTHON_TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self._workers: List[_Worker] = []
+        self._assignments: Dict[str, int] = {}
+        self._local_kernels: "OrderedDict[str, PythonKernel]" = OrderedDict()
+        self._local_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._started = False
+        self._stats = {"calls": 0, "timeouts": 0, "crashes": 0, "start_seconds": 0.0}
+
+    def start(self) -> None:
+        """Preload libraries and fork the workers (idempotent)."""
+        with self._lock:
+            if self._started:
+                return
+            start = time.perf_counter()
+            if self.size > 0:
+                # Never fork the serving process itself: by now it runs threads
+                # (SQL pool, router trainer, checkpoint flusher) whose locks a
+                # forked child could inherit held. A forkserver is a clean,
+                # single-threaded process that preloads the libraries once.
+                methods = multiprocessing.get_all_start_methods()
+                if "forkserver" in methods:
+                    ctx = multiprocessing.get_context("forkserver")
+                    ctx.set_forkserver_preload(PRELOAD_MODULES)
+                else:
+                    ctx = multiprocessing.get_context("spawn")
+                self._workers = [
+                    _Worker(ctx, self._forget_assignments) for _ in range(self.size)
+                ]
+            self._started = True
+            self._stats["start_seconds"] = time.perf_counter() - start
+
+    def _forget_assignments(self, worker: _Worker, thread_ids: List[str]) -> None:
+        """Unpin threads whose namespaces a worker evicted."""
+        with self._lock:
+            if worker not in self._workers:
+                return  # shut down meanwhile
+            index = self._workers.index(worker)
+            for thread_id in thread_ids:
+                if self._assignments.get(thread_id) == index:
+                    del self._assignments[thread_id]
+
+    def _worker_for(self, thread_id: str) -> _Worker:
+        """Get the sticky worker for a thread, assigning the least loaded one."""
+        with self._lock:
+            index = self._assignments.get(thread_id)
+            if index is None:
+                load = [0] * self.size
+                for assigned in self._assignments.values():
+                    load[assigned] += 1
+                index = load.index(min(load))
+                self._assignments[thread_id] = index
+        return self._workers[index]
+
+    def run(
+        self, code: str, thread_id: Optional[str] = None
+    ) -> Tuple[str, List[Artifact]]:
+        """
+        Execute code in the namespace of a conversation thread.
+
+        Args:
+            code: Python code to execute
+            thread_id: Conversation thread (default: the current graph run's)
+
+        Returns:
+            (captured stdout, artifacts registered by the code)
+        """
+        self.start()
+        thread_id = thread_id or get_thread_id()
+        self._stats["calls"] += 1
+        handles = set(_LOAD_FRAME_RE.findall(code))
+        store = get_frame_store()
+
+        if self.size <= 0:
+            with self._local_lock:
+                kernel = _get_kernel(self._local_kernels, thread_id)
+            # Same process: the kernel references the stored frames directly
+            for handle in handles:
+                try:
+                    kernel.frames[handle] = store.get(handle, thread_id)
+                except KeyError:
+                    pass
+            return kernel.run(code)
+
+        try:
+            worker = self._worker_for(thread_id)
+            # Each referenced frame is pickled to the worker once; later calls
+            # reuse the worker's copy
+            return worker.request(
+                "run",
+                thread_id,
+                code,
+                timeout=self.timeout,
+                frames=lambda handle: store.get(handle, thread_id),
+                handles=sorted(handles),
+            )
+        except TimeoutError:
+            self._stats["timeouts"] += 1
+            raise
+        except RuntimeError:
+            self._stats["crashes"] += 1
+            raise
+
+    async def arun(
+        self, code: str, thread_id: Optional[str] = None
+    ) -> Tuple[str, List[Artifact]]:
+        """
+        Async variant of run: the event loop is free while the worker executes.
+
+        Args:
+            code: Python code to execute
+            thread_id: Conversation thread (default: the current graph run's)
+
+        Returns:
+            (captured stdout, artifacts registered by the code)
+        """
+        thread_id = thread_id or get_thread_id()
+        return await asyncio.to_thread(self.run, code, thread_id)
+
+    def drop_namespace(self, thread_id: str) -> None:
+        """
+        Free the variables held for a conversation thread.
+
+        Never waits for a busy worker: the drop is sent ahead of the worker's
+        next request.
+        """
+        with self._lock:
+            index = self._assignments.pop(thread_id, None)
+            worker = self._workers[index] if index is not None else None
+        if worker is not None:
+            worker.queue_drop(thread_id)
+        with self._local_lock:
+            self._local_kernels.pop(thread_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool counters and per-worker kernel statistics."""
+        report: Dict[str, Any] = {
+            **self._stats,
+            "size": self.size,
+            "threads": len(self._assignments),
+        }
+        if self.size <= 0:
+            report["workers"] = [
+                {
+                    "pid": os.getpid(),
+                    "namespaces": list(self._local_kernels),
+                    "kernels": {t: k.stats() for t, k in self._local_kernels.items()},
+                }
+            ]
+        else:
+            report["workers"] = [w.request("stats", None) for w in self._workers]
+        return report
+
+    def shutdown(self) -> None:
+        """Stop all worker processes."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+            self._assignments.clear()
+            self._started = False
+        # Not under self._lock: a worker mid-request may need it to forget
+        # evicted threads before it releases its own lock
+        for worker in workers:
+            worker.stop()
+
+
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> WorkerPool:
+    """Get the process-wide Python worker pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WorkerPool()
+                # Namespaces of conversations removed by the checkpointer go too
+                on_thread_deleted(_pool.drop_namespace)
+    return _pool
+
+
+def get_worker_stats() -> Dict[str, Any]:
+    """Get per-call overhead statistics from every worker's kernels."""
+    return get_worker_pool().stats()
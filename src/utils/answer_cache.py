@@ -0,0 +1,311 @@
+"""
+Answer cache for the compiled workflow.
+Serves repeated questions without running the supervisor or any agent, as long
+as the underlying data has not changed.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.agents.router import looks_like_follow_up, refers_back
+from src.utils.db import DB_PATH
+from src.utils.llm_config import DEFAULT_MODEL
+from src.utils.sql_cache import get_data_version
+
+# Cache policy (override via environment)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "1") != "0"
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "256"))
+
+# Final answers starting like this are failures and never cached
+_ERROR_RE = re.compile(r"^[\w/ ]*(analysis|analytics) error:", re.IGNORECASE)
+
+
+def normalize_question(text: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", text).strip().lower().rstrip("?!. ")
+
+
+def _content_text(content: Any) -> str:
+    """Flatten message content (string or list of blocks) to text."""
+    if isinstance(content, list):
+        return " ".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return str(content)
+
+
+class CachedWorkflow:
+    """
+    Wrapper around a compiled LangGraph workflow with an answer cache.
+
+    Keys are the normalized question, the model name and the database's data
+    version token. Entries store the final answer, the agent that produced it
+    and its visualizations, and expire after a TTL or by LRU eviction.
+    Every other attribute is delegated to the wrapped graph.
+    """
+
+    def __init__(
+        self,
+        graph,
+        model_name: str = DEFAULT_MODEL,
+        db_path: str = DB_PATH,
+        ttl: float = ANSWER_CACHE_TTL,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        enabled: bool = ANSWER_CACHE_ENABLED,
+    ):
+        self.graph = graph
+        self.model_name = model_name
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "expired": 0,
+            "evictions": 0,
+        }
+
+    def __getattr__(self, name):
+        return getattr(self.graph, name)
+
+    # --- Cache -------------------------------------------------------------
+
+    def _key(self, question: str) -> Tuple:
+        return (
+            normalize_question(question),
+            self.model_name,
+            get_data_version(self.db_path),
+        )
+
+    def _get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            stale = time.time() - entry["created"] > self.ttl
+            missing = any(
+                viz.endswith(".png") and not os.path.exists(viz)
+                for viz in entry["visualizations"]
+            )
+            if stale or missing:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry
+
+    def _put(self, key: Tuple, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop all cached answers."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+    # --- Invocation --------------------------------------------------------
+
+    @staticmethod
+    def _question(input: Dict[str, Any]) -> Optional[str]:
+        """The latest user question in a graph input, if any."""
+        for msg in reversed(input.get("messages", []) or []):
+            if isinstance(msg, HumanMessage):
+                return _content_text(msg.content)
+        return None
+
+    def _cacheable(
+        self, question: Optional[str], config: Optional[Dict], bypass: bool
+    ) -> bool:
+        """Whether this call may read from / write to the cache."""
+        if not self.enabled or bypass or not question:
+            return False
+        if (config or {}).get("configurable", {}).get("bypass_cache"):
+            return False
+        # Follow-ups and references to an earlier answer ("plot that") depend
+        # on the thread's context, not just the question
+        return not (looks_like_follow_up(question) or refers_back(question))
+
+    def _serve(
+        self, entry: Dict[str, Any], question: str, config: Optional[Dict]
+    ) -> Dict[str, Any]:
+        """Build the result of a cache hit and record it in the thread's history."""
+        update = {
+            "messages": [
+                HumanMessage(content=question),
+                AIMessage(content=entry["content"]),
+            ],
+            "visualizations": list(entry["visualizations"]),
+            "next": "FINISH",
+        }
+        if entry.get("agent"):
+            update["active_agent"] = entry["agent"]
+
+        thread_id = (config or {}).get("configurable", {}).get("thread_id")
+        if thread_id is not None and getattr(self.graph, "checkpointer", None):
+            # Keep conversation memory consistent as if the graph had run
+            self.graph.update_state(
+                config, update, as_node=entry.get("agent") or "Supervisor"
+            )
+            return dict(self.graph.get_state(config).values)
+        return update
+
+    def _before(
+        self, input: Dict[str, Any], config: Optional[Dict], bypass_cache: bool
+    ):
+        """Return (question, key, cached result) for a call; key is None when bypassed."""
+        question = self._question(input)
+        if not self._cacheable(question, config, bypass_cache):
+            self._stats["bypassed"] += 1
+            return question, None, None
+        key = self._key(question)
+        entry = self._get(key)
+        return question, key, entry
+
+    def _after(self, key: Tuple, result: Dict[str, Any]) -> None:
+        """Store a successful run's final answer."""
+        messages: List = result.get("messages", [])
+        final = next((m for m in reversed(messages) if m.type == "ai"), None)
+        content = _content_text(final.content) if final is not None else ""
+        if content and not _ERROR_RE.match(content):
+            self._put(
+                key,
+                {
+                    "content": content,
+                    "agent": result.get("active_agent", ""),
+                    "visualizations": list(result.get("visualizations", []) or []),
+                    "created": time.time(),
+                },
+            )
+
+    def invoke(
+        self,
+        input: Dict[str, Any],
+        config: Optional[Dict] = None,
+        *,
+        bypass_cache: bool = False,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Run the workflow, answering from the cache when possible.
+
+        Args:
+            input: Graph input ({"messages": [HumanMessage(...)]})
+            config: LangGraph config; configurable.bypass_cache=True skips the cache
+            bypass_cache: Skip the cache for this call
+            **kwargs: Passed through to the graph's invoke
+
+        Returns:
+            Final state with messages and visualizations
+        """
+        question, key, entry = self._before(input, config, bypass_cache)
+        if entry is not None:
+            return self._serve(entry, question, config)
+
+        result = self.graph.invoke(input, config=config, **kwargs)
+        if key is not None:
+            self._after(key, result)
+        return result
+
+    async def ainvoke(
+        self,
+        input: Dict[str, Any],
+        config: Optional[Dict] = None,
+        *,
+        bypass_cache: bool = False,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Async variant of invoke (runs the workflow with graph.ainvoke).
+        """
+        question, key, entry = self._before(input, config, bypass_cache)
+        if entry is not None:
+            return self._serve(entry, question, config)
+
+        result = await self.graph.ainvoke(input, config=config, **kwargs)
+        if key is not None:
+            self._after(key, result)
+        return result
+
+    def stream(
+        self,
+        input: Dict[str, Any],
+        config: Optional[Dict] = None,
+        *,
+        stream_mode: Any = "updates",
+        subgraphs: bool = False,
+        bypass_cache: bool = False,
+        **kwargs,
+    ) -> Iterator[Any]:
+        """
+        Stream the workflow, answering from the cache when possible.
+
+        A cache hit is emitted as a single "updates" (or "values") chunk from
+        an "Answer_Cache" node, shaped like the graph's own output for the
+        requested stream_mode/subgraphs. Streamed answers are stored once the
+        run finishes when the graph has a checkpointer and a thread_id.
+
+        Args:
+            input: Graph input ({"messages": [HumanMessage(...)]})
+            config: LangGraph config; configurable.bypass_cache=True skips the cache
+            stream_mode: LangGraph stream mode(s)
+            subgraphs: Include events from nested agent graphs
+            bypass_cache: Skip the cache for this call
+            **kwargs: Passed through to the graph's stream
+
+        Yields:
+            Chunks in LangGraph's stream format
+        """
+        question, key, entry = self._before(input, config, bypass_cache)
+        if entry is not None:
+            result = self._serve(entry, question, config)
+            modes = [stream_mode] if isinstance(stream_mode, str) else stream_mode
+            for mode in modes:
+                if mode not in ("updates", "values"):
+                    continue
+                chunk = {"Answer_Cache": result} if mode == "updates" else result
+                # (namespace,)? + (mode,)? + chunk, as LangGraph yields them
+                prefix = ((),) if subgraphs else ()
+                if not isinstance(stream_mode, str):
+                    prefix += (mode,)
+                yield (*prefix, chunk) if prefix else chunk
+            return
+
+        yield from self.graph.stream(
+            input,
+            config=config,
+            stream_mode=stream_mode,
+            subgraphs=subgraphs,
+            **kwargs,
+        )
+        thread_id = (config or {}).get("configurable", {}).get("thread_id")
+        if key is not None and thread_id is not None and self.graph.checkpointer:
+            self._after(key, dict(self.graph.get_state(config).values))
@@ -0,0 +1,176 @@
+"""
+Typed artifacts produced by python_tool (images, Plotly figures, tables).
+Code running in the kernel registers artifacts as a side channel of the tool
+result; agents and the UI read them back without scanning output text.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional, Tuple, TypedDict
+
+from langchain_core.messages import BaseMessage, ToolMessage
+
+# Saved files recognized as displayable images
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".svg")
+# Rows kept when a DataFrame is registered as a table
+TABLE_MAX_ROWS = 200
+PLOTS_DIR = "plots"
+
+
+class Artifact(TypedDict):
+    """
+    One output of python_tool.
+
+    Attributes:
+        kind: "image" (file path), "plotly" (figure JSON) or "table"
+            (DataFrame JSON, orient="split")
+        value: The path or JSON string
+    """
+
+    kind: str
+    value: str
+
+
+# Artifacts registered by the code currently executing (one list per run)
+_active: ContextVar[Optional[List[Artifact]]] = ContextVar(
+    "active_artifacts", default=None
+)
+_savefig_hooked = False
+
+
+def register_artifact(kind: str, value: str) -> None:
+    """Attach an artifact to the running python_tool call (no-op outside one)."""
+    artifacts = _active.get()
+    if artifacts is not None and {"kind": kind, "value": value} not in artifacts:
+        artifacts.append({"kind": kind, "value": value})
+
+
+@contextmanager
+def capture_artifacts() -> Iterator[List[Artifact]]:
+    """Collect artifacts registered while the block runs."""
+    artifacts: List[Artifact] = []
+    token = _active.set(artifacts)
+    try:
+        yield artifacts
+    finally:
+        _active.reset(token)
+
+
+def install_savefig_hook() -> None:
+    """Register every image saved through matplotlib (and seaborn) as an artifact."""
+    global _savefig_hooked
+    if _savefig_hooked:
+        return
+    from matplotlib.figure import Figure
+
+    original = Figure.savefig
+
+    def savefig(self, fname, *args, **kwargs):
+        result = original(self, fname, *args, **kwargs)
+        if isinstance(fname, (str, os.PathLike)):
+            path = os.fspath(fname)
+            if not os.path.splitext(path)[1]:
+                path += ".png"  # matplotlib's default format
+            if path.lower().endswith(IMAGE_SUFFIXES):
+                register_artifact("image", path)
+        return result
+
+    Figure.savefig = savefig
+    _savefig_hooked = True
+
+
+def show_figure(fig: Any) -> None:
+    """
+    Display a figure in the chat.
+
+    Plotly figures are sent as their JSON spec; matplotlib figures are saved
+    under plots/ (and registered by the savefig hook).
+    """
+    if hasattr(fig, "to_plotly_json"):
+        register_artifact("plotly", fig.to_json())
+    elif hasattr(fig, "savefig"):
+        os.makedirs(PLOTS_DIR, exist_ok=True)
+        fig.savefig(os.path.join(PLOTS_DIR, f"plot_{time.time_ns()}.png"))
+    else:
+        raise TypeError(f"Cannot display object of type {type(fig).__name__}")
+
+
+def show_table(df: Any, max_rows: int = TABLE_MAX_ROWS) -> None:
+    """Display (the first max_rows rows of) a DataFrame as a table."""
+    register_artifact(
+        "table", df.head(max_rows).to_json(orient="split", date_format="iso")
+    )
+
+
+def describe_artifacts(artifacts: List[Artifact]) -> str:
+    """Short note for the model listing what was registered."""
+    lines = []
+    for artifact in artifacts:
+        if artifact["kind"] == "image":
+            lines.append(f"[image saved: {artifact['value']}]")
+        else:
+            lines.append(f"[{artifact['kind']} displayed to the user]")
+    return "\n".join(lines)
+
+
+# --- Consumers -------------------------------------------------------------
+
+
+def collect_artifacts(messages: List[BaseMessage]) -> List[Artifact]:
+    """Artifacts attached to the tool results of a run, in order."""
+    artifacts: List[Artifact] = []
+    for msg in messages:
+        if isinstance(msg, ToolMessage) and isinstance(msg.artifact, list):
+            for artifact in msg.artifact:
+                if artifact not in artifacts:
+                    artifacts.append(artifact)
+    return artifacts
+
+
+def message_text(message: Optional[BaseMessage]) -> str:
+    """Text of a message (joins text blocks of multimodal content)."""
+    if message is None:
+        return ""
+    content = message.content
+    if isinstance(content, list):
+        text = " ".join(
+            block.get("text", "")
+            for block in content
+            if isinstance(block, dict) and "text" in block
+        )
+        return text or str(content)
+    return str(content)
+
+
+def extract_response(messages: List[BaseMessage]) -> Tuple[str, List[str]]:
+    """
+    Final answer and visualizations of a ReAct agent run.
+
+    Args:
+        messages: Messages of the agent's final state
+
+    Returns:
+        (answer text, visualizations): image paths and Plotly/table JSON
+        strings, as stored in AgentState.visualizations
+    """
+    output = message_text(messages[-1]) if messages else "Analysis complete."
+    return output, [artifact["value"] for artifact in collect_artifacts(messages)]
+
+
+def parse_visualization(viz: str) -> Tuple[str, Any]:
+    """
+    Classify a stored visualization for rendering.
+
+    Returns:
+        ("image", path), ("plotly", figure JSON string) or ("table", dict
+        with columns/index/data)
+    """
+    if viz.strip().lower().endswith(IMAGE_SUFFIXES):
+        return "image", viz.strip()
+    spec = json.loads(viz)
+    if isinstance(spec, dict) and "columns" in spec:
+        return "table", spec
+    return "plotly", viz
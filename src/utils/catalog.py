@@ -0,0 +1,302 @@
+"""
+Schema catalog for prompt injection.
+Builds the database description whenever the schema or the data changes,
+enriched with cheap statistics (MAX(rowid) probes and sqlite_stat1), and
+memoizes prompts rendered from it.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils.db import DB_PATH, get_engine
+from src.utils.materialize import SUMMARY_TABLES
+from src.utils.prompt_loader import load_prompt
+from src.utils.sql_cache import get_data_version
+
+# Date ranges of unindexed columns need a full scan: only for tables this small
+CATALOG_SCAN_MAX_ROWS = int(os.getenv("CATALOG_SCAN_MAX_ROWS", "100000"))
+
+# Bookkeeping tables hidden from the agents
+_INTERNAL_TABLES = ("summary_state",)
+
+_DATE_TYPES = ("DATE", "DATETIME", "TIMESTAMP")
+
+_catalogs: Dict[str, "SchemaCatalog"] = {}
+_catalogs_lock = threading.Lock()
+
+
+def _is_date_column(name: str, col_type: str) -> bool:
+    """Heuristic for columns holding dates/timestamps."""
+    lowered = name.lower()
+    return (
+        col_type.upper() in _DATE_TYPES or lowered.endswith("_at") or "date" in lowered
+    )
+
+
+def _quote_ident(name: str) -> str:
+    """Quote an identifier for use in generated SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SchemaCatalog:
+    """
+    Cached description of one SQLite database.
+
+    The catalog is rebuilt only when PRAGMA schema_version or the data
+    version token changes, so the per-request cost is two PRAGMAs and a
+    stat() of the database files.
+    """
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = str(Path(db_path).expanduser().resolve())
+        self._lock = threading.Lock()
+        self._version: Optional[Tuple] = None
+        self._tables: List[Dict[str, Any]] = []
+        self._schema_string = ""
+        self._prompts: Dict[str, str] = {}
+
+    def _current_version(self) -> Tuple:
+        """Schema version plus the data version token of the database."""
+        with get_engine(self.db_path).connect() as conn:
+            schema = conn.exec_driver_sql("PRAGMA schema_version").scalar()
+        return (schema,) + get_data_version(self.db_path)
+
+    def _build(self, conn) -> None:
+        """Reflect tables, columns and statistics into the catalog."""
+        stat_rows = []
+        has_stat1 = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        ).fetchone()
+        if has_stat1:
+            stat_rows = conn.exec_driver_sql(
+                "SELECT tbl, idx, stat FROM sqlite_stat1"
+            ).fetchall()
+
+        row_counts: Dict[str, int] = {}
+        index_stats: Dict[str, List[int]] = {}
+        for tbl, idx, stat in stat_rows:
+            numbers = [int(n) for n in str(stat).split() if n.isdigit()]
+            if not numbers:
+                continue
+            row_counts[tbl] = max(row_counts.get(tbl, 0), numbers[0])
+            if idx:
+                index_stats[idx] = numbers
+
+        table_names = [
+            row[0]
+            for row in conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'table' "
+                "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            ).fetchall()
+            if row[0] not in _INTERNAL_TABLES
+        ]
+
+        tables = []
+        for table in table_names:
+            qtable = _quote_ident(table)
+            columns = [
+                {"name": row[1], "type": row[2] or "", "pk": bool(row[5])}
+                for row in conn.exec_driver_sql(f"PRAGMA table_info({qtable})")
+            ]
+
+            # Row count: MAX(rowid) is a live O(log n) probe (an upper bound
+            # after deletes); sqlite_stat1 only for tables without a rowid
+            try:
+                rows = (
+                    conn.exec_driver_sql(f"SELECT MAX(rowid) FROM {qtable}").scalar()
+                    or 0
+                )
+                estimated = True
+            except Exception:
+                rows = row_counts.get(table)
+                estimated = False
+
+            # Distinct counts for the leading column of each analyzed index
+            distinct: Dict[str, int] = {}
+            leading = set()
+            for idx_row in conn.exec_driver_sql(f"PRAGMA index_list({qtable})"):
+                idx_name = idx_row[1]
+                numbers = index_stats.get(idx_name)
+                info = conn.exec_driver_sql(
+                    f"PRAGMA index_info({_quote_ident(idx_name)})"
+                ).fetchall()
+                if info and info[0][2]:
+                    leading.add(info[0][2])
+                if numbers and len(numbers) > 1 and info and info[0][2]:
+                    # Rows per key from the last ANALYZE, scaled to the live count
+                    total = rows if rows is not None else numbers[0]
+                    distinct[info[0][2]] = max(1, round(total / numbers[1]))
+            single_pk = sum(col["pk"] for col in columns) == 1
+            for col in columns:
+                if col["pk"] and single_pk and rows is not None:
+                    distinct.setdefault(col["name"], rows)
+
+            # Date ranges: separate MIN and MAX queries on a leading index
+            # column are O(log n) probes; other columns are only scanned in
+            # small tables
+            ranges: Dict[str, tuple] = {}
+            small = rows is not None and rows <= CATALOG_SCAN_MAX_ROWS
+            for col in columns:
+                if not _is_date_column(col["name"], col["type"]):
+                    continue
+                qcol = _quote_ident(col["name"])
+                if col["name"] in leading:
+                    ranges[col["name"]] = tuple(
+                        conn.exec_driver_sql(
+                            f"SELECT {agg}({qcol}) FROM {qtable}"
+                        ).scalar()
+                        for agg in ("MIN", "MAX")
+                    )
+                elif small:
+                    ranges[col["name"]] = tuple(
+                        conn.exec_driver_sql(
+                            f"SELECT MIN({qcol}), MAX({qcol}) FROM {qtable}"
+                        ).fetchone()
+                    )
+
+            for col in columns:
+                col["distinct"] = distinct.get(col["name"])
+                col["range"] = ranges.get(col["name"])
+            tables.append(
+                {
+                    "name": table,
+                    "rows": rows,
+                    "rows_estimated": estimated,
+                    "columns": columns,
+                }
+            )
+
+        self._tables = tables
+        self._schema_string = self._render(tables)
+        self._prompts = {}
+
+    @staticmethod
+    def _render(tables: List[Dict[str, Any]]) -> str:
+        """Format tables for prompt injection."""
+        parts = []
+        for table in tables:
+            header = f"Table: {table['name']}"
+            if table["rows"] is not None:
+                header += f" (~{table['rows']:,} rows)"
+            lines = [header]
+            if table["name"] in SUMMARY_TABLES:
+                lines.append(f"  Summary table: {SUMMARY_TABLES[table['name']]}")
+            for col in table["columns"]:
+                line = f"  - {col['name']} ({col['type']})"
+                notes = []
+                if col["distinct"] is not None:
+                    notes.append(f"~{col['distinct']:,} distinct")
+                if col["range"] and col["range"][0] is not None:
+                    notes.append(f"{col['range'][0]} .. {col['range'][1]}")
+                if notes:
+                    line += ": " + ", ".join(notes)
+                lines.append(line)
+            parts.append("\n".join(lines))
+        return "\n\n".join(parts)
+
+    def refresh(self) -> None:
+        """Rebuild the catalog if the schema or data changed since the last build."""
+        version = self._current_version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            with get_engine(self.db_path).connect() as conn:
+                self._build(conn)
+            self._version = version
+
+    def schema_string(self) -> str:
+        """Get the formatted schema description with statistics."""
+        self.refresh()
+        return self._schema_string
+
+    def tables(self) -> List[Dict[str, Any]]:
+        """Get the catalog entries (name, rows, columns with stats)."""
+        self.refresh()
+        return self._tables
+
+    def summary_tables(self) -> str:
+        """
+        Get the description of the up-to-date summary tables in the database.
+
+        The catalog only detects them: they are installed by seed_data.py or
+        `python -m src.utils.materialize`, which also rebuilds stale ones.
+        """
+        summaries = [t for t in self.tables() if t["name"] in SUMMARY_TABLES]
+        if summaries:
+            with get_engine(self.db_path).connect() as conn:
+                stale = {
+                    row[0]
+                    for row in conn.exec_driver_sql(
+                        "SELECT name FROM summary_state WHERE dirty = 1"
+                    )
+                }
+            summaries = [t for t in summaries if t["name"] not in stale]
+        return self._render(summaries)
+
+    def row_counts(self) -> Dict[str, Optional[int]]:
+        """Get approximate row counts per table without scanning them."""
+        return {table["name"]: table["rows"] for table in self.tables()}
+
+    def render_prompt(self, filename: str) -> str:
+        """
+        Render a prompt file with {schema} substituted, memoized per catalog build.
+
+        Args:
+            filename: Name of the prompt file (e.g., 'supervisor_prompt.md')
+
+        Returns:
+            The rendered prompt
+        """
+        self.refresh()
+        prompt = self._prompts.get(filename)
+        if prompt is None:
+            prompt = load_prompt(filename, schema=self._schema_string)
+            self._prompts[filename] = prompt
+        return prompt
+
+
+def with_summary_tables(prompt: str, db_path: str = DB_PATH) -> str:
+    """
+    Append the description of the available summary tables to a prompt.
+
+    Args:
+        prompt: System prompt of an agent
+        db_path: Path to the SQLite database
+
+    Returns:
+        The prompt, unchanged if the database has no summary tables
+    """
+    try:
+        summaries = get_catalog(db_path).summary_tables()
+    except Exception:
+        return prompt
+    if not summaries:
+        return prompt
+    return (
+        f"{prompt}\n\n## Summary Tables\n"
+        "Precomputed aggregates kept up to date with the base tables. Prefer "
+        "them over scanning orders/website_sessions when they answer the "
+        f"question:\n\n{summaries}"
+    )
+
+
+def get_catalog(db_path: str = DB_PATH) -> SchemaCatalog:
+    """
+    Get the shared schema catalog for a database.
+
+    Args:
+        db_path: Path to the SQLite database
+
+    Returns:
+        SchemaCatalog instance (one per database file per process)
+    """
+    path = str(Path(db_path).expanduser().resolve())
+    catalog = _catalogs.get(path)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.setdefault(path, SchemaCatalog(path))
+    return catalog
@@ -0,0 +1,558 @@
+"""
+SQLite-backed LangGraph checkpointer with bounded retention.
+Keeps the last few checkpoints per thread on disk, evicts idle threads and caps
+the file size, so memory stays flat however many conversations are served.
+"""
+
+import asyncio
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from typing import (
+    Dict,
+    Any,
+    Callable,
+    Iterator,
+    AsyncIterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+# Retention policy (override via environment)
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "checkpoints.db")
+CHECKPOINT_KEEP_LAST = int(os.getenv("CHECKPOINT_KEEP_LAST", "5"))
+CHECKPOINT_IDLE_SECONDS = float(os.getenv("CHECKPOINT_IDLE_SECONDS", str(7 * 86400)))
+CHECKPOINT_MAX_BYTES = int(os.getenv("CHECKPOINT_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Write batching: flush after this many buffered rows or seconds
+CHECKPOINT_BATCH_SIZE = int(os.getenv("CHECKPOINT_BATCH_SIZE", "32"))
+CHECKPOINT_FLUSH_SECONDS = float(os.getenv("CHECKPOINT_FLUSH_SECONDS", "1.0"))
+# Run compact() every this many flushes
+COMPACT_EVERY = 50
+
+# Called with the id of every thread the retention policy or delete_thread()
+# removes, so per-thread state held elsewhere (frames, namespaces) is released
+_thread_listeners: List[Callable[[str], None]] = []
+
+
+def on_thread_deleted(callback: Callable[[str], None]) -> None:
+    """Register a callback run when a conversation thread is deleted."""
+    _thread_listeners.append(callback)
+
+
+def _notify_deleted(thread_ids: Sequence[str]) -> None:
+    for thread_id in thread_ids:
+        for callback in _thread_listeners:
+            try:
+                callback(thread_id)
+            except Exception:
+                pass
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_updated ON checkpoints (updated_at);
+"""
+
+
+def _config(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> RunnableConfig:
+    return {
+        "configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint_id,
+        }
+    }
+
+
+class BoundedSqliteSaver(BaseCheckpointSaver[str]):
+    """
+    Checkpoint saver storing full checkpoints in a SQLite file.
+
+    Writes are buffered and flushed in one transaction (by count, by age, or
+    before any read). Each flush trims the touched threads to their last
+    keep_last checkpoints per namespace; compact() additionally drops idle
+    threads, finished subgraph namespaces and the least recently used
+    threads until the file fits max_bytes.
+    """
+
+    def __init__(
+        self,
+        db_path: str = CHECKPOINT_DB_PATH,
+        keep_last: int = CHECKPOINT_KEEP_LAST,
+        idle_seconds: float = CHECKPOINT_IDLE_SECONDS,
+        max_bytes: int = CHECKPOINT_MAX_BYTES,
+        batch_size: int = CHECKPOINT_BATCH_SIZE,
+        flush_seconds: float = CHECKPOINT_FLUSH_SECONDS,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.db_path = db_path
+        self.keep_last = keep_last
+        self.idle_seconds = idle_seconds
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._conn.execute("SELECT 1 FROM sqlite_master").fetchone():
+            # Lets compact() hand freed pages back to the filesystem
+            self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        self._lock = threading.RLock()
+        self._pending_checkpoints: List[Tuple] = []
+        self._pending_writes: List[Tuple[bool, Tuple]] = []
+        self._timer: Optional[threading.Timer] = None
+        self._flushes = 0
+        self._stats = {
+            "flushes": 0,
+            "rows_written": 0,
+            "trimmed": 0,
+            "evicted_threads": 0,
+            "compactions": 0,
+        }
+        atexit.register(self.flush)
+
+    # --- Batching ----------------------------------------------------------
+
+    def _buffered(self) -> int:
+        return len(self._pending_checkpoints) + len(self._pending_writes)
+
+    def _schedule_flush(self) -> None:
+        """Flush when the batch is full, or soon after the first buffered row."""
+        if self._buffered() >= self.batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.flush_seconds, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Write all buffered checkpoints and writes in one transaction."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._buffered():
+                return
+            checkpoints, self._pending_checkpoints = self._pending_checkpoints, []
+            writes, self._pending_writes = self._pending_writes, []
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO checkpoints "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    checkpoints,
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [row for replace, row in writes if replace],
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [row for replace, row in writes if not replace],
+                )
+                touched = {(row[0], row[1]) for row in checkpoints}
+                for thread_id, checkpoint_ns in touched:
+                    self._trim(thread_id, checkpoint_ns)
+                    if checkpoint_ns == "":
+                        self._drop_finished_subgraphs(thread_id)
+            self._stats["flushes"] += 1
+            self._stats["rows_written"] += len(checkpoints) + len(writes)
+            self._flushes += 1
+            if self._flushes % COMPACT_EVERY == 0:
+                self.compact()
+
+    def _trim(self, thread_id: str, checkpoint_ns: str) -> None:
+        """Keep only the newest keep_last checkpoints of one namespace."""
+        old = self._conn.execute(
+            "SELECT checkpoint_id FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.keep_last),
+        ).fetchall()
+        for (checkpoint_id,) in old:
+            for table in ("checkpoints", "writes"):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ? "
+                    "AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                )
+        self._stats["trimmed"] += len(old)
+
+    def _drop_finished_subgraphs(self, thread_id: Optional[str] = None) -> int:
+        """
+        Delete nested agent graph checkpoints older than their thread's
+        latest root checkpoint (the step that ran them has completed).
+        """
+        scope, params = ("AND thread_id = ?", (thread_id,)) if thread_id else ("", ())
+        dropped = self._conn.execute(
+            "DELETE FROM checkpoints WHERE checkpoint_ns != '' "
+            f"{scope} AND updated_at < (SELECT MAX(root.updated_at) "
+            "FROM checkpoints AS root "
+            "WHERE root.thread_id = checkpoints.thread_id "
+            "AND root.checkpoint_ns = '')",
+            params,
+        ).rowcount
+        self._conn.execute(
+            "DELETE FROM writes WHERE checkpoint_ns != '' "
+            f"{scope} AND NOT EXISTS (SELECT 1 FROM checkpoints AS c "
+            "WHERE c.thread_id = writes.thread_id "
+            "AND c.checkpoint_ns = writes.checkpoint_ns "
+            "AND c.checkpoint_id = writes.checkpoint_id)",
+            params,
+        )
+        return dropped
+
+    # --- Maintenance -------------------------------------------------------
+
+    def _delete_threads(self, thread_ids: Sequence[str]) -> None:
+        for thread_id in thread_ids:
+            self._conn.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)
+            )
+            self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+        self._stats["evicted_threads"] += len(thread_ids)
+        _notify_deleted(thread_ids)
+
+    def size_bytes(self) -> int:
+        """Bytes used by live pages of the checkpoint file."""
+        with self._lock:
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+            pages = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            free = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (pages - free) * page_size
+
+    def compact(self) -> Dict[str, Any]:
+        """
+        Apply the retention policy to the whole file.
+
+        Drops threads idle for longer than idle_seconds, subgraph namespaces
+        whose parent run has since checkpointed, then the least recently used
+        threads until the data fits max_bytes, and returns freed pages.
+
+        Returns:
+            Counters of what was removed
+        """
+        with self._lock:
+            self.flush()
+            report = {"idle_threads": 0, "subgraph_checkpoints": 0, "lru_threads": 0}
+            with self._conn:
+                idle = [
+                    row[0]
+                    for row in self._conn.execute(
+                        "SELECT thread_id FROM checkpoints GROUP BY thread_id "
+                        "HAVING MAX(updated_at) < ?",
+                        (time.time() - self.idle_seconds,),
+                    )
+                ]
+                self._delete_threads(idle)
+                report["idle_threads"] = len(idle)
+
+                report["subgraph_checkpoints"] = self._drop_finished_subgraphs()
+
+            # Size cap: drop least recently used threads first
+            if self.size_bytes() > self.max_bytes:
+                threads = self._conn.execute(
+                    "SELECT thread_id, SUM(LENGTH(checkpoint) + LENGTH(metadata)) "
+                    "FROM checkpoints GROUP BY thread_id ORDER BY MAX(updated_at)"
+                ).fetchall()
+                excess = self.size_bytes() - self.max_bytes
+                victims = []
+                for thread_id, size in threads[:-1]:  # never the newest thread
+                    if excess <= 0:
+                        break
+                    victims.append(thread_id)
+                    excess -= size or 0
+                with self._conn:
+                    self._delete_threads(victims)
+                report["lru_threads"] = len(victims)
+
+            self._conn.execute("PRAGMA incremental_vacuum")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._stats["compactions"] += 1
+            return report
+
+    def stats(self) -> Dict[str, Any]:
+        """Get write/retention counters and current file usage."""
+        with self._lock:
+            threads, checkpoints = self._conn.execute(
+                "SELECT COUNT(DISTINCT thread_id), COUNT(*) FROM checkpoints"
+            ).fetchone()
+            return {
+                **self._stats,
+                "threads": threads,
+                "checkpoints": checkpoints,
+                "buffered": self._buffered(),
+                "size_bytes": self.size_bytes(),
+            }
+
+    # --- BaseCheckpointSaver -----------------------------------------------
+
+    def _tuple(
+        self, row: Tuple, config: Optional[RunnableConfig] = None
+    ) -> CheckpointTuple:
+        """Build a CheckpointTuple from a checkpoints row."""
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, type_, blob, mtype, meta = (
+            row
+        )
+        writes = self._conn.execute(
+            "SELECT task_id, channel, type, value, task_path, idx FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        writes.sort(key=lambda w: (w[4], w[0], w[5]))
+        return CheckpointTuple(
+            config=config or _config(thread_id, checkpoint_ns, checkpoint_id),
+            checkpoint=self.serde.loads_typed((type_, blob)),
+            metadata=self.serde.loads_typed((mtype, meta)),
+            parent_config=(
+                _config(thread_id, checkpoint_ns, parent_id) if parent_id else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((wtype, value)))
+                for task_id, channel, wtype, value, _, _ in writes
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Get a checkpoint (the latest one unless config names a checkpoint_id)."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        columns = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "type, checkpoint, metadata_type, metadata FROM checkpoints "
+        )
+        with self._lock:
+            self.flush()
+            if checkpoint_id:
+                row = self._conn.execute(
+                    columns + "WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+                return self._tuple(row, config) if row else None
+            row = self._conn.execute(
+                columns + "WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, checkpoint_ns),
+            ).fetchone()
+            return self._tuple(row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints, newest first."""
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "type, checkpoint, metadata_type, metadata FROM checkpoints"
+            + (" WHERE " + " AND ".join(clauses) if clauses else "")
+            + " ORDER BY checkpoint_id DESC"
+        )
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(query, params).fetchall()
+            results = []
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                if filter:
+                    metadata = self.serde.loads_typed((row[6], row[7]))
+                    if not all(metadata.get(k) == v for k, v in filter.items()):
+                        continue
+                results.append(self._tuple(row))
+        yield from results
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Buffer a checkpoint for the next flush."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, blob = self.serde.dumps_typed(checkpoint)
+        mtype, meta = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock:
+            self._pending_checkpoints.append(
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    blob,
+                    mtype,
+                    meta,
+                    time.time(),
+                )
+            )
+            self._schedule_flush()
+        return _config(thread_id, checkpoint_ns, checkpoint["id"])
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Buffer intermediate writes of a task for the next flush."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        with self._lock:
+            for idx, (channel, value) in enumerate(writes):
+                idx = WRITES_IDX_MAP.get(channel, idx)
+                type_, blob = self.serde.dumps_typed(value)
+                # Special writes (negative idx) replace; regular ones are kept once
+                self._pending_writes.append(
+                    (
+                        idx < 0,
+                        (
+                            thread_id,
+                            checkpoint_ns,
+                            checkpoint_id,
+                            task_id,
+                            idx,
+                            channel,
+                            type_,
+                            blob,
+                            task_path,
+                        ),
+                    )
+                )
+            self._schedule_flush()
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints and writes of a thread."""
+        with self._lock:
+            self.flush()
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)
+                )
+                self._conn.execute(
+                    "DELETE FROM writes WHERE thread_id = ?", (thread_id,)
+                )
+        _notify_deleted([thread_id])
+
+    # --- Async variants (SQLite work runs in a worker thread) ---------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        results = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in results:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        # Buffering is in-memory; only a full batch touches the disk
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+_savers: Dict[str, BoundedSqliteSaver] = {}
+_savers_lock = threading.Lock()
+
+
+def get_checkpointer(db_path: str = CHECKPOINT_DB_PATH) -> BoundedSqliteSaver:
+    """Get the shared checkpointer for a checkpoint file."""
+    key = os.path.abspath(db_path)
+    with _savers_lock:
+        if key not in _savers:
+            _savers[key] = BoundedSqliteSaver(db_path)
+        return _savers[key]
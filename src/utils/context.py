@@ -0,0 +1,31 @@
+"""
+Runtime context helpers.
+Reads per-run information (such as the conversation thread) from LangGraph's config.
+"""
+
+from typing import Optional
+
+DEFAULT_THREAD_ID = "default"
+
+
+def get_thread_id(default: Optional[str] = DEFAULT_THREAD_ID) -> Optional[str]:
+    """
+    Get the thread_id of the graph run the caller is executing in.
+
+    Works inside graph nodes and inside tools called by nested agents, since
+    LangGraph propagates the run config through context variables.
+
+    Args:
+        default: Value returned outside of a graph run or without a thread_id
+
+    Returns:
+        The configured thread_id, or default
+    """
+    try:
+        from langgraph.config import get_config
+
+        config = get_config()
+    except Exception:
+        return default
+    thread_id = config.get("configurable", {}).get("thread_id")
+    return str(thread_id) if thread_id is not None else default
@@ -0,0 +1,141 @@
+"""
+Database connection utilities for the Data Science Agent System.
+Provides a process-wide registry of pooled, read-only SQLite engines.
+"""
+
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Any
+from urllib.parse import quote
+
+if TYPE_CHECKING:
+    # SQLAlchemy is imported when the first engine is created
+    from sqlalchemy.engine import Engine
+
+# Default database path
+DB_PATH = "ecommerce.db"
+
+# PRAGMAs applied to every new pooled connection (tuned for read-heavy analytics)
+READ_PRAGMAS = {
+    "mmap_size": 268435456,  # 256 MB of memory-mapped I/O
+    "cache_size": -65536,  # 64 MB page cache (negative values are KiB)
+    "temp_store": "MEMORY",  # Sorts and temp b-trees stay in RAM
+    "query_only": "ON",  # Refuse writes even if the URI mode is bypassed
+}
+
+# Connection pool sizing per database file
+POOL_SIZE = 5
+MAX_OVERFLOW = 10
+
+_engines: Dict[str, "Engine"] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+_lock = threading.Lock()
+
+
+def _resolve(db_path: str) -> str:
+    """Normalize a database path so equivalent paths share one engine."""
+    return str(Path(db_path).expanduser().resolve())
+
+
+def _apply_read_pragmas(dbapi_conn, connection_record) -> None:
+    """Apply READ_PRAGMAS to a freshly opened DBAPI connection."""
+    cursor = dbapi_conn.cursor()
+    try:
+        for name, value in READ_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def _create_engine(path: str) -> "Engine":
+    """Create a pooled read-only engine for a resolved database path."""
+    from sqlalchemy import create_engine, event
+
+    uri = f"sqlite:///file:{quote(path)}?mode=ro&uri=true"
+    engine = create_engine(
+        uri,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        connect_args={"check_same_thread": False},
+    )
+    stats = _stats[path]
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_conn, connection_record):
+        stats["connections_opened"] += 1
+        _apply_read_pragmas(dbapi_conn, connection_record)
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_conn, connection_record, connection_proxy):
+        stats["checkouts"] += 1
+
+    return engine
+
+
+def get_engine(db_path: str = DB_PATH) -> "Engine":
+    """
+    Get the shared read-only engine for a SQLite database.
+
+    Engines are created once per database file and reused for the lifetime
+    of the process, so pooled connections keep a warm page cache.
+
+    Args:
+        db_path: Path to the SQLite database
+
+    Returns:
+        SQLAlchemy Engine opened read-only through a SQLite URI
+    """
+    path = _resolve(db_path)
+    engine = _engines.get(path)
+    if engine is not None:
+        _stats[path]["engine_hits"] += 1
+        return engine
+
+    with _lock:
+        engine = _engines.get(path)
+        if engine is None:
+            _stats[path] = {
+                "engine_hits": 0,
+                "engine_misses": 1,
+                "connections_opened": 0,
+                "checkouts": 0,
+            }
+            engine = _create_engine(path)
+            _engines[path] = engine
+        else:
+            _stats[path]["engine_hits"] += 1
+    return engine
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get engine registry and connection pool statistics.
+
+    Returns:
+        Mapping of database path to counters. 'pool_hits' counts checkouts
+        served by an already-open connection, 'pool_misses' counts checkouts
+        that had to open a new SQLite connection.
+    """
+    report = {}
+    for path, stats in _stats.items():
+        hits = stats["checkouts"] - stats["connections_opened"]
+        report[path] = {
+            **stats,
+            "pool_hits": max(hits, 0),
+            "pool_misses": stats["connections_opened"],
+            "pool_hit_rate": (
+                round(max(hits, 0) / stats["checkouts"], 4)
+                if stats["checkouts"]
+                else 0.0
+            ),
+        }
+    return report
+
+
+def dispose_engines() -> None:
+    """Close all pooled connections and clear the engine registry."""
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _stats.clear()
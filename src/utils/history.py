@@ -0,0 +1,220 @@
+"""
+Token-budgeted conversation history for LLM calls.
+Keeps the latest turns verbatim, folds older turns into a compact summary
+(built incrementally and cached per thread) and drops routing chatter.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from src.utils.context import get_thread_id
+
+# Token budgets per caller (override via environment)
+SUPERVISOR_HISTORY_TOKENS = int(os.getenv("SUPERVISOR_HISTORY_TOKENS", "1500"))
+AGENT_HISTORY_TOKENS = int(os.getenv("AGENT_HISTORY_TOKENS", "4000"))
+# Most recent turns passed verbatim when they fit the budget
+KEEP_RECENT_TURNS = int(os.getenv("KEEP_RECENT_TURNS", "2"))
+# Threads whose summaries are kept in memory
+HISTORY_CACHE_THREADS = 256
+
+# Rough characters-per-token ratio (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+QUESTION_CHARS = 200
+ANSWER_CHARS = 300
+
+SUMMARY_HEADER = "Summary of earlier conversation (oldest first):"
+
+_ROUTING_RE = re.compile(r"^Routing to (\w+)")
+
+
+def _text(content: Any) -> str:
+    """Flatten message content (string or list of blocks) to text."""
+    if isinstance(content, list):
+        return " ".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return str(content)
+
+
+def estimate_tokens(message: BaseMessage) -> int:
+    """Approximate token count of a message."""
+    return len(_text(message.content)) // CHARS_PER_TOKEN + 4
+
+
+def _routed_agent(message: BaseMessage) -> Optional[str]:
+    """Agent named by a supervisor routing note, or None."""
+    if isinstance(message, AIMessage):
+        match = _ROUTING_RE.match(_text(message.content))
+        if match:
+            return match.group(1)
+    return None
+
+
+def _without_routing(turn: List[BaseMessage]) -> List[BaseMessage]:
+    return [m for m in turn if not _routed_agent(m)]
+
+
+def _clip(text: str, limit: int) -> str:
+    text = re.sub(r"\s+", " ", text).strip()
+    return text if len(text) <= limit else text[: limit - 3].rstrip() + "..."
+
+
+def split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """Group messages into turns, each starting at a user message."""
+    turns: List[List[BaseMessage]] = []
+    for msg in messages:
+        if isinstance(msg, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(msg)
+    return turns
+
+
+def summarize_turn(turn: List[BaseMessage]) -> str:
+    """One extractive summary line: agent, question and start of the answer."""
+    question = next((_text(m.content) for m in turn if isinstance(m, HumanMessage)), "")
+    agent = next((a for a in map(_routed_agent, turn) if a), None)
+    answers = [
+        _text(m.content)
+        for m in turn
+        if isinstance(m, AIMessage) and not _routed_agent(m)
+    ]
+    line = f"- Q: {_clip(question, QUESTION_CHARS)}"
+    if answers:
+        line += (
+            f" A{f' ({agent})' if agent else ''}: {_clip(answers[-1], ANSWER_CHARS)}"
+        )
+    return line
+
+
+def _fingerprint(turn: List[BaseMessage]) -> str:
+    """Identifies a turn when validating cached summaries."""
+    return _text(turn[0].content)[:QUESTION_CHARS]
+
+
+class HistoryManager:
+    """
+    Builds fixed-size LLM contexts from a thread's full message history.
+
+    The state keeps every message; compact() returns the view sent to a
+    model: an optional summary message for older turns followed by the
+    newest turns verbatim, without supervisor routing notes.
+    """
+
+    def __init__(self, keep_recent_turns: int = KEEP_RECENT_TURNS):
+        self.keep_recent_turns = keep_recent_turns
+        # thread_id -> (turns summarized, fingerprint of the last one, lines)
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "tokens_in": 0, "tokens_out": 0, "summarized": 0}
+
+    def _summary_lines(
+        self, thread_id: Optional[str], older: List[List[BaseMessage]]
+    ) -> List[str]:
+        """Summary lines of the older turns, extending the cached ones."""
+        lines: List[str] = []
+        start = 0
+        if thread_id is not None:
+            with self._lock:
+                cached = self._summaries.get(thread_id)
+            if cached and 0 < cached[0] <= len(older):
+                count, last, cached_lines = cached
+                if _fingerprint(older[count - 1]) == last:
+                    lines, start = list(cached_lines), count
+        for turn in older[start:]:
+            lines.append(summarize_turn(turn))
+            self._stats["summarized"] += 1
+        if thread_id is not None and older:
+            with self._lock:
+                self._summaries[thread_id] = (
+                    len(older),
+                    _fingerprint(older[-1]),
+                    lines,
+                )
+                self._summaries.move_to_end(thread_id)
+                while len(self._summaries) > HISTORY_CACHE_THREADS:
+                    self._summaries.popitem(last=False)
+        return lines
+
+    def compact(
+        self,
+        messages: List[BaseMessage],
+        budget: int,
+        thread_id: Optional[str] = None,
+    ) -> List[BaseMessage]:
+        """
+        Fit a conversation into a token budget.
+
+        Args:
+            messages: Full message history of the thread
+            budget: Approximate token budget for the returned messages
+            thread_id: Thread used to cache summaries (default: current run's)
+
+        Returns:
+            Messages to send to the model (the latest turn is always included)
+        """
+        thread_id = thread_id if thread_id is not None else get_thread_id(None)
+        self._stats["calls"] += 1
+        self._stats["tokens_in"] += sum(map(estimate_tokens, messages))
+
+        turns = split_turns(messages)
+        if not turns:
+            return []
+
+        # Newest turns verbatim while they fit (the current one unconditionally)
+        recent: List[List[BaseMessage]] = [_without_routing(turns[-1])]
+        used = sum(map(estimate_tokens, recent[0]))
+        for turn in reversed(turns[:-1]):
+            turn = _without_routing(turn)
+            cost = sum(map(estimate_tokens, turn))
+            if len(recent) >= self.keep_recent_turns or used + cost > budget:
+                break
+            recent.insert(0, turn)
+            used += cost
+        older = turns[: len(turns) - len(recent)]
+
+        result: List[BaseMessage] = []
+        if older:
+            lines = self._summary_lines(thread_id, older)
+            # Newest summary lines first until the remaining budget is used
+            remaining = budget - used - len(SUMMARY_HEADER) // CHARS_PER_TOKEN
+            kept: List[str] = []
+            for line in reversed(lines):
+                cost = len(line) // CHARS_PER_TOKEN + 1
+                if cost > remaining:
+                    break
+                kept.insert(0, line)
+                remaining -= cost
+            if kept:
+                omitted = len(lines) - len(kept)
+                header = SUMMARY_HEADER + (
+                    f" ({omitted} earlier turns omitted)" if omitted else ""
+                )
+                result.append(HumanMessage(content="\n".join([header, *kept])))
+
+        for turn in recent:
+            result.extend(turn)
+        self._stats["tokens_out"] += sum(map(estimate_tokens, result))
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Get token counters (estimated) across all compactions."""
+        return {**self._stats, "threads_cached": len(self._summaries)}
+
+
+_history_manager = HistoryManager()
+
+
+def get_history_manager() -> HistoryManager:
+    """Get the process-wide history manager."""
+    return _history_manager
+
+
+def compact_history(messages: List[BaseMessage], budget: int) -> List[BaseMessage]:
+    """Fit messages into a token budget using the shared history manager."""
+    return _history_manager.compact(messages, budget)
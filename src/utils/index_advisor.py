@@ -0,0 +1,418 @@
+"""
+Index set for the ecommerce schema and an EXPLAIN-driven index advisor.
+The advisor records the query plan of every sql_tool query, counts full scans
+per table/column and recommends (or optionally creates) covering indexes.
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils.db import DB_PATH, get_engine
+from src.utils.sql_cache import normalize_sql
+
+INDEX_ADVISOR_ENABLED = os.getenv("INDEX_ADVISOR_ENABLED", "1") != "0"
+# Create a recommended index once it has caused this many full scans
+INDEX_ADVISOR_AUTO_CREATE = os.getenv("INDEX_ADVISOR_AUTO_CREATE", "0") == "1"
+INDEX_ADVISOR_MIN_SCANS = int(os.getenv("INDEX_ADVISOR_MIN_SCANS", "3"))
+# Optional JSONL file receiving every logged plan
+INDEX_ADVISOR_LOG = os.getenv("INDEX_ADVISOR_LOG", "")
+# Widest index the advisor proposes (key plus covered columns)
+MAX_INDEX_COLUMNS = 4
+PLAN_LOG_SIZE = 200
+PLAN_CACHE_SIZE = 512
+
+# Default secondary indexes (name -> table, columns) for the hot predicates.
+# orders and website_sessions carry extra columns so the common RFM and
+# campaign queries are answered from the index alone.
+DEFAULT_INDEXES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "idx_orders_user_id": ("orders", ("user_id", "created_at", "price_usd")),
+    "idx_orders_created_at": ("orders", ("created_at",)),
+    "idx_sessions_user_id": ("website_sessions", ("user_id",)),
+    "idx_sessions_utm_campaign": ("website_sessions", ("utm_campaign", "user_id")),
+    "idx_order_items_order_id": ("order_items", ("order_id",)),
+    "idx_order_items_product_id": ("order_items", ("product_id",)),
+}
+
+_TABLE_REF_RE = re.compile(
+    r"\b(?:from|join)\s+([a-z_]\w*)(?:\s+(?:as\s+)?([a-z_]\w*))?", re.IGNORECASE
+)
+_CLAUSE_RE = re.compile(
+    r"\b(select|from|where|on|group by|order by|having|limit|union|join)\b",
+    re.IGNORECASE,
+)
+_COLUMN_REF_RE = re.compile(r"\b([a-z_]\w*)\.([a-z_]\w*)\b|\b([a-z_]\w*)\b", re.I)
+_SCAN_RE = re.compile(r"^SCAN (\S+)$")
+_AUTO_INDEX_RE = re.compile(r"^SEARCH (\S+) USING AUTOMATIC .*INDEX \((.*)\)")
+_KEYWORDS = set(
+    "where on join left right inner outer cross natural full "
+    "group order limit having union using".split()
+)
+
+# Clause kinds whose column references make good index keys (WHERE first)
+_FILTER_CLAUSES = ("where", "on", "having")
+_ORDER_CLAUSES = ("group by", "order by")
+
+
+def create_default_indexes(conn: sqlite3.Connection) -> List[str]:
+    """
+    Create the default index set on an open connection (idempotent).
+
+    Runs ANALYZE when an index was created or the database has never been
+    analyzed, so the planner and the schema catalog have sqlite_stat1.
+
+    Args:
+        conn: Writable connection to the ecommerce database
+
+    Returns:
+        Names of the indexes that did not exist before
+    """
+    existing = {
+        row[0]
+        for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    tables = {
+        row[0]
+        for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+    created = []
+    for name, (table, columns) in DEFAULT_INDEXES.items():
+        if name in existing or table not in tables:
+            continue
+        conn.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+        created.append(name)
+    analyzed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchone()
+    if created or not analyzed:
+        conn.execute("ANALYZE")
+    conn.commit()
+    return created
+
+
+def ensure_default_indexes(db_path: str = DB_PATH) -> Optional[List[str]]:
+    """
+    Add missing default indexes to an existing database.
+
+    New databases get them from seed_data.py; run
+    `python -m src.utils.index_advisor` for databases created before.
+
+    Returns:
+        Names of the created indexes, or None if the database is not writable
+    """
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            return create_default_indexes(conn)
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+
+def _table_aliases(query: str) -> Dict[str, str]:
+    """Map names and aliases used in a query to table names."""
+    aliases = {}
+    for table, alias in _TABLE_REF_RE.findall(query):
+        aliases[table.lower()] = table.lower()
+        if alias and alias.lower() not in _KEYWORDS:
+            aliases[alias.lower()] = table.lower()
+    return aliases
+
+
+def _clause_references(query: str) -> List[Tuple[str, Optional[str], str]]:
+    """(clause, qualifier or None, column) for every identifier in the query."""
+    refs = []
+    pieces = _CLAUSE_RE.split(query)
+    # pieces = [prefix, keyword, text, keyword, text, ...]
+    for keyword, text in zip(pieces[1::2], pieces[2::2]):
+        clause = re.sub(r"\s+", " ", keyword.lower())
+        for qualifier, column, bare in _COLUMN_REF_RE.findall(text):
+            if qualifier:
+                refs.append((clause, qualifier.lower(), column.lower()))
+            elif bare:
+                refs.append((clause, None, bare.lower()))
+    return refs
+
+
+class IndexAdvisor:
+    """
+    Collects query plans of analytic queries and proposes indexes.
+
+    Each observed query is planned once (EXPLAIN QUERY PLAN is cheap and the
+    result is memoized per normalized query). Plain table scans and
+    automatic (per-query) indexes count as full scans of the table; the
+    columns used by the query's filters, joins and grouping on that table
+    become the key of the recommended index.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._plans: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # (db_path, table) -> [rowid alias or None, *other columns]
+        self._columns: Dict[Tuple[str, str], List[Optional[str]]] = {}
+        self._log: deque = deque(maxlen=PLAN_LOG_SIZE)
+        self._table_scans: Counter = Counter()
+        self._column_scans: Counter = Counter()
+        # (db_path, table, index columns) -> full scans it would have avoided
+        self._candidates: Counter = Counter()
+        self._created: List[str] = []
+        self._queries = 0
+
+    def _table_columns(self, conn, db_path: str, table: str) -> List[str]:
+        """Column names of a table; an INTEGER PRIMARY KEY column comes first."""
+        key = (db_path, table)
+        if key not in self._columns:
+            info = conn.exec_driver_sql(f'PRAGMA table_info("{table}")').fetchall()
+            pks = [row for row in info if row[5]]
+            rowid = (
+                pks[0][1].lower()
+                if len(pks) == 1 and pks[0][2].upper() == "INTEGER"
+                else None
+            )
+            self._columns[key] = [rowid] + [
+                row[1].lower() for row in info if row[1].lower() != rowid
+            ]
+        return self._columns[key]
+
+    def _analyze(self, conn, db_path: str, query: str) -> Dict[str, Any]:
+        """Plan a query and derive the index candidates of its full scans."""
+        plan = [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {query}")]
+        aliases = _table_aliases(query)
+        refs = _clause_references(query)
+        columns = {
+            table: self._table_columns(conn, db_path, table)
+            for table in set(aliases.values())
+        }
+
+        scans = []
+        for detail in plan:
+            auto = _AUTO_INDEX_RE.match(detail)
+            scan = _SCAN_RE.match(detail)
+            if not (auto or scan):
+                continue
+            table = aliases.get((auto or scan).group(1).lower())
+            if not columns.get(table):
+                continue  # subquery, CTE or unknown name
+            owned = [a for a, t in aliases.items() if t == table]
+
+            def refs_of(kinds, table=table, owned=owned):
+                found = []
+                for clause, qualifier, column in refs:
+                    if clause not in kinds or column not in columns[table]:
+                        continue
+                    if column == columns[table][0]:
+                        continue  # rowid alias: already the table's key
+                    if qualifier is None:
+                        # Bare names count only when no other table has them
+                        if any(
+                            column in cols for t, cols in columns.items() if t != table
+                        ):
+                            continue
+                    elif qualifier not in owned:
+                        continue
+                    if column not in found:
+                        found.append(column)
+                return found
+
+            if auto:
+                keys = re.findall(r"(\w+)\s*[=<>]", auto.group(2))
+            else:
+                keys = refs_of(("where",))
+                keys += [c for c in refs_of(_FILTER_CLAUSES) if c not in keys]
+            keys += [c for c in refs_of(_ORDER_CLAUSES) if c not in keys]
+            if keys:
+                covered = [c for c in refs_of(("select",)) if c not in keys]
+                if len(keys) + len(covered) <= MAX_INDEX_COLUMNS:
+                    keys += covered
+            scans.append({"table": table, "columns": tuple(keys[:MAX_INDEX_COLUMNS])})
+        return {"plan": plan, "scans": scans}
+
+    def observe(self, conn, query: str, db_path: str = DB_PATH) -> Dict[str, Any]:
+        """
+        Record the plan of a query executed by sql_tool.
+
+        Plans are memoized, so repeated queries (including SQL cache hits)
+        are counted without touching the database.
+
+        Args:
+            conn: Open (read-only) SQLAlchemy connection to the database, or
+                None to check one out only when the query must be planned
+            query: The SQL text
+            db_path: Database the query ran against
+
+        Returns:
+            {"plan": plan detail lines, "scans": [{"table", "columns"}]}
+        """
+        key = f"{db_path}\x00{normalize_sql(query)}"
+        with self._lock:
+            result = self._plans.get(key)
+            if result is not None:
+                self._plans.move_to_end(key)
+        if result is None:
+            if conn is None:
+                with get_engine(db_path).connect() as own:
+                    result = self._analyze(own, db_path, query)
+            else:
+                result = self._analyze(conn, db_path, query)
+            with self._lock:
+                self._plans[key] = result
+                while len(self._plans) > PLAN_CACHE_SIZE:
+                    self._plans.popitem(last=False)
+
+        entry = {
+            "ts": time.time(),
+            "query": query.strip()[:500],
+            "plan": result["plan"],
+            "full_scans": [scan["table"] for scan in result["scans"]],
+        }
+        ready = set()
+        with self._lock:
+            self._queries += 1
+            self._log.append(entry)
+            for scan in result["scans"]:
+                self._table_scans[scan["table"]] += 1
+                for column in scan["columns"]:
+                    self._column_scans[(scan["table"], column)] += 1
+                if scan["columns"]:
+                    candidate = (db_path, scan["table"], scan["columns"])
+                    self._candidates[candidate] += 1
+                    if self._candidates[candidate] >= INDEX_ADVISOR_MIN_SCANS:
+                        ready.add((db_path, scan["table"]))
+        if INDEX_ADVISOR_LOG:
+            with open(INDEX_ADVISOR_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        if INDEX_ADVISOR_AUTO_CREATE and ready:
+            self.apply([r for r in self.recommendations() if r["key"][:2] in ready])
+        return result
+
+    def _has_index(self, db_path: str, table: str, columns: Tuple[str, ...]) -> bool:
+        """Whether an existing index already starts with the same columns."""
+        with get_engine(db_path).connect() as conn:
+            for idx in conn.exec_driver_sql(f'PRAGMA index_list("{table}")'):
+                info = conn.exec_driver_sql(f'PRAGMA index_info("{idx[1]}")')
+                indexed = tuple(row[2].lower() for row in info if row[2])
+                if indexed[: len(columns)] == columns:
+                    return True
+        return False
+
+    def recommendations(
+        self, min_scans: int = INDEX_ADVISOR_MIN_SCANS
+    ) -> List[Dict[str, Any]]:
+        """
+        Get proposed indexes, most valuable first.
+
+        Args:
+            min_scans: Full scans an index must have avoided to be proposed
+
+        Returns:
+            Dicts with table, columns, scans, sql and key
+        """
+        with self._lock:
+            candidates = list(self._candidates.items())
+        # Candidates sharing a leading column are served by one index: the
+        # widest variant (most frequent on ties) gets the group's scan count
+        groups: Dict[Tuple[str, str, str], List[Any]] = {}
+        for (db_path, table, columns), scans in candidates:
+            group = groups.setdefault((db_path, table, columns[0]), [0, columns, 0])
+            group[0] += scans
+            if (len(columns), scans) > (len(group[1]), group[2]):
+                group[1], group[2] = columns, scans
+
+        proposals = []
+        for (db_path, table, _), (scans, columns, _) in sorted(
+            groups.items(), key=lambda item: -item[1][0]
+        ):
+            if scans < min_scans:
+                continue
+            try:
+                if self._has_index(db_path, table, columns):
+                    continue
+            except Exception:
+                continue
+            name = f"idx_advisor_{table}_{'_'.join(columns)}"
+            proposals.append(
+                {
+                    "table": table,
+                    "columns": list(columns),
+                    "scans": scans,
+                    "sql": f"CREATE INDEX IF NOT EXISTS {name} "
+                    f"ON {table} ({', '.join(columns)})",
+                    "key": (db_path, table, columns),
+                }
+            )
+        return proposals
+
+    def apply(self, recommendations: List[Dict[str, Any]]) -> List[str]:
+        """
+        Create recommended indexes (through a writable connection).
+
+        Returns:
+            The statements that were executed
+        """
+        executed = []
+        for rec in recommendations:
+            db_path = rec["key"][0]
+            try:
+                conn = sqlite3.connect(db_path)
+                try:
+                    conn.execute(rec["sql"])
+                    conn.execute(f"ANALYZE {rec['table']}")
+                    conn.commit()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                continue  # read-only database: recommendation only
+            executed.append(rec["sql"])
+        with self._lock:
+            self._created.extend(executed)
+            if executed:
+                self._plans.clear()  # plans change with the new indexes
+        return executed
+
+    def plan_log(self) -> List[Dict[str, Any]]:
+        """Get the most recent logged plans (oldest first)."""
+        with self._lock:
+            return list(self._log)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get full scan counts per table and per table.column."""
+        with self._lock:
+            return {
+                "queries": self._queries,
+                "table_scans": dict(self._table_scans),
+                "column_scans": {
+                    f"{table}.{column}": count
+                    for (table, column), count in self._column_scans.most_common()
+                },
+                "indexes_created": list(self._created),
+            }
+
+
+_index_advisor = IndexAdvisor()
+
+
+def get_index_advisor() -> IndexAdvisor:
+    """Get the process-wide index advisor."""
+    return _index_advisor
+
+
+def main():
+    """Add the missing default indexes to a database from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database path")
+    args = parser.parse_args()
+    created = ensure_default_indexes(args.db)
+    if created is None:
+        raise SystemExit(f"Cannot write to {args.db}")
+    print(f"  Created: {', '.join(created) if created else 'nothing (up to date)'}")
+
+
+if __name__ == "__main__":
+    main()
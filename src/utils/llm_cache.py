@@ -0,0 +1,246 @@
+"""
+Disk-backed response cache for the chat models.
+Responses are stored in SQLite keyed by model configuration, messages and tool
+schemas, with size-based eviction and strict record/replay modes.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+# "off", "read_write" (serve hits, store misses), "record" (always call the
+# model and overwrite) or "replay" (never call the model, misses are errors).
+# Off by default: production always calls the model; benchmarks and offline
+# test runs opt in (e.g. LLM_CACHE_MODE=record, then LLM_CACHE_MODE=replay)
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "off")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+# Total size of stored responses; least recently used entries go first
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+MODES = ("off", "read_write", "record", "replay")
+
+# Message fields that describe a past response, not the request
+_VOLATILE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+
+class LLMCacheMiss(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def _strip_volatile(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_strip_volatile(item) for item in value]
+    if isinstance(value, dict):
+        kwargs = value.get("kwargs")
+        if value.get("lc") and isinstance(kwargs, dict):
+            kwargs = {
+                key: _strip_volatile(item)
+                for key, item in kwargs.items()
+                if key not in _VOLATILE_FIELDS
+            }
+            return {**value, "kwargs": kwargs}
+        return {key: _strip_volatile(item) for key, item in value.items()}
+    return value
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """
+    Hash a serialized request into a cache key.
+
+    Args:
+        prompt: Serialized messages, as passed to BaseCache.lookup
+        llm_string: Model name, parameters and bound tool schemas
+
+    Returns:
+        Hex digest identifying the request
+    """
+    try:
+        messages = json.dumps(_strip_volatile(json.loads(prompt)), sort_keys=True)
+    except ValueError:
+        messages = prompt
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(messages.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _dump_generation(generation: Generation) -> Dict[str, Any]:
+    data: Dict[str, Any] = {"generation_info": generation.generation_info}
+    if isinstance(generation, ChatGeneration):
+        data["message"] = message_to_dict(generation.message)
+    else:
+        data["text"] = generation.text
+    return data
+
+
+def _load_generation(data: Dict[str, Any]) -> Generation:
+    if "message" in data:
+        return ChatGeneration(
+            message=messages_from_dict([data["message"]])[0],
+            generation_info=data["generation_info"],
+        )
+    return Generation(text=data["text"], generation_info=data["generation_info"])
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    LangChain cache storing model responses in a SQLite file.
+
+    One connection is shared by all threads (guarded by a lock). Entries
+    record their size and last use so the file stays under `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        mode: str = LLM_CACHE_MODE,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+    ):
+        if mode not in MODES:
+            raise ValueError(
+                f"Unknown LLM cache mode {mode!r}, expected one of {MODES}"
+            )
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )""")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used "
+            "ON llm_cache (last_used)"
+        )
+        self._conn.commit()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if self.mode == "record":
+            return None
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+            else:
+                self._stats["hits"] += 1
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE llm_cache SET last_used = ?, hits = hits + 1 "
+                        "WHERE key = ?",
+                        (time.time(), key),
+                    )
+        if row is None:
+            if self.mode == "replay":
+                raise LLMCacheMiss(
+                    f"No recorded response for this request in {self.path} "
+                    "(LLM_CACHE_MODE=replay)"
+                )
+            return None
+        return [_load_generation(item) for item in json.loads(row[0])]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if self.mode == "replay":
+            return
+        response = json.dumps([_dump_generation(g) for g in return_val])
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO llm_cache (key, response, bytes, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET response = excluded.response, "
+                "bytes = excluded.bytes, created_at = excluded.created_at, "
+                "last_used = excluded.last_used",
+                (cache_key(prompt, llm_string), response, size, now, now),
+            )
+            self._stats["writes"] += 1
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until under the size budget."""
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(bytes), 0) FROM llm_cache"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in self._conn.execute(
+            "SELECT key, bytes FROM llm_cache ORDER BY last_used"
+        ):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+        self._stats["evictions"] += len(doomed)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters plus the stored entries and bytes."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM llm_cache"
+            ).fetchone()
+            return {
+                "mode": self.mode,
+                **self._stats,
+                "entries": entries,
+                "bytes": size,
+            }
+
+
+_cache: Optional[SQLiteLLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[SQLiteLLMCache]:
+    """Get the process-wide response cache, or None when LLM_CACHE_MODE=off."""
+    global _cache
+    if LLM_CACHE_MODE == "off":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SQLiteLLMCache()
+        return _cache
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Inspect or clear the response cache from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", default=LLM_CACHE_PATH, help="Cache file")
+    parser.add_argument("--clear", action="store_true", help="Delete all entries")
+    args = parser.parse_args(argv)
+    cache = SQLiteLLMCache(args.path, mode="read_write")
+    if args.clear:
+        cache.clear()
+    stats = cache.stats()
+    print(f"  {stats['entries']} responses, {stats['bytes'] / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,38 @@ Creates a single reusable ChatGoogleGenerativeAI client with the API key.
 
 import os
 from functools import lru_cache
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import TYPE_CHECKING, Callable, Optional
+from langchain_core.language_models import BaseChatModel
 
-# Load environment variables
-load_dotenv(override=True)
+from src.utils.llm_cache import get_llm_cache
+
+if TYPE_CHECKING:
+    # The Gemini SDK is imported when the first client is built
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+# Replacement model factory (benchmarks, offline runs); None uses Gemini
+_llm_factory: Optional[Callable[[str, float], BaseChatModel]] = None
+
+
+def set_llm_factory(
+    factory: Optional[Callable[[str, float], BaseChatModel]],
+) -> None:
+    """
+    Make get_llm return models built by `factory` instead of Gemini clients.
+
+    Must be called before the workflow is created (agents bind their model
+    at construction). Pass None to restore the default.
+
+    Args:
+        factory: Callable taking (model_name, temperature)
+    """
+    global _llm_factory
+    _llm_factory = factory
 
 
 def get_api_key() -> str:
-    """Get the Google API key from environment variables."""
+    """Get the Google API key from environment variables (or .env)."""
+    load_env()
     # Check for GOOGLE_API_KEY first, then GEMINI_API_KEY
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
@@ -23,12 +46,11 @@ def get_api_key() -> str:
     return api_key
 
 
-@lru_cache(maxsize=4)
 def get_llm(
     model_name: str = "gemini-2.5-pro", temperature: float = 0
-) -> ChatGoogleGenerativeAI:
+) -> BaseChatModel:
     """
-    Get a cached ChatGoogleGenerativeAI instance.
+    Get a cached ChatGoogleGenerativeAI instance (or the override's model).
 
     Args:
         model_name: Gemini model to use (default: gemini-1.5-flash for faster responses)
@@ -37,11 +59,37 @@ def get_llm(
     Returns:
         ChatGoogleGenerativeAI instance configured with the API key
     """
-    api_key = get_api_key()
+    if _llm_factory is not None:
+        return _llm_factory(model_name, temperature)
+    return _gemini_llm(model_name, temperature)
+
+
+@lru_cache(maxsize=1)
+def load_env() -> None:
+    """Load the .env file once (when a workflow or API key is first needed)."""
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+
+
+@lru_cache(maxsize=4)
+def _gemini_llm(model_name: str, temperature: float) -> "ChatGoogleGenerativeAI":
+    """Build (once per model/temperature) the Gemini client."""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    cache = get_llm_cache()
+    if cache is not None and cache.mode == "replay":
+        # Replayed runs never reach the API, so no key is required
+        load_env()
+        api_key = os.getenv("GEMINI_API_KEY") or "replay"
+    else:
+        api_key = get_api_key()
     return ChatGoogleGenerativeAI(
         model=model_name,
         temperature=temperature,
         google_api_key=api_key,
+        # Identical requests are answered from disk (see src/utils/llm_cache.py)
+        cache=cache,
     )
 
 
@@ -0,0 +1,308 @@
+"""
+Summary tables maintained inside the ecommerce database.
+Triggers keep per-user RFM, per-campaign daily funnel and daily revenue tables
+up to date as rows are inserted; updates and deletes mark them for rebuild.
+"""
+
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+from src.utils.db import DB_PATH
+
+# Summary tables advertised to the agents (name -> description)
+SUMMARY_TABLES: Dict[str, str] = {
+    "user_rfm": (
+        "one row per customer aggregated from orders: first/last order time, "
+        "frequency (orders), monetary (revenue), cogs. Recency = days between "
+        "last_order_at and MAX(last_order_at)"
+    ),
+    "revenue_daily": "orders, revenue and cogs per calendar day (from orders)",
+    "campaign_users": (
+        "users who had at least one session in a utm_campaign, with their "
+        "first session time ('(none)' when the campaign is empty)"
+    ),
+    "campaign_daily": (
+        "per day and utm_campaign: sessions, plus orders and revenue of users "
+        "who visited through that campaign (the website_sessions/orders join "
+        "on user_id). Conversion rate = SUM(orders) / SUM(sessions)"
+    ),
+}
+
+# Rebuild order (campaign_daily reads campaign_users)
+_BUILD_ORDER = ["user_rfm", "revenue_daily", "campaign_users", "campaign_daily"]
+# Summaries affected by updates/deletes of each base table
+_DEPENDENTS = {
+    "orders": ["user_rfm", "revenue_daily", "campaign_daily"],
+    "website_sessions": ["campaign_users", "campaign_daily"],
+}
+
+_CAMPAIGN = "COALESCE({}.utm_campaign, '(none)')"
+
+_TABLES_SQL = [
+    """CREATE TABLE IF NOT EXISTS summary_state (
+        name TEXT PRIMARY KEY,
+        dirty INTEGER NOT NULL DEFAULT 0,
+        refreshed_at TEXT
+    )""",
+    """CREATE TABLE user_rfm (
+        user_id INTEGER PRIMARY KEY,
+        first_order_at TEXT NOT NULL,
+        last_order_at TEXT NOT NULL,
+        frequency INTEGER NOT NULL,
+        monetary REAL NOT NULL,
+        cogs REAL NOT NULL
+    )""",
+    """CREATE TABLE revenue_daily (
+        day TEXT PRIMARY KEY,
+        orders INTEGER NOT NULL,
+        revenue REAL NOT NULL,
+        cogs REAL NOT NULL
+    )""",
+    """CREATE TABLE campaign_users (
+        utm_campaign TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        first_session_at TEXT NOT NULL,
+        PRIMARY KEY (utm_campaign, user_id)
+    )""",
+    "CREATE INDEX idx_campaign_users_user ON campaign_users (user_id)",
+    """CREATE TABLE campaign_daily (
+        day TEXT NOT NULL,
+        utm_campaign TEXT NOT NULL,
+        sessions INTEGER NOT NULL DEFAULT 0,
+        orders INTEGER NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, utm_campaign)
+    )""",
+]
+
+# Full rebuild of each summary from the base tables
+_REBUILD_SQL: Dict[str, List[str]] = {
+    "user_rfm": [
+        """INSERT INTO user_rfm
+           SELECT user_id, MIN(created_at), MAX(created_at), COUNT(*),
+                  SUM(price_usd), SUM(cogs_usd)
+           FROM orders GROUP BY user_id"""
+    ],
+    "revenue_daily": [
+        """INSERT INTO revenue_daily
+           SELECT date(created_at), COUNT(*), SUM(price_usd), SUM(cogs_usd)
+           FROM orders GROUP BY date(created_at)"""
+    ],
+    "campaign_users": [
+        f"""INSERT INTO campaign_users
+           SELECT {_CAMPAIGN.format('ws')}, user_id, MIN(created_at)
+           FROM website_sessions AS ws GROUP BY 1, 2"""
+    ],
+    "campaign_daily": [
+        f"""INSERT INTO campaign_daily (day, utm_campaign, sessions)
+           SELECT date(created_at), {_CAMPAIGN.format('ws')}, COUNT(*)
+           FROM website_sessions AS ws GROUP BY 1, 2""",
+        """INSERT INTO campaign_daily (day, utm_campaign, orders, revenue)
+           SELECT date(o.created_at), cu.utm_campaign, COUNT(*), SUM(o.price_usd)
+           FROM orders AS o JOIN campaign_users AS cu ON cu.user_id = o.user_id
+           WHERE true GROUP BY 1, 2
+           ON CONFLICT (day, utm_campaign) DO UPDATE SET
+               orders = excluded.orders, revenue = excluded.revenue""",
+    ],
+}
+
+# Incremental maintenance on insert (O(1) upserts per new row)
+_TRIGGERS_SQL = [
+    """CREATE TRIGGER summary_orders_insert AFTER INSERT ON orders BEGIN
+        INSERT INTO user_rfm VALUES (
+            NEW.user_id, NEW.created_at, NEW.created_at, 1,
+            NEW.price_usd, NEW.cogs_usd
+        )
+        ON CONFLICT (user_id) DO UPDATE SET
+            first_order_at = MIN(first_order_at, excluded.first_order_at),
+            last_order_at = MAX(last_order_at, excluded.last_order_at),
+            frequency = frequency + 1,
+            monetary = monetary + excluded.monetary,
+            cogs = cogs + excluded.cogs;
+        INSERT INTO revenue_daily VALUES (
+            date(NEW.created_at), 1, NEW.price_usd, NEW.cogs_usd
+        )
+        ON CONFLICT (day) DO UPDATE SET
+            orders = orders + 1,
+            revenue = revenue + excluded.revenue,
+            cogs = cogs + excluded.cogs;
+        INSERT INTO campaign_daily (day, utm_campaign, orders, revenue)
+            SELECT date(NEW.created_at), utm_campaign, 1, NEW.price_usd
+            FROM campaign_users WHERE user_id = NEW.user_id
+        ON CONFLICT (day, utm_campaign) DO UPDATE SET
+            orders = orders + 1,
+            revenue = revenue + excluded.revenue;
+    END""",
+    f"""CREATE TRIGGER summary_sessions_insert AFTER INSERT ON website_sessions
+    BEGIN
+        INSERT INTO campaign_daily (day, utm_campaign, sessions)
+        VALUES (date(NEW.created_at), {_CAMPAIGN.format('NEW')}, 1)
+        ON CONFLICT (day, utm_campaign) DO UPDATE SET sessions = sessions + 1;
+        -- First visit through this campaign: attribute the user's past orders
+        INSERT INTO campaign_daily (day, utm_campaign, orders, revenue)
+            SELECT date(created_at), {_CAMPAIGN.format('NEW')}, COUNT(*),
+                   SUM(price_usd)
+            FROM orders
+            WHERE user_id = NEW.user_id AND NOT EXISTS (
+                SELECT 1 FROM campaign_users
+                WHERE utm_campaign = {_CAMPAIGN.format('NEW')}
+                  AND user_id = NEW.user_id
+            )
+            GROUP BY date(created_at)
+        ON CONFLICT (day, utm_campaign) DO UPDATE SET
+            orders = orders + excluded.orders,
+            revenue = revenue + excluded.revenue;
+        INSERT INTO campaign_users
+        VALUES ({_CAMPAIGN.format('NEW')}, NEW.user_id, NEW.created_at)
+        ON CONFLICT (utm_campaign, user_id) DO UPDATE SET
+            first_session_at = MIN(first_session_at, excluded.first_session_at);
+    END""",
+]
+# Updates and deletes only mark the affected summaries for rebuild
+for _table, _names in _DEPENDENTS.items():
+    _marked = ", ".join(f"'{name}'" for name in _names)
+    for _event in ("UPDATE", "DELETE"):
+        _TRIGGERS_SQL.append(f"""CREATE TRIGGER summary_{_table}_{_event.lower()}
+            AFTER {_event} ON {_table} BEGIN
+                UPDATE summary_state SET dirty = 1 WHERE name IN ({_marked});
+            END""")
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _rebuild(conn: sqlite3.Connection, names: Iterable[str]) -> None:
+    """Recompute the given summaries from the base tables."""
+    for name in [n for n in _BUILD_ORDER if n in set(names)]:
+        conn.execute(f"DELETE FROM {name}")
+        for statement in _REBUILD_SQL[name]:
+            conn.execute(statement)
+        conn.execute(
+            "INSERT INTO summary_state (name, dirty, refreshed_at) VALUES (?, 0, ?) "
+            "ON CONFLICT (name) DO UPDATE SET dirty = 0, "
+            "refreshed_at = excluded.refreshed_at",
+            (name, _now()),
+        )
+        conn.execute(f"ANALYZE {name}")
+
+
+def install(db_path: str = DB_PATH) -> Dict[str, int]:
+    """
+    Create (or recreate) the summary tables and their triggers.
+
+    Args:
+        db_path: Path to the SQLite database
+
+    Returns:
+        Row count of each summary table
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            for name in SUMMARY_TABLES:
+                conn.execute(f"DROP TABLE IF EXISTS {name}")
+            conn.execute("DROP TABLE IF EXISTS summary_state")
+            for (trigger,) in conn.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'trigger' AND name LIKE 'summary_%'"
+            ).fetchall():
+                conn.execute(f"DROP TRIGGER {trigger}")
+            for statement in _TABLES_SQL:
+                conn.execute(statement)
+            _rebuild(conn, _BUILD_ORDER)
+            for statement in _TRIGGERS_SQL:
+                conn.execute(statement)
+            # Planner statistics for the base tables too (read by the catalog)
+            conn.execute("ANALYZE")
+        return {
+            name: conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+            for name in SUMMARY_TABLES
+        }
+    finally:
+        conn.close()
+
+
+def refresh(db_path: str = DB_PATH, full: bool = False) -> List[str]:
+    """
+    Rebuild summaries marked dirty by updates/deletes (or all of them).
+
+    Args:
+        db_path: Path to the SQLite database
+        full: Rebuild every summary table
+
+    Returns:
+        Names of the rebuilt tables
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            if full:
+                names = list(_BUILD_ORDER)
+            else:
+                names = [
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT name FROM summary_state WHERE dirty = 1"
+                    )
+                ]
+                if "campaign_users" in names and "campaign_daily" not in names:
+                    names.append("campaign_daily")
+            _rebuild(conn, names)
+        return [n for n in _BUILD_ORDER if n in names]
+    finally:
+        conn.close()
+
+
+def ensure_materialized(db_path: str = DB_PATH) -> Optional[List[str]]:
+    """
+    Install the summaries if missing, otherwise rebuild the dirty ones.
+
+    Returns:
+        Names of the tables built, or None if the database is not writable
+    """
+    try:
+        path = quote(str(Path(db_path).expanduser().resolve()))
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            installed = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'summary_state'"
+            ).fetchone()
+            has_base = conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master "
+                "WHERE name IN ('orders', 'website_sessions')"
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        if has_base < 2:
+            return []
+        if not installed:
+            return list(install(db_path))
+        return refresh(db_path)
+    except sqlite3.Error:
+        # Read-only deployments keep querying the base tables
+        return None
+
+
+def main():
+    """Install or refresh the summary tables from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database path")
+    parser.add_argument(
+        "--full", action="store_true", help="Recreate tables and triggers"
+    )
+    args = parser.parse_args()
+    if args.full:
+        for name, rows in install(args.db).items():
+            print(f"  {name}: {rows} rows")
+    else:
+        rebuilt = ensure_materialized(args.db)
+        print(f"  Rebuilt: {', '.join(rebuilt) if rebuilt else 'nothing (up to date)'}")
+
+
+if __name__ == "__main__":
+    main()
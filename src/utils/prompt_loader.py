@@ -2,6 +2,7 @@
 Prompt loader utility for reading markdown prompt files.
 Supports template variable substitution at runtime.
 """
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -10,6 +11,17 @@ from typing import Optional
 PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
 
 
+@lru_cache(maxsize=32)
+def _read_prompt(filename: str) -> str:
+    """Read a prompt file once; prompt files do not change at runtime."""
+    prompt_path = PROMPTS_DIR / filename
+    
+    if not prompt_path.exists():
+        raise FileNotFoundError(f"Prompt file not found: {prompt_path}")
+    
+    return prompt_path.read_text(encoding="utf-8")
+
+
 def load_prompt(filename: str, **kwargs) -> str:
     """
     Load a markdown prompt file and substitute template variables.
@@ -25,12 +37,7 @@ def load_prompt(filename: str, **kwargs) -> str:
     Raises:
         FileNotFoundError: If the prompt file doesn't exist
     """
-    prompt_path = PROMPTS_DIR / filename
-    
-    if not prompt_path.exists():
-        raise FileNotFoundError(f"Prompt file not found: {prompt_path}")
-    
-    content = prompt_path.read_text(encoding="utf-8")
+    content = _read_prompt(filename)
     
     # Substitute template variables if provided
     if kwargs:
@@ -43,22 +50,15 @@ def get_schema_string(db_path: str = "ecommerce.db") -> str:
     """
     Extract and format the database schema as a string for prompt injection.
     
+    The description comes from the cached schema catalog, which is only
+    rebuilt when the database schema changes.
+    
     Args:
         db_path: Path to the SQLite database
         
     Returns:
         Formatted string describing all tables and their columns
     """
-    from sqlalchemy import create_engine, inspect
-    
-    engine = create_engine(f"sqlite:///{db_path}")
-    inspector = inspect(engine)
-    
-    schema_parts = []
-    
-    for table_name in inspector.get_table_names():
-        columns = inspector.get_columns(table_name)
-        col_defs = [f"  - {col['name']} ({col['type']})" for col in columns]
-        schema_parts.append(f"Table: {table_name}\n" + "\n".join(col_defs))
+    from src.utils.catalog import get_catalog
     
-    return "\n\n".join(schema_parts)
+    return get_catalog(db_path).schema_string()
@@ -0,0 +1,239 @@
+"""
+Result encoding utilities for SQL tool output.
+Streams rows from a cursor into a compact, size-bounded text block for the LLM.
+"""
+
+import csv
+import io
+import os
+from typing import Any, Dict, List, Sequence, Tuple
+
+from src.utils.tracing import annotate
+
+# Output budget per sql_tool call (override via environment)
+SQL_MAX_ROWS = int(os.getenv("SQL_MAX_ROWS", "50"))
+SQL_MAX_BYTES = int(os.getenv("SQL_MAX_BYTES", "8000"))
+SQL_RESULT_FORMAT = os.getenv("SQL_RESULT_FORMAT", "csv")  # "csv" or "markdown"
+FLOAT_PRECISION = 4
+
+
+def format_value(value: Any, precision: int = FLOAT_PRECISION) -> str:
+    """
+    Render a single cell compactly.
+
+    Floats use fixed precision with trailing zeros stripped, NULL becomes an
+    empty string, everything else uses str().
+    """
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        text = f"{value:.{precision}f}"
+        if "." in text:
+            text = text.rstrip("0").rstrip(".")
+        return "0" if text == "-0" else text
+    return str(value)
+
+
+def _encode_row(values: Sequence[str], fmt: str) -> str:
+    """Encode one already-formatted row as a single line."""
+    if fmt == "markdown":
+        return "| " + " | ".join(v.replace("|", "\\|") for v in values) + " |"
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="").writerow(values)
+    return buffer.getvalue()
+
+
+def unique_names(columns: Sequence[str]) -> List[str]:
+    """
+    De-duplicate column names: repeats get a suffix (user_id, user_id_2).
+
+    Joins often return the same name twice; the header and the column
+    summary both use these names so every column stays distinguishable.
+    """
+    seen = set(columns)
+    counts: Dict[str, int] = {}
+    names = []
+    for name in columns:
+        counts[name] = counts.get(name, 0) + 1
+        if counts[name] > 1:
+            candidate = f"{name}_{counts[name]}"
+            while candidate in seen:
+                counts[name] += 1
+                candidate = f"{name}_{counts[name]}"
+            seen.add(candidate)
+            name = candidate
+        names.append(name)
+    return names
+
+
+def _header_lines(columns: Sequence[str], fmt: str) -> List[str]:
+    """Build the header line(s) for the chosen format."""
+    lines = [_encode_row(unique_names(columns), fmt)]
+    if fmt == "markdown":
+        lines.append("|" + "|".join("---" for _ in columns) + "|")
+    return lines
+
+
+def encode_rows(
+    columns: Sequence[str],
+    rows: Sequence[Sequence[Any]],
+    max_bytes: int = SQL_MAX_BYTES,
+    fmt: str = SQL_RESULT_FORMAT,
+    precision: int = FLOAT_PRECISION,
+) -> Tuple[List[str], int]:
+    """
+    Encode a header plus as many rows as fit in max_bytes.
+
+    Args:
+        columns: Column names
+        rows: Row tuples
+        max_bytes: Maximum size of the encoded lines in bytes
+        fmt: "csv" or "markdown"
+        precision: Decimal places for floating point values
+
+    Returns:
+        Tuple of (encoded lines, number of rows included)
+    """
+    lines = _header_lines(columns, fmt)
+    size = sum(len(line.encode("utf-8")) + 1 for line in lines)
+    shown = 0
+    for row in rows:
+        line = _encode_row([format_value(v, precision) for v in row], fmt)
+        line_size = len(line.encode("utf-8")) + 1
+        if shown and size + line_size > max_bytes:
+            break
+        lines.append(line)
+        size += line_size
+        shown += 1
+    return lines, shown
+
+
+def summarize_result(
+    conn, query: str, columns: Sequence[str], sample: Sequence[Sequence[Any]]
+) -> Dict[str, Any]:
+    """
+    Compute the total row count and per-column stats for a truncated result.
+
+    Runs a single aggregate over the original query as a subquery, so the
+    rows are counted inside SQLite instead of being transferred to Python.
+
+    Args:
+        conn: SQLAlchemy connection the original query ran on
+        query: The original SELECT statement
+        columns: Result column names
+        sample: Rows already fetched, used to detect numeric columns
+
+    Returns:
+        Dict with 'total_rows' and 'columns' (name -> stats dict, with
+        duplicate names made unique as in the header)
+    """
+    numeric = []
+    for idx in range(len(columns)):
+        values = [row[idx] for row in sample if row[idx] is not None]
+        numeric.append(
+            bool(values)
+            and all(
+                isinstance(v, (int, float)) and not isinstance(v, bool) for v in values
+            )
+        )
+
+    # Columns are renamed by position (c0, c1, ...) in a CTE column list, so
+    # duplicate names in the original result are still addressable
+    selects = ["COUNT(*)"]
+    for idx in range(len(columns)):
+        col = f"c{idx}"
+        if numeric[idx]:
+            selects.extend([f"MIN({col})", f"MAX({col})", f"AVG({col})"])
+        else:
+            selects.append(f"COUNT(DISTINCT {col})")
+
+    inner = query.strip().rstrip(";")
+    aliases = ", ".join(f"c{idx}" for idx in range(len(columns)))
+    row = conn.exec_driver_sql(
+        f"WITH _result({aliases}) AS ({inner}) SELECT {', '.join(selects)} "
+        "FROM _result"
+    ).fetchone()
+
+    stats: Dict[str, Any] = {"total_rows": row[0], "columns": {}}
+    pos = 1
+    for idx, name in enumerate(unique_names(columns)):
+        if numeric[idx]:
+            stats["columns"][name] = {
+                "min": row[pos],
+                "max": row[pos + 1],
+                "mean": row[pos + 2],
+            }
+            pos += 3
+        else:
+            stats["columns"][name] = {"distinct": row[pos]}
+            pos += 1
+    return stats
+
+
+def encode_result(
+    conn,
+    query: str,
+    max_rows: int = SQL_MAX_ROWS,
+    max_bytes: int = SQL_MAX_BYTES,
+    fmt: str = SQL_RESULT_FORMAT,
+    precision: int = FLOAT_PRECISION,
+) -> str:
+    """
+    Execute a query and encode at most max_rows rows / max_bytes bytes.
+
+    Rows are fetched with a cursor, so only the rows that fit the budget
+    (plus one look-ahead row) ever leave SQLite. When the result is cut off,
+    a footer reports the total row count and per-column summary stats.
+
+    Args:
+        conn: SQLAlchemy connection
+        query: SELECT statement to execute
+        max_rows: Maximum number of rows to include
+        max_bytes: Maximum size of the encoded rows in bytes
+        fmt: "csv" or "markdown"
+        precision: Decimal places for floating point values
+
+    Returns:
+        Encoded result as a string
+    """
+    result = conn.exec_driver_sql(query)
+    if not result.returns_rows:
+        return "Query returned no results."
+    columns = list(result.keys())
+    rows = result.fetchmany(max_rows + 1)
+    has_more = len(rows) > max_rows
+    rows = rows[:max_rows]
+    result.close()
+
+    if not rows:
+        annotate(rows=0)
+        return "Query returned no results."
+
+    lines, shown = encode_rows(columns, rows, max_bytes, fmt, precision)
+    has_more = has_more or shown < len(rows)
+
+    if not has_more:
+        annotate(rows=len(rows))
+        return "\n".join(lines)
+
+    try:
+        summary = summarize_result(conn, query, columns, rows[:shown])
+    except Exception:
+        summary = None
+
+    total = summary["total_rows"] if summary else "unknown"
+    annotate(rows=summary["total_rows"] if summary else shown)
+    lines.append(
+        f"-- truncated: showing {shown} of {total} rows "
+        f"(limit {max_rows} rows / {max_bytes} bytes); "
+        "aggregate in SQL or add LIMIT to see more"
+    )
+    if summary:
+        lines.append("-- column summary:")
+        for name, col_stats in summary["columns"].items():
+            parts = ", ".join(
+                f"{key}={format_value(value, precision)}"
+                for key, value in col_stats.items()
+            )
+            lines.append(f"--   {name}: {parts}")
+    return "\n".join(lines)
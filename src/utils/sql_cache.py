@@ -0,0 +1,172 @@
+"""
+Result cache for the SQL tool.
+LRU cache keyed by normalized SQL text and database path, invalidated when the
+database changes (PRAGMA data_version, file mtime/size).
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import quote
+
+# Total size of cached results in bytes (override via environment)
+SQL_CACHE_MAX_BYTES = int(os.getenv("SQL_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+SQL_CACHE_ENABLED = os.getenv("SQL_CACHE_ENABLED", "1") != "0"
+
+# Quoted strings/identifiers are kept verbatim, everything else is normalized
+_SQL_TOKEN_RE = re.compile(
+    r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/|\s+|[^'\"\s/-]+|[-/]",
+    re.DOTALL,
+)
+
+_probes: Dict[str, sqlite3.Connection] = {}
+_probe_lock = threading.Lock()
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Normalize SQL text so trivially different spellings share a cache entry.
+
+    Comments are removed, whitespace is collapsed and unquoted text is
+    lower-cased (SQLite keywords and identifiers are case-insensitive).
+    String literals are preserved exactly.
+    """
+    parts = []
+    for token in _SQL_TOKEN_RE.findall(query):
+        if token.startswith("--") or token.startswith("/*") or token.isspace():
+            parts.append(" ")
+        elif token[0] in "'\"":
+            parts.append(token)
+        else:
+            parts.append(token.lower())
+    return re.sub(r" +", " ", "".join(parts)).strip().rstrip(";").strip()
+
+
+def _file_signature(path: str) -> Tuple[int, ...]:
+    """mtime/size of the database file and its WAL, if present."""
+    signature = []
+    for candidate in (path, path + "-wal"):
+        try:
+            st = os.stat(candidate)
+            signature.extend([st.st_mtime_ns, st.st_size])
+        except FileNotFoundError:
+            signature.extend([0, 0])
+    return tuple(signature)
+
+
+def get_data_version(db_path: str) -> Tuple[int, ...]:
+    """
+    Get a token that changes whenever the database contents change.
+
+    PRAGMA data_version is only comparable on the same connection, so a
+    dedicated long-lived probe connection is kept per database file.
+
+    Args:
+        db_path: Path to the SQLite database
+
+    Returns:
+        Tuple of (data_version, db mtime, db size, wal mtime, wal size)
+    """
+    path = str(Path(db_path).expanduser().resolve())
+    with _probe_lock:
+        conn = _probes.get(path)
+        if conn is None:
+            conn = sqlite3.connect(
+                f"file:{quote(path)}?mode=ro", uri=True, check_same_thread=False
+            )
+            _probes[path] = conn
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+    return (version,) + _file_signature(path)
+
+
+class SQLResultCache:
+    """
+    Thread-safe LRU cache for encoded SQL results with a byte-size budget.
+
+    Each entry remembers the data version token it was computed under; a
+    lookup under a different token drops the entry and counts as a miss.
+    """
+
+    def __init__(self, max_bytes: int = SQL_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Tuple, str, int]]" = (
+            OrderedDict()
+        )
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(query: str, db_path: str) -> Tuple[str, str]:
+        """Build the cache key for a query against a database."""
+        return normalize_sql(query), str(Path(db_path).expanduser().resolve())
+
+    def get(self, key: Tuple[str, str], token: Tuple) -> Optional[str]:
+        """Return the cached result for key if still valid under token."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            entry_token, value, size = entry
+            if entry_token != token:
+                del self._entries[key]
+                self._bytes -= size
+                self._stats["invalidations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, key: Tuple[str, str], token: Tuple, value: str) -> None:
+        """Store a result, evicting least recently used entries to fit."""
+        size = len(value.encode("utf-8")) + len(key[0]) + len(key[1])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (token, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current size."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Process-wide cache used by sql_tool
+_sql_cache = SQLResultCache()
+
+
+def get_sql_cache() -> SQLResultCache:
+    """Get the process-wide SQL result cache."""
+    return _sql_cache
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Get hit-rate counters for the process-wide SQL result cache."""
+    return _sql_cache.stats()
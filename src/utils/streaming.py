@@ -0,0 +1,137 @@
+"""
+Incremental progress events from a workflow run.
+Turns LangGraph's update/message stream into small UI events (routing decision,
+tool calls, LLM tokens, plots, final answer) as soon as each one exists.
+"""
+
+import time
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+from src.utils.artifacts import collect_artifacts
+
+# Stream modes requested from the graph
+STREAM_MODES = ["updates", "messages"]
+
+# Node name of the LLM step inside each ReAct agent (tokens worth showing)
+AGENT_LLM_NODE = "agent"
+
+
+class StreamEvent(NamedTuple):
+    """
+    One UI-level progress event.
+
+    kind is one of "route", "tool_call", "tool_result", "token", "plot" or
+    "answer"; elapsed is seconds since the run started.
+    """
+
+    kind: str
+    agent: str
+    data: Any
+    elapsed: float
+
+
+def _text(content: Any) -> str:
+    """Flatten message content (string or list of blocks) to text."""
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return str(content or "")
+
+
+def _agent_of(namespace: tuple) -> str:
+    """Top-level node name of a (possibly nested) stream namespace."""
+    return namespace[0].split(":", 1)[0] if namespace else ""
+
+
+def stream_events(
+    graph, input: Dict[str, Any], config: Optional[Dict] = None
+) -> Iterator[StreamEvent]:
+    """
+    Run the workflow and yield progress events as they happen.
+
+    Args:
+        graph: Compiled workflow (or CachedWorkflow)
+        input: Graph input ({"messages": [HumanMessage(...)]})
+        config: LangGraph config (thread_id etc.)
+
+    Yields:
+        StreamEvent items; the last one is the final "answer"
+    """
+    start = time.perf_counter()
+    plots: List[str] = []
+
+    def event(kind: str, agent: str, data: Any) -> StreamEvent:
+        return StreamEvent(kind, agent, data, time.perf_counter() - start)
+
+    for namespace, mode, chunk in graph.stream(
+        input, config=config, stream_mode=STREAM_MODES, subgraphs=True
+    ):
+        agent = _agent_of(namespace)
+
+        if mode == "messages":
+            message, metadata = chunk
+            if (
+                namespace
+                and metadata.get("langgraph_node") == AGENT_LLM_NODE
+                and isinstance(message, AIMessageChunk)
+            ):
+                token = _text(message.content)
+                if token:
+                    yield event("token", agent, token)
+            continue
+
+        for node, update in (chunk or {}).items():
+            if not isinstance(update, dict):
+                continue
+            messages = update.get("messages", []) or []
+
+            if namespace:
+                # Steps inside a specialist's ReAct loop
+                for msg in messages:
+                    if isinstance(msg, AIMessage):
+                        for call in msg.tool_calls or []:
+                            yield event("tool_call", agent, call)
+                    elif isinstance(msg, ToolMessage):
+                        text = _text(msg.content)
+                        yield event(
+                            "tool_result", agent, {"name": msg.name, "content": text}
+                        )
+                        for artifact in collect_artifacts([msg]):
+                            if artifact["value"] not in plots:
+                                plots.append(artifact["value"])
+                                yield event("plot", agent, artifact["value"])
+            elif node == "Supervisor":
+                reply = _text(messages[-1].content) if messages else ""
+                if update.get("next") == "FINISH":
+                    # Answered (or declined) without a specialist
+                    yield event(
+                        "answer", node, {"content": reply, "visualizations": []}
+                    )
+                else:
+                    # Several specialists when the question was fanned out
+                    branches = [b["agent"] for b in update.get("branches") or []]
+                    target = ", ".join(branches) or update.get("next", "")
+                    yield event("route", target, reply)
+            elif "branch_results" in update and not messages:
+                # One parallel branch finished; Merge gives the answer
+                for result in update["branch_results"] or []:
+                    for path in result["visualizations"]:
+                        if path not in plots:
+                            plots.append(path)
+                            yield event("plot", node, path)
+            else:
+                # A specialist (or the answer cache) finished the turn
+                for path in update.get("visualizations", []) or []:
+                    if path not in plots:
+                        plots.append(path)
+                        yield event("plot", node, path)
+                reply = _text(messages[-1].content) if messages else ""
+                yield event(
+                    "answer",
+                    update.get("active_agent") or node,
+                    {"content": reply, "visualizations": plots},
+                )
@@ -0,0 +1,333 @@
+"""
+Span tracing for graph nodes, LLM calls and tools.
+A LangChain callback handler attached to the compiled workflow records one
+span per node/LLM/tool run into a ring buffer, exported as JSONL or Prometheus.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, Any, IO, List, Optional, Tuple, Union
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.utils.history import estimate_tokens
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") != "0"
+# Finished spans kept in memory (oldest are dropped)
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "5000"))
+# Histogram buckets (seconds) of the Prometheus export
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+METRIC_PREFIX = "agent"
+
+# Span of the tool call running in this context (for annotate())
+_current_tool: ContextVar[Optional[Dict[str, Any]]] = ContextVar(
+    "current_tool_span", default=None
+)
+
+
+def annotate(**fields: Any) -> None:
+    """
+    Attach measurements (e.g. rows=120) to the tool call being executed.
+
+    No-op when called outside a traced tool call.
+    """
+    span = _current_tool.get()
+    if span is not None:
+        span.update(fields)
+
+
+def _output_text(output: Any) -> str:
+    content = getattr(output, "content", output)
+    return content if isinstance(content, str) else str(content)
+
+
+class Tracer(BaseCallbackHandler):
+    """
+    Records node, LLM and tool spans of workflow runs.
+
+    Span fields: ts, thread_id, run (root run id), kind ("node", "llm",
+    "tool"), name (nested nodes as "AB_Agent/agent"), node (enclosing
+    node), duration_ms, error, plus per kind: tokens_in/tokens_out (llm;
+    tokens_estimated when the model reports no usage), rows/bytes (tool),
+    iterations (node: LLM calls made inside it, i.e. ReAct iterations).
+    """
+
+    run_inline = True
+
+    def __init__(self, buffer_size: int = TRACE_BUFFER_SIZE):
+        self._spans: deque = deque(maxlen=buffer_size)
+        self._open: Dict[UUID, Dict[str, Any]] = {}
+        # run_id -> (parent run_id, root run_id) for every run seen
+        self._runs: Dict[UUID, Tuple[Optional[UUID], UUID]] = {}
+        self._lock = threading.Lock()
+        # (kind, name) -> aggregated counters for the Prometheus export
+        self._totals: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    # --- span bookkeeping --------------------------------------------------
+
+    def _register(self, run_id: UUID, parent: Optional[UUID]) -> UUID:
+        root = self._runs[parent][1] if parent in self._runs else run_id
+        self._runs[run_id] = (parent, root)
+        return root
+
+    def _enclosing_nodes(self, run_id: Optional[UUID]) -> List[Dict[str, Any]]:
+        """Open node spans enclosing a run, innermost first."""
+        nodes = []
+        while run_id is not None:
+            span = self._open.get(run_id)
+            if span is not None and span["kind"] == "node":
+                nodes.append(span)
+            run_id = self._runs.get(run_id, (None, None))[0]
+        return nodes
+
+    def _start(
+        self,
+        run_id: UUID,
+        parent: Optional[UUID],
+        kind: str,
+        name: str,
+        metadata: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        with self._lock:
+            root = self._register(run_id, parent)
+            nodes = self._enclosing_nodes(parent)
+            if kind == "node" and nodes:
+                name = f"{nodes[0]['name']}/{name}"
+            span = {
+                "ts": time.time(),
+                "thread_id": (metadata or {}).get("thread_id"),
+                "run": str(root),
+                "kind": kind,
+                "name": name,
+                "node": nodes[0]["name"] if nodes else None,
+                "_start": time.perf_counter(),
+            }
+            if kind == "node":
+                span["iterations"] = 0
+            self._open[run_id] = span
+            return span
+
+    def _finish(self, run_id: UUID, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+            span = self._open.pop(run_id, None)
+            if span is None:
+                return
+            span["duration_ms"] = (time.perf_counter() - span.pop("_start")) * 1000
+            span["error"] = type(error).__name__ if error is not None else None
+            self._spans.append(span)
+            self._accumulate(span)
+
+    def _accumulate(self, span: Dict[str, Any]) -> None:
+        totals = self._totals.setdefault(
+            (span["kind"], span["name"]),
+            {
+                "count": 0,
+                "errors": 0,
+                "seconds": 0.0,
+                "buckets": [0] * len(DURATION_BUCKETS),
+            },
+        )
+        seconds = span["duration_ms"] / 1000
+        totals["count"] += 1
+        totals["seconds"] += seconds
+        totals["errors"] += span["error"] is not None
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                totals["buckets"][i] += 1
+        for field in ("tokens_in", "tokens_out", "rows", "bytes", "iterations"):
+            if span.get(field) is not None:
+                totals[field] = totals.get(field, 0) + span[field]
+
+    # --- LangChain callbacks -------------------------------------------------
+
+    def on_chain_start(
+        self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs
+    ):
+        metadata = kwargs.get("metadata") or {}
+        node = metadata.get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._start(run_id, parent_run_id, "node", node, metadata)
+        else:
+            with self._lock:
+                self._register(run_id, parent_run_id)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error)
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id, parent_run_id=None, **kwargs
+    ):
+        params = kwargs.get("invocation_params") or {}
+        name = (
+            params.get("model")
+            or params.get("model_name")
+            or (serialized or {}).get("name")
+            or "chat_model"
+        )
+        span = self._start(run_id, parent_run_id, "llm", name, kwargs.get("metadata"))
+        span["tokens_in"] = sum(estimate_tokens(m) for batch in messages for m in batch)
+        span["tokens_estimated"] = True
+        with self._lock:
+            for node in self._enclosing_nodes(parent_run_id):
+                node["iterations"] += 1
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        span = self._open.get(run_id)
+        if span is not None:
+            generations = [g for batch in response.generations for g in batch]
+            message = getattr(generations[0], "message", None) if generations else None
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                span["tokens_in"] = usage.get("input_tokens", span["tokens_in"])
+                span["tokens_out"] = usage.get("output_tokens", 0)
+                span["tokens_estimated"] = False
+            elif message is not None:
+                span["tokens_out"] = estimate_tokens(message)
+        self._finish(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error)
+
+    def on_tool_start(
+        self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs
+    ):
+        name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+        span = self._start(run_id, parent_run_id, "tool", name, kwargs.get("metadata"))
+        _current_tool.set(span)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        span = self._open.get(run_id)
+        if span is not None:
+            span["bytes"] = len(_output_text(output).encode("utf-8"))
+            if _current_tool.get() is span:
+                _current_tool.set(None)
+        self._finish(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        if _current_tool.get() is self._open.get(run_id):
+            _current_tool.set(None)
+        self._finish(run_id, error)
+
+    # --- queries and exports -------------------------------------------------
+
+    def spans(self, thread_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get buffered spans (oldest first), optionally for one thread."""
+        with self._lock:
+            spans = list(self._spans)
+        if thread_id is not None:
+            spans = [s for s in spans if s["thread_id"] == thread_id]
+        return spans
+
+    def breakdown(self, thread_id: str, last_run: bool = True) -> List[Dict[str, Any]]:
+        """
+        Latency per node/LLM/tool for a conversation thread.
+
+        Args:
+            thread_id: Conversation thread
+            last_run: Only the most recent query of the thread
+
+        Returns:
+            Rows with kind, name, calls, total_ms, max_ms and the summed
+            tokens/rows/bytes, slowest first
+        """
+        spans = self.spans(thread_id)
+        if last_run and spans:
+            latest = spans[-1]["run"]
+            spans = [s for s in spans if s["run"] == latest]
+        rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for span in spans:
+            row = rows.setdefault(
+                (span["kind"], span["name"]),
+                {
+                    "kind": span["kind"],
+                    "name": span["name"],
+                    "calls": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                },
+            )
+            row["calls"] += 1
+            row["total_ms"] += span["duration_ms"]
+            row["max_ms"] = max(row["max_ms"], span["duration_ms"])
+            for field in ("tokens_in", "tokens_out", "rows", "bytes", "iterations"):
+                if span.get(field) is not None:
+                    row[field] = row.get(field, 0) + span[field]
+        return sorted(rows.values(), key=lambda row: -row["total_ms"])
+
+    def export_jsonl(
+        self, target: Union[str, IO[str]], thread_id: Optional[str] = None
+    ) -> int:
+        """
+        Write buffered spans as JSON lines.
+
+        Args:
+            target: File path (appended to) or an open text stream
+            thread_id: Only spans of this thread
+
+        Returns:
+            Number of spans written
+        """
+        spans = self.spans(thread_id)
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        if isinstance(target, str):
+            with open(target, "a", encoding="utf-8") as f:
+                f.write(lines)
+        else:
+            target.write(lines)
+        return len(spans)
+
+    def prometheus(self) -> str:
+        """Render cumulative metrics in the Prometheus text exposition format."""
+        with self._lock:
+            totals = {key: dict(value) for key, value in self._totals.items()}
+        p = METRIC_PREFIX
+        out = [
+            f"# HELP {p}_span_duration_seconds Duration of nodes, LLM calls and tools.",
+            f"# TYPE {p}_span_duration_seconds histogram",
+        ]
+        for (kind, name), t in sorted(totals.items()):
+            labels = f'kind="{kind}",name="{name}"'
+            for bound, count in zip(DURATION_BUCKETS, t["buckets"]):
+                out.append(
+                    f'{p}_span_duration_seconds_bucket{{{labels},le="{bound}"}} {count}'
+                )
+            out.append(
+                f'{p}_span_duration_seconds_bucket{{{labels},le="+Inf"}} {t["count"]}'
+            )
+            out.append(f"{p}_span_duration_seconds_sum{{{labels}}} {t['seconds']:.6f}")
+            out.append(f"{p}_span_duration_seconds_count{{{labels}}} {t['count']}")
+
+        counters = [
+            ("errors", "span_errors_total", "Failed spans."),
+            ("tokens_in", "llm_input_tokens_total", "LLM input tokens."),
+            ("tokens_out", "llm_output_tokens_total", "LLM output tokens."),
+            ("rows", "tool_rows_total", "Rows returned by tools."),
+            ("bytes", "tool_output_bytes_total", "Bytes of tool output."),
+            ("iterations", "react_iterations_total", "LLM calls of ReAct loops."),
+        ]
+        for field, metric, help_text in counters:
+            out.append(f"# HELP {p}_{metric} {help_text}")
+            out.append(f"# TYPE {p}_{metric} counter")
+            for (kind, name), t in sorted(totals.items()):
+                if field in t:
+                    out.append(
+                        f'{p}_{metric}{{kind="{kind}",name="{name}"}} {t[field]}'
+                    )
+        return "\n".join(out) + "\n"
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer attached to compiled workflows."""
+    return _tracer
@@ -0,0 +1,66 @@
+"""
+Shared fixtures for the test suite.
+Every test runs against a private copy of the shipped database, and files the
+agents write (checkpoints, routing log, LLM cache) go to a temporary directory.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Set before any src module reads its configuration
+_SCRATCH = Path(tempfile.mkdtemp(prefix="agent-tests-"))
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("LLM_CACHE_MODE", "off")
+os.environ.setdefault("CHECKPOINT_DB_PATH", str(_SCRATCH / "checkpoints.db"))
+os.environ.setdefault("ROUTING_LOG_PATH", str(_SCRATCH / "routing.jsonl"))
+os.environ.setdefault("PYTHON_WORKERS", "0")
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    """Copy of ecommerce.db that tests may modify."""
+    target = tmp_path / "ecommerce.db"
+    shutil.copy(REPO_ROOT / "ecommerce.db", target)
+    return str(target)
+
+
+@pytest.fixture
+def write_conn(db_path):
+    """Writable sqlite3 connection to the test database copy."""
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def bare_db_path(db_path) -> str:
+    """
+    Test database stripped of summary tables, default indexes and planner
+    statistics, like a database created before they existed.
+    """
+    from src.utils.index_advisor import DEFAULT_INDEXES
+    from src.utils.materialize import SUMMARY_TABLES
+
+    conn = sqlite3.connect(db_path)
+    try:
+        triggers = conn.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE type = 'trigger' AND name LIKE 'summary_%'"
+        ).fetchall()
+        for (trigger,) in triggers:
+            conn.execute(f"DROP TRIGGER {trigger}")
+        for table in [*SUMMARY_TABLES, "summary_state", "sqlite_stat1"]:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        for index in DEFAULT_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {index}")
+        conn.commit()
+    finally:
+        conn.close()
+    return db_path
@@ -0,0 +1,117 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.utils.answer_cache import CachedWorkflow
+
+
+class FakeGraph:
+    """Compiled-graph stand-in answering with a numbered reply."""
+
+    checkpointer = None
+
+    def __init__(self, reply: str = "Answer"):
+        self.reply = reply
+        self.calls = 0
+
+    def invoke(self, input, config=None, **kwargs):
+        self.calls += 1
+        return {
+            "messages": [
+                *input["messages"],
+                AIMessage(content=f"{self.reply} {self.calls}"),
+            ],
+            "active_agent": "General_Agent",
+            "visualizations": [],
+        }
+
+
+def _ask(workflow, question: str, **kwargs):
+    result = workflow.invoke({"messages": [HumanMessage(content=question)]}, **kwargs)
+    return result["messages"][-1].content
+
+
+def test_repeated_question_is_served_from_cache(db_path):
+    graph = FakeGraph()
+    workflow = CachedWorkflow(graph, db_path=db_path)
+    assert _ask(workflow, "What is total revenue?") == "Answer 1"
+    assert _ask(workflow, "  what is TOTAL revenue ") == "Answer 1"
+    assert graph.calls == 1
+    assert workflow.stats()["hits"] == 1
+
+
+def test_data_change_invalidates_answers(db_path, write_conn):
+    graph = FakeGraph()
+    workflow = CachedWorkflow(graph, db_path=db_path)
+    _ask(workflow, "How many products are there?")
+    write_conn.execute(
+        "INSERT INTO products (product_id, created_at, product_name) "
+        "VALUES (99, '2024-01-01', 'New')"
+    )
+    write_conn.commit()
+    assert _ask(workflow, "How many products are there?") == "Answer 2"
+    assert graph.calls == 2
+
+
+def test_follow_ups_and_bypass_skip_the_cache(db_path):
+    graph = FakeGraph()
+    workflow = CachedWorkflow(graph, db_path=db_path)
+    _ask(workflow, "and by device?")
+    _ask(workflow, "and by device?")
+    _ask(workflow, "Top products", bypass_cache=True)
+    _ask(workflow, "Top products", config={"configurable": {"bypass_cache": True}})
+    assert graph.calls == 4
+    assert workflow.stats()["bypassed"] == 4
+    assert workflow.stats()["entries"] == 0
+
+
+def test_errors_are_not_cached(db_path):
+    graph = FakeGraph(reply="Analysis error: no such table")
+    workflow = CachedWorkflow(graph, db_path=db_path)
+    _ask(workflow, "Revenue by region")
+    _ask(workflow, "Revenue by region")
+    assert graph.calls == 2
+
+
+def test_lru_eviction(db_path):
+    workflow = CachedWorkflow(FakeGraph(), db_path=db_path, max_entries=1)
+    _ask(workflow, "Total revenue")
+    _ask(workflow, "Total orders")
+    assert workflow.stats()["evictions"] == 1
+    assert _ask(workflow, "Total revenue") == "Answer 3"
+
+
+class ThreadedGraph(FakeGraph):
+    """Answers depend on the thread's first question, like a real conversation."""
+
+    def __init__(self):
+        super().__init__()
+        self.history = {}
+
+    def invoke(self, input, config=None, **kwargs):
+        self.calls += 1
+        thread_id = config["configurable"]["thread_id"]
+        question = input["messages"][-1].content
+        earlier = self.history.setdefault(thread_id, [])
+        answer = f"{question} for {earlier[0]}" if earlier else f"{question} done"
+        earlier.append(question)
+        return {
+            "messages": [*input["messages"], AIMessage(content=answer)],
+            "active_agent": "General_Agent",
+            "visualizations": [],
+        }
+
+
+def test_references_to_earlier_turns_are_not_shared_between_threads(db_path):
+    graph = ThreadedGraph()
+    workflow = CachedWorkflow(graph, db_path=db_path)
+    first = {"configurable": {"thread_id": "first"}}
+    second = {"configurable": {"thread_id": "second"}}
+    _ask(workflow, "Revenue by device", config=first)
+    _ask(workflow, "Orders by month", config=second)
+    for question in (
+        "plot that as a bar chart",
+        "show it by device",
+        "Break this down by month",
+    ):
+        assert _ask(workflow, question, config=first).endswith("Revenue by device")
+        assert _ask(workflow, question, config=second).endswith("Orders by month")
+    assert workflow.stats()["hits"] == 0
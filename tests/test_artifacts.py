@@ -0,0 +1,111 @@
+import json
+
+import pandas as pd
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+
+from src.utils.artifacts import (
+    capture_artifacts,
+    collect_artifacts,
+    describe_artifacts,
+    extract_response,
+    install_savefig_hook,
+    parse_visualization,
+    register_artifact,
+    show_figure,
+    show_table,
+)
+
+
+def test_capture_collects_registered_artifacts_once():
+    register_artifact("image", "ignored.png")  # outside a capture: no-op
+    with capture_artifacts() as artifacts:
+        register_artifact("image", "plots/a.png")
+        register_artifact("image", "plots/a.png")
+        with capture_artifacts() as inner:
+            register_artifact("plotly", "{}")
+        register_artifact("image", "plots/b.png")
+    assert artifacts == [
+        {"kind": "image", "value": "plots/a.png"},
+        {"kind": "image", "value": "plots/b.png"},
+    ]
+    assert inner == [{"kind": "plotly", "value": "{}"}]
+
+
+def test_show_table_registers_split_json():
+    df = pd.DataFrame({"segment": ["whale", "casual"], "users": [3, 40]})
+    with capture_artifacts() as artifacts:
+        show_table(df, max_rows=1)
+    [artifact] = artifacts
+    assert artifact["kind"] == "table"
+    kind, table = parse_visualization(artifact["value"])
+    assert kind == "table"
+    assert table["columns"] == ["segment", "users"]
+    assert table["data"] == [["whale", 3]]
+
+
+def test_savefig_registers_images(tmp_path, monkeypatch):
+    from matplotlib.figure import Figure
+
+    monkeypatch.chdir(tmp_path)
+    install_savefig_hook()
+    with capture_artifacts() as artifacts:
+        Figure().savefig("chart")
+        Figure().savefig(str(tmp_path / "report.pdf"))
+        show_figure(Figure())
+    assert [a["kind"] for a in artifacts] == ["image", "image"]
+    assert artifacts[0]["value"] == "chart.png"
+    assert artifacts[1]["value"].startswith("plots/plot_")
+    assert (tmp_path / artifacts[1]["value"]).exists()
+
+
+def test_show_figure_sends_plotly_json():
+    go = pytest.importorskip("plotly.graph_objects")
+    with capture_artifacts() as artifacts:
+        show_figure(go.Figure(go.Bar(x=["a"], y=[1])))
+    [artifact] = artifacts
+    assert artifact["kind"] == "plotly"
+    assert parse_visualization(artifact["value"]) == ("plotly", artifact["value"])
+
+
+def test_show_figure_rejects_other_objects():
+    with pytest.raises(TypeError):
+        show_figure(object())
+
+
+def test_parse_visualization_kinds():
+    assert parse_visualization(" plots/x.PNG ") == ("image", "plots/x.PNG")
+    assert parse_visualization("out.svg") == ("image", "out.svg")
+    table = json.dumps({"columns": ["a"], "index": [0], "data": [[1]]})
+    assert parse_visualization(table)[0] == "table"
+    spec = json.dumps({"data": [], "layout": {}})
+    assert parse_visualization(spec) == ("plotly", spec)
+
+
+def test_collect_artifacts_from_tool_messages():
+    image = {"kind": "image", "value": "plots/a.png"}
+    table = {"kind": "table", "value": '{"columns": []}'}
+    messages = [
+        AIMessage(
+            content="", tool_calls=[{"name": "python_tool", "args": {}, "id": "1"}]
+        ),
+        ToolMessage(content="done", tool_call_id="1", artifact=[image]),
+        ToolMessage(content="rows", tool_call_id="2"),
+        ToolMessage(content="again", tool_call_id="3", artifact=[image, table]),
+        AIMessage(content="Here is the chart."),
+    ]
+    assert collect_artifacts(messages) == [image, table]
+    assert extract_response(messages) == (
+        "Here is the chart.",
+        ["plots/a.png", '{"columns": []}'],
+    )
+
+
+def test_describe_artifacts():
+    text = describe_artifacts(
+        [
+            {"kind": "image", "value": "plots/a.png"},
+            {"kind": "plotly", "value": "{}"},
+        ]
+    )
+    assert text == "[image saved: plots/a.png]\n[plotly displayed to the user]"
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from benchmarks.fake_llm import SCENARIOS, scripted_llm_factory
+from src.tools.analysis_tools import python_tool, sql_tool
+from src.utils.llm_config import set_llm_factory
+
+SCENARIO_BY_NAME = {scenario.name: scenario for scenario in SCENARIOS}
+
+
+@pytest.fixture
+def workdir(db_path, tmp_path, monkeypatch):
+    # Tools default to ./ecommerce.db; the kernel writes to ./plots
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def scripted_llm():
+    set_llm_factory(scripted_llm_factory(SCENARIOS))
+    yield
+    set_llm_factory(None)
+
+
+def test_sql_tool_ainvoke_matches_invoke(workdir):
+    query = "SELECT COUNT(*) AS n FROM orders"
+    expected = sql_tool.invoke({"query": query})
+
+    async def run():
+        return await asyncio.gather(
+            *(sql_tool.ainvoke({"query": query}) for _ in range(5))
+        )
+
+    assert asyncio.run(run()) == [expected] * 5
+    assert expected.startswith("n\n")
+
+
+def test_python_tool_ainvoke_returns_output(workdir):
+    result = asyncio.run(
+        python_tool.ainvoke(
+            {
+                "type": "tool_call",
+                "name": "python_tool",
+                "id": "call_1",
+                "args": {"code": "print(6 * 7)"},
+            }
+        )
+    )
+    assert result.content == "42"
+    assert result.artifact == []
+
+
+def test_workflow_ainvoke_answers_concurrent_threads(workdir, scripted_llm):
+    from main import create_workflow
+
+    graph = create_workflow()
+    names = ["general_top_products", "ab_test"]
+
+    async def ask(name):
+        scenario = SCENARIO_BY_NAME[name]
+        result = await graph.ainvoke(
+            {"messages": [HumanMessage(content=scenario.question)]},
+            {"configurable": {"thread_id": f"async-{name}"}},
+        )
+        return result["messages"][-1].content
+
+    async def run():
+        return await asyncio.gather(*(ask(name) for name in names))
+
+    answers = asyncio.run(run())
+    assert answers == [SCENARIO_BY_NAME[name].answer for name in names]
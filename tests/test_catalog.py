@@ -0,0 +1,36 @@
+import hashlib
+from pathlib import Path
+
+from src.utils.catalog import SchemaCatalog
+from src.utils.index_advisor import ensure_default_indexes
+
+
+def _columns(catalog, table):
+    (entry,) = [t for t in catalog.tables() if t["name"] == table]
+    return {col["name"]: col for col in entry["columns"]}
+
+
+def test_row_counts_follow_inserts(db_path, write_conn):
+    catalog = SchemaCatalog(db_path)
+    before = catalog.row_counts()["orders"]
+    write_conn.execute(
+        "INSERT INTO orders (created_at, user_id, price_usd, cogs_usd) "
+        "VALUES ('2030-01-01 00:00:00', 1, 10.0, 4.0)"
+    )
+    write_conn.commit()
+    assert catalog.row_counts()["orders"] == before + 1
+    assert "2030-01-01 00:00:00" in catalog.schema_string()
+
+
+def test_distinct_counts_come_from_analyze(bare_db_path):
+    catalog = SchemaCatalog(bare_db_path)
+    assert _columns(catalog, "orders")["user_id"]["distinct"] is None
+    ensure_default_indexes(bare_db_path)
+    users = _columns(catalog, "orders")["user_id"]["distinct"]
+    assert users and users > 1
+
+
+def test_catalog_does_not_modify_the_database(db_path):
+    digest = hashlib.sha256(Path(db_path).read_bytes()).hexdigest()
+    SchemaCatalog(db_path).schema_string()
+    assert hashlib.sha256(Path(db_path).read_bytes()).hexdigest() == digest
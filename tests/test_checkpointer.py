@@ -0,0 +1,91 @@
+import os
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+from src.utils.checkpointer import BoundedSqliteSaver
+
+
+@pytest.fixture
+def saver(tmp_path):
+    return BoundedSqliteSaver(str(tmp_path / "checkpoints.db"), keep_last=2)
+
+
+def _config(thread_id: str, checkpoint_ns: str = ""):
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}}
+
+
+def _put(saver, thread_id: str, checkpoint_ns: str = "", payload: str = ""):
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"payload": payload}
+    return saver.put(_config(thread_id, checkpoint_ns), checkpoint, {}, {})
+
+
+def test_writes_are_buffered_until_a_batch_fills(tmp_path):
+    saver = BoundedSqliteSaver(str(tmp_path / "c.db"), batch_size=3, flush_seconds=60)
+    _put(saver, "t")
+    _put(saver, "t")
+    assert saver.stats()["flushes"] == 0
+    _put(saver, "t")
+    assert saver.stats()["flushes"] == 1
+    assert saver.stats()["buffered"] == 0
+
+
+def test_reads_see_buffered_checkpoints(saver):
+    config = _put(saver, "t", payload="hello")
+    found = saver.get_tuple(config)
+    assert found.checkpoint["channel_values"] == {"payload": "hello"}
+    assert saver.get_tuple(_config("t")).config == config
+
+
+def test_threads_are_trimmed_to_keep_last(saver):
+    configs = [_put(saver, "t") for _ in range(5)]
+    saver.put_writes(configs[0], [("messages", "old")], "task")
+    saver.flush()
+    kept = [c.config for c in saver.list(_config("t"))]
+    assert kept == configs[:2:-1]
+    assert saver.stats()["trimmed"] == 3
+    assert saver._conn.execute("SELECT COUNT(*) FROM writes").fetchone()[0] == 0
+
+
+def test_finished_subgraphs_are_dropped(saver):
+    _put(saver, "t", "Segmentation_Agent:1")
+    saver.flush()
+    _put(saver, "t")
+    saver.flush()
+    namespaces = {
+        row[0]
+        for row in saver._conn.execute("SELECT DISTINCT checkpoint_ns FROM checkpoints")
+    }
+    assert namespaces == {""}
+
+
+def test_compact_drops_idle_threads(saver):
+    _put(saver, "idle")
+    saver.flush()
+    saver._conn.execute("UPDATE checkpoints SET updated_at = 0")
+    _put(saver, "active")
+    report = saver.compact()
+    assert report["idle_threads"] == 1
+    assert [c.config["configurable"]["thread_id"] for c in saver.list(None)] == [
+        "active"
+    ]
+
+
+def test_compact_drops_least_recently_used_threads_over_max_bytes(saver):
+    for thread_id in ("oldest", "older", "newest"):
+        _put(saver, thread_id, payload=os.urandom(200_000).hex())
+        saver.flush()
+    saver.max_bytes = saver.size_bytes() // 2
+    report = saver.compact()
+    assert report["lru_threads"] >= 1
+    remaining = {c.config["configurable"]["thread_id"] for c in saver.list(None)}
+    assert "oldest" not in remaining
+    assert "newest" in remaining
+    assert saver.size_bytes() <= saver.max_bytes
+
+
+def test_delete_thread(saver):
+    _put(saver, "t")
+    saver.delete_thread("t")
+    assert saver.get_tuple(_config("t")) is None
@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from src.utils.db import get_engine, get_pool_stats
+
+
+def test_engine_is_shared_per_file(db_path, tmp_path):
+    engine = get_engine(db_path)
+    assert get_engine(str(tmp_path / "." / "ecommerce.db")) is engine
+
+
+def test_engine_is_read_only(db_path):
+    with get_engine(db_path).connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM products").scalar() > 0
+        with pytest.raises(OperationalError):
+            conn.exec_driver_sql("DELETE FROM products")
+
+
+def test_pool_reuses_connections(db_path):
+    engine = get_engine(db_path)
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1").scalar()
+    stats = next(s for path, s in get_pool_stats().items() if path.endswith(db_path))
+    assert stats["checkouts"] >= 3
+    assert stats["pool_misses"] == 1
@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+from src.tools.frame_store import FrameStore, _frame_bytes, get_frame_store
+from src.utils.checkpointer import BoundedSqliteSaver
+
+
+def _frame(rows: int = 100) -> pd.DataFrame:
+    return pd.DataFrame({"v": range(rows)})
+
+
+def test_oldest_frames_of_a_thread_are_dropped():
+    store = FrameStore(frames_per_thread=2)
+    handles = [store.put(_frame(), "t") for _ in range(3)]
+    assert list(store.handles("t")) == handles[1:]
+    with pytest.raises(KeyError):
+        store.get(handles[0], "t")
+
+
+def test_least_recently_used_threads_are_dropped():
+    store = FrameStore(max_threads=2)
+    store.put(_frame(), "a")
+    store.put(_frame(), "b")
+    store.get("df_1", "a")
+    store.put(_frame(), "c")
+    assert store.handles("b") == {}
+    assert list(store.handles("a")) == list(store.handles("c")) == ["df_1"]
+    assert store.stats()["threads"] == 2
+
+
+def test_idle_threads_expire():
+    store = FrameStore(ttl_seconds=0)
+    store.put(_frame(), "idle")
+    store.put(_frame(), "active")
+    assert store.handles("idle") == {}
+    assert store.stats() == {
+        "threads": 1,
+        "frames": 1,
+        "bytes": _frame_bytes(_frame()),
+    }
+
+
+def test_byte_cap_keeps_the_newest_frame_of_the_current_thread():
+    size = _frame_bytes(_frame())
+    store = FrameStore(max_bytes=size + size // 2)
+    store.put(_frame(), "other")
+    store.put(_frame(), "t")
+    assert store.handles("other") == {}
+    newest = store.put(_frame(), "t")
+    assert list(store.handles("t")) == [newest]
+    assert store.stats()["bytes"] == size
+
+    # Even a single frame over the cap stays available to its thread
+    big = store.put(_frame(10_000), "t")
+    assert list(store.handles("t")) == [big]
+
+
+def test_handles_are_not_reused_after_eviction():
+    store = FrameStore(max_threads=1)
+    assert store.put(_frame(), "a") == "df_1"
+    store.put(_frame(), "b")
+    assert store.put(_frame(), "a") == "df_2"
+
+
+def test_deleted_checkpoint_threads_release_frames(tmp_path):
+    store = get_frame_store()
+    store.put(_frame(), "deleted")
+    store.put(_frame(), "idle")
+    saver = BoundedSqliteSaver(str(tmp_path / "checkpoints.db"), idle_seconds=0)
+
+    saver.delete_thread("deleted")
+    assert store.handles("deleted") == {}
+
+    config = {"configurable": {"thread_id": "idle", "checkpoint_ns": ""}}
+    saver.put(config, empty_checkpoint(), {}, {})
+    assert saver.compact()["idle_threads"] == 1
+    assert store.handles("idle") == {}
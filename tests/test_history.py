@@ -0,0 +1,61 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.utils.history import (
+    SUMMARY_HEADER,
+    HistoryManager,
+    estimate_tokens,
+    split_turns,
+)
+
+
+def _conversation(turns: int, answer_chars: int = 400):
+    messages = []
+    for i in range(turns):
+        messages += [
+            HumanMessage(content=f"Question {i}"),
+            AIMessage(content=f"Routing to General_Agent: turn {i}"),
+            AIMessage(content=f"Answer {i} " + "x" * answer_chars),
+        ]
+    return messages
+
+
+def test_split_turns_starts_at_user_messages():
+    turns = split_turns(_conversation(3))
+    assert len(turns) == 3
+    assert all(isinstance(turn[0], HumanMessage) for turn in turns)
+
+
+def test_recent_turns_are_verbatim_and_older_ones_summarized():
+    manager = HistoryManager(keep_recent_turns=2)
+    result = manager.compact(_conversation(6), budget=1000, thread_id="t")
+    summary, *recent = result
+    assert summary.content.startswith(SUMMARY_HEADER)
+    assert "Q: Question 0 A (General_Agent): Answer 0" in summary.content
+    assert [m.content for m in recent if isinstance(m, HumanMessage)] == [
+        "Question 4",
+        "Question 5",
+    ]
+    assert not any(m.content.startswith("Routing to") for m in recent)
+
+
+def test_budget_is_respected_and_latest_turn_always_kept():
+    messages = _conversation(20)
+    manager = HistoryManager()
+    for budget in (300, 600, 1200):
+        result = manager.compact(messages, budget=budget, thread_id="t")
+        assert sum(map(estimate_tokens, result)) <= budget
+        assert result[-2].content == "Question 19"
+
+    # A single oversized turn is still passed whole
+    result = manager.compact(messages, budget=10, thread_id="t")
+    assert result[0].content == "Question 19"
+
+
+def test_summaries_are_extended_incrementally():
+    manager = HistoryManager(keep_recent_turns=1)
+    messages = _conversation(5)
+    manager.compact(messages, budget=2000, thread_id="t")
+    assert manager.stats()["summarized"] == 4
+    messages += _conversation(1)
+    manager.compact(messages, budget=2000, thread_id="t")
+    assert manager.stats()["summarized"] == 5
@@ -0,0 +1,89 @@
+import sqlite3
+
+from src.tools.analysis_tools import _run_sql
+from src.utils.catalog import SchemaCatalog
+from src.utils.db import get_engine
+from src.utils.index_advisor import (
+    DEFAULT_INDEXES,
+    INDEX_ADVISOR_MIN_SCANS,
+    IndexAdvisor,
+    create_default_indexes,
+    ensure_default_indexes,
+    get_index_advisor,
+)
+from src.utils.sql_cache import get_sql_cache
+
+
+def _indexes(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' "
+                "AND sql IS NOT NULL"
+            )
+        }
+    finally:
+        conn.close()
+
+
+def test_shipped_database_has_the_default_indexes(db_path):
+    assert set(DEFAULT_INDEXES) <= _indexes(db_path)
+    assert ensure_default_indexes(db_path) == []
+
+
+def test_default_indexes_are_created_once(bare_db_path, write_conn):
+    assert set(create_default_indexes(write_conn)) == set(DEFAULT_INDEXES)
+    assert create_default_indexes(write_conn) == []
+    assert ensure_default_indexes(bare_db_path) == []
+
+
+def test_reading_the_catalog_creates_no_indexes(db_path):
+    before = _indexes(db_path)
+    SchemaCatalog(db_path).schema_string()
+    assert _indexes(db_path) == before
+
+
+def test_repeated_full_scans_are_recommended(db_path):
+    advisor = IndexAdvisor()
+    query = (
+        "SELECT utm_source, COUNT(*) FROM website_sessions "
+        "WHERE device_type = 'mobile' GROUP BY utm_source"
+    )
+    with get_engine(db_path).connect() as conn:
+        for _ in range(INDEX_ADVISOR_MIN_SCANS):
+            result = advisor.observe(conn, query, db_path)
+    assert result["scans"] == [
+        {"table": "website_sessions", "columns": ("device_type", "utm_source")}
+    ]
+    assert advisor.stats()["table_scans"] == {
+        "website_sessions": INDEX_ADVISOR_MIN_SCANS
+    }
+
+    (recommendation,) = advisor.recommendations()
+    assert recommendation["columns"] == ["device_type", "utm_source"]
+    assert advisor.apply([recommendation]) == [recommendation["sql"]]
+    assert advisor.recommendations() == []
+
+
+def test_indexed_lookups_are_not_reported(db_path):
+    advisor = IndexAdvisor()
+    with get_engine(db_path).connect() as conn:
+        result = advisor.observe(
+            conn, "SELECT * FROM orders WHERE order_id = 1", db_path
+        )
+    assert result["scans"] == []
+
+
+def test_sql_cache_hits_are_counted(db_path):
+    query = "SELECT COUNT(*) FROM website_sessions WHERE device_type = 'desktop'"
+    for _ in range(INDEX_ADVISOR_MIN_SCANS):
+        _run_sql(query, db_path)
+    assert get_sql_cache().stats()["hits"] >= INDEX_ADVISOR_MIN_SCANS - 1
+    recommended = [
+        r["columns"]
+        for r in get_index_advisor().recommendations()
+        if r["key"][0] == db_path
+    ]
+    assert recommended == [["device_type"]]
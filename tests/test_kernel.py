@@ -0,0 +1,72 @@
+import sys
+import threading
+
+import pytest
+
+from src.tools.kernel import PythonKernel, _RoutedStdout
+
+
+@pytest.fixture
+def kernel(tmp_path, monkeypatch):
+    # INIT_CODE creates a plots/ directory in the working directory
+    monkeypatch.chdir(tmp_path)
+    return PythonKernel()
+
+
+def test_namespace_persists_between_runs(kernel):
+    kernel.run("x = 41")
+    output, artifacts = kernel.run("print(x + 1)")
+    assert output == "42\n"
+    assert artifacts == []
+
+
+def test_libraries_are_imported_only_when_referenced(kernel):
+    kernel.run("print(1)")
+    assert kernel.stats()["lazy_imports"] == []
+    assert "stats" not in kernel.namespace
+
+    output, _ = kernel.run("print(stats.norm.cdf(0))")
+    assert output == "0.5\n"
+    assert kernel.stats()["lazy_imports"] == ["stats"]
+
+    kernel.run("print(stats.norm.cdf(1) > 0.5)")
+    assert kernel.stats()["lazy_imports"] == ["stats"]
+
+
+def test_exception_is_reported_after_partial_output(kernel):
+    output, _ = kernel.run("print('before')\n1 / 0")
+    assert output.startswith("before\n")
+    assert "ZeroDivisionError" in output
+
+
+def test_concurrent_kernels_capture_only_their_own_output(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    kernels = {name: PythonKernel() for name in ("a", "b")}
+    outputs = {}
+    barrier = threading.Barrier(len(kernels))
+
+    def run(name):
+        kernels[name].start()
+        barrier.wait()
+        outputs[name], _ = kernels[name].run(
+            f"for _ in range(200):\n    print('{name}')\n    time.sleep(0)"
+        )
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in kernels]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for name, output in outputs.items():
+        assert output.splitlines() == [name] * 200
+
+
+def test_stdout_outside_an_execution_reaches_the_original_stream(kernel, capsys):
+    output, _ = kernel.run("print('inside')")
+    assert isinstance(sys.stdout, _RoutedStdout)
+    print("outside")
+    captured = capsys.readouterr().out
+    assert output == "inside\n"
+    assert "outside" in captured
+    assert "inside" not in captured
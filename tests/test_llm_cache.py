@@ -0,0 +1,117 @@
+import json
+from typing import Any, List, Optional
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.utils import llm_cache
+from src.utils.llm_cache import LLMCacheMiss, SQLiteLLMCache, cache_key
+
+
+class CountingChatModel(BaseChatModel):
+    """Answers with the number of calls made so far."""
+
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "counting"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.calls += 1
+        message = AIMessage(
+            content=f"answer {self.calls}",
+            usage_metadata={"input_tokens": 5, "output_tokens": 2, "total_tokens": 7},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _cache(tmp_path, mode, **kwargs):
+    return SQLiteLLMCache(str(tmp_path / "llm_cache.db"), mode=mode, **kwargs)
+
+
+def _generation(text: str):
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+def test_cache_key_ignores_response_details():
+    question = HumanMessage(content="Top products?")
+    a = [question, AIMessage(content="Routing", id="run-1", usage_metadata=None)]
+    b = [
+        question,
+        AIMessage(
+            content="Routing",
+            id="run-2",
+            response_metadata={"finish_reason": "STOP"},
+            usage_metadata={"input_tokens": 1, "output_tokens": 1, "total_tokens": 2},
+        ),
+    ]
+    assert cache_key(dumps(a), "model") == cache_key(dumps(b), "model")
+    assert cache_key(dumps(a), "model") != cache_key(dumps(a), "other-model")
+    changed = [question, AIMessage(content="Routed")]
+    assert cache_key(dumps(a), "model") != cache_key(dumps(changed), "model")
+
+
+def test_read_write_serves_hits(tmp_path):
+    model = CountingChatModel(cache=_cache(tmp_path, "read_write"))
+    first = model.invoke([HumanMessage(content="hi")])
+    second = model.invoke([HumanMessage(content="hi")])
+    model.invoke([HumanMessage(content="bye")])
+    assert first.content == second.content == "answer 1"
+    assert model.calls == 2
+    stats = model.cache.stats()
+    assert (stats["hits"], stats["writes"], stats["entries"]) == (1, 2, 2)
+
+
+def test_record_always_calls_and_replay_never_does(tmp_path):
+    recorder = CountingChatModel(cache=_cache(tmp_path, "record"))
+    recorder.invoke([HumanMessage(content="hi")])
+    recorder.invoke([HumanMessage(content="hi")])
+    assert recorder.calls == 2
+
+    replayer = CountingChatModel(cache=_cache(tmp_path, "replay"))
+    # The last recorded response is replayed
+    assert replayer.invoke([HumanMessage(content="hi")]).content == "answer 2"
+    with pytest.raises(LLMCacheMiss):
+        replayer.invoke([HumanMessage(content="never recorded")])
+    assert replayer.calls == 0
+    assert replayer.cache.stats()["entries"] == 1
+
+
+def test_replay_does_not_store(tmp_path):
+    cache = _cache(tmp_path, "replay")
+    cache.update("prompt", "model", _generation("x"))
+    assert cache.stats()["entries"] == 0
+
+
+def test_eviction_keeps_recently_used_entries(tmp_path):
+    size = len(json.dumps([llm_cache._dump_generation(_generation("a" * 50)[0])]))
+    cache = _cache(tmp_path, "read_write", max_bytes=size * 2)
+    cache.update("p1", "m", _generation("a" * 50))
+    cache.update("p2", "m", _generation("b" * 50))
+    assert cache.lookup("p1", "m") is not None  # p2 is now least recently used
+    cache.update("p3", "m", _generation("c" * 50))
+    assert cache.lookup("p2", "m") is None
+    assert cache.lookup("p1", "m")[0].message.content == "a" * 50
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= size * 2
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        _cache(tmp_path, "sometimes")
+
+
+def test_cache_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_MODE", "off")
+    assert llm_cache.get_llm_cache() is None
@@ -0,0 +1,44 @@
+import pytest
+from langchain_core.messages import HumanMessage
+
+import main
+from benchmarks.fake_llm import SCENARIOS, scripted_llm_factory
+from src.utils.llm_config import set_llm_factory
+
+
+@pytest.fixture
+def scripted(db_path, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    set_llm_factory(scripted_llm_factory(SCENARIOS))
+    yield
+    set_llm_factory(None)
+
+
+def _built(model_name):
+    return {
+        key.split("/", 1)[1]
+        for key in main.setup_timings()
+        if key.startswith(f"{model_name}/")
+    }
+
+
+def test_workflow_is_built_once_per_model(scripted):
+    app = main.get_workflow("model-a")
+    assert main.get_workflow("model-a") is app
+    assert main.get_workflow("model-b") is not app
+    assert "model-a" in main.setup_timings()
+
+
+def test_agents_are_built_when_first_routed_to(scripted):
+    scenario = next(s for s in SCENARIOS if s.name == "general_top_products")
+    app = main.get_workflow("model-lazy")
+    assert _built("model-lazy") == set()
+
+    for thread_id in ("lazy-1", "lazy-2"):
+        result = app.invoke(
+            {"messages": [HumanMessage(content=scenario.question)]},
+            {"configurable": {"thread_id": thread_id}},
+            bypass_cache=True,
+        )
+        assert result["messages"][-1].content == scenario.answer
+    assert _built("model-lazy") == {"General_Agent"}
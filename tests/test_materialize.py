@@ -0,0 +1,87 @@
+import shutil
+
+import pytest
+
+from src.utils.materialize import SUMMARY_TABLES, ensure_materialized, install, refresh
+
+
+def _snapshot(conn):
+    """Summary rows with sums rounded (incremental adds reorder float sums)."""
+    return {
+        name: sorted(
+            tuple(round(v, 6) if isinstance(v, float) else v for v in row)
+            for row in conn.execute(f"SELECT * FROM {name}")
+        )
+        for name in SUMMARY_TABLES
+    }
+
+
+@pytest.fixture
+def installed(db_path):
+    install(db_path)
+    return db_path
+
+
+def test_insert_triggers_match_a_full_rebuild(installed, write_conn):
+    user, day = write_conn.execute(
+        "SELECT user_id, created_at FROM orders ORDER BY created_at DESC LIMIT 1"
+    ).fetchone()
+    new_user = write_conn.execute("SELECT MAX(user_id) + 1 FROM orders").fetchone()[0]
+    # Orders of existing and new customers, sessions from a new campaign
+    # (attributing the user's past orders) and from no campaign
+    write_conn.executemany(
+        "INSERT INTO orders (created_at, user_id, price_usd, cogs_usd) "
+        "VALUES (?, ?, ?, ?)",
+        [(day, user, 49.99, 19.49), ("2030-01-01 10:00:00", new_user, 10.5, 4.25)],
+    )
+    write_conn.executemany(
+        "INSERT INTO website_sessions (user_id, utm_campaign, created_at) "
+        "VALUES (?, ?, ?)",
+        [
+            (user, "spring_test", "2030-01-02 09:00:00"),
+            (new_user, None, "2030-01-02 09:30:00"),
+            (new_user, "spring_test", "2030-01-03 11:00:00"),
+        ],
+    )
+    write_conn.execute(
+        "INSERT INTO orders (created_at, user_id, price_usd, cogs_usd) "
+        "VALUES ('2030-01-03 12:00:00', ?, 20.0, 8.0)",
+        (new_user,),
+    )
+    write_conn.commit()
+
+    incremental = _snapshot(write_conn)
+    assert refresh(installed, full=True) == list(SUMMARY_TABLES)
+    assert _snapshot(write_conn) == incremental
+
+
+def test_updates_mark_summaries_for_rebuild(installed, write_conn):
+    write_conn.execute("UPDATE orders SET price_usd = price_usd * 2")
+    write_conn.commit()
+    dirty = {
+        row[0]
+        for row in write_conn.execute("SELECT name FROM summary_state WHERE dirty = 1")
+    }
+    assert dirty == {"user_rfm", "revenue_daily", "campaign_daily"}
+
+    assert refresh(installed) == ["user_rfm", "revenue_daily", "campaign_daily"]
+    revenue = write_conn.execute("SELECT SUM(price_usd) FROM orders").fetchone()[0]
+    summary = write_conn.execute("SELECT SUM(revenue) FROM revenue_daily").fetchone()
+    assert summary[0] == pytest.approx(revenue)
+
+
+def test_shipped_database_has_fresh_summaries(db_path):
+    assert ensure_materialized(db_path) == []
+
+
+def test_ensure_materialized_installs_then_refreshes(bare_db_path):
+    assert set(ensure_materialized(bare_db_path)) == set(SUMMARY_TABLES)
+    assert ensure_materialized(bare_db_path) == []
+
+
+def test_paths_with_uri_characters(bare_db_path, tmp_path):
+    target = tmp_path / "odd?dir#50%" / "shop.db"
+    target.parent.mkdir()
+    shutil.move(bare_db_path, target)
+    assert set(ensure_materialized(str(target))) == set(SUMMARY_TABLES)
+    assert ensure_materialized(str(target)) == []
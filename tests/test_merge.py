@@ -0,0 +1,60 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END
+
+from src.agents.merge import (
+    BRANCH_TASK_PREFIX,
+    after_agent,
+    as_branch_result,
+    branch_input,
+    merge_node,
+)
+from src.states.state import merge_branch_results
+
+BRANCHES = [
+    {"agent": "Segmentation_Agent", "task": "segment customers"},
+    {"agent": "AB_Agent", "task": "compare the ads"},
+]
+
+
+def _result(agent: str, content: str, *visualizations: str):
+    update = {
+        "messages": [AIMessage(content=content)],
+        "visualizations": list(visualizations),
+    }
+    return as_branch_result(agent, update)["branch_results"]
+
+
+def test_branch_input_appends_the_sub_task():
+    state = {"messages": [HumanMessage(content="question")]}
+    messages = branch_input(state, BRANCHES[1])["messages"]
+    assert messages[-1].content == BRANCH_TASK_PREFIX + "compare the ads"
+    assert len(state["messages"]) == 1
+
+
+def test_results_accumulate_until_reset():
+    results = merge_branch_results([], _result("AB_Agent", "a"))
+    results = merge_branch_results(results, _result("General_Agent", "b"))
+    assert [r["agent"] for r in results] == ["AB_Agent", "General_Agent"]
+    assert merge_branch_results(results, None) == []
+
+
+def test_merge_follows_dispatch_order_and_dedupes_visualizations():
+    # Branches finish in any order; AB_Agent reported first here
+    results = _result("AB_Agent", "ad_v2 wins", "lift.png", "shared.png")
+    results += _result("Segmentation_Agent", "4 segments", "shared.png", "rfm.png")
+    update = merge_node({"branches": BRANCHES, "branch_results": results})
+
+    content = update["messages"][0].content
+    assert content.index("### Customer Segmentation") < content.index(
+        "### A/B Test Analysis"
+    )
+    assert update["visualizations"] == ["shared.png", "rfm.png", "lift.png"]
+    assert update["active_agent"] == "Segmentation_Agent"
+    assert update["branches"] == []
+    assert update["branch_results"] is None
+
+
+def test_after_agent_merges_only_parallel_turns():
+    assert after_agent({"branches": BRANCHES}) == "Merge"
+    assert after_agent({"branches": []}) == END
+    assert after_agent({}) == END
@@ -0,0 +1,87 @@
+import pytest
+
+from src.utils.db import get_engine
+from src.utils.result_encoder import (
+    encode_result,
+    encode_rows,
+    format_value,
+    unique_names,
+)
+
+
+@pytest.fixture
+def conn(db_path):
+    with get_engine(db_path).connect() as conn:
+        yield conn
+
+
+def test_format_value_is_compact():
+    assert format_value(None) == ""
+    assert format_value(1.50000) == "1.5"
+    assert format_value(2.0) == "2"
+    assert format_value(-0.00001) == "0"
+    assert format_value(3.14159265, precision=2) == "3.14"
+    assert format_value("a,b") == "a,b"
+
+
+def test_unique_names_avoids_existing_names():
+    assert unique_names(["id", "id", "id"]) == ["id", "id_2", "id_3"]
+    assert unique_names(["id", "id_2", "id"]) == ["id", "id_2", "id_3"]
+
+
+def test_encode_rows_respects_byte_budget():
+    rows = [(i, "x" * 10) for i in range(100)]
+    lines, shown = encode_rows(["n", "text"], rows, max_bytes=100, fmt="csv")
+    assert 0 < shown < 100
+    assert len(lines) == shown + 1
+    assert sum(len(line) + 1 for line in lines) <= 100
+
+
+def test_encode_rows_always_shows_first_row():
+    lines, shown = encode_rows(["text"], [("x" * 500,), ("y",)], max_bytes=10)
+    assert shown == 1
+    assert lines == ["text", "x" * 500]
+
+
+def test_encode_rows_markdown_escapes_pipes():
+    lines, shown = encode_rows(["a"], [("x|y",)], fmt="markdown")
+    assert lines == ["| a |", "|---|", "| x\\|y |"]
+    assert shown == 1
+
+
+def test_small_result_has_no_footer(conn):
+    text = encode_result(conn, "SELECT COUNT(*) AS n FROM orders", fmt="csv")
+    assert text.splitlines()[0] == "n"
+    assert "-- truncated" not in text
+
+
+def test_truncated_result_reports_total_and_summary(conn):
+    total = conn.exec_driver_sql("SELECT COUNT(*) FROM orders").scalar()
+    text = encode_result(
+        conn, "SELECT order_id, price_usd FROM orders", max_rows=5, fmt="csv"
+    )
+    lines = text.splitlines()
+    assert lines[0] == "order_id,price_usd"
+    assert len([line for line in lines if not line.startswith("--")]) == 6
+    assert f"-- truncated: showing 5 of {total} rows" in text
+    assert "-- column summary:" in lines
+    assert any(line.startswith("--   price_usd: min=") for line in lines)
+
+
+def test_duplicate_column_names_stay_distinct(conn):
+    text = encode_result(
+        conn,
+        "SELECT o.user_id, ws.user_id FROM orders o "
+        "JOIN website_sessions ws ON ws.user_id = o.user_id",
+        max_rows=3,
+        fmt="csv",
+    )
+    lines = text.splitlines()
+    assert lines[0] == "user_id,user_id_2"
+    assert any(line.startswith("--   user_id: min=") for line in lines)
+    assert any(line.startswith("--   user_id_2: min=") for line in lines)
+
+
+def test_empty_result(conn):
+    text = encode_result(conn, "SELECT * FROM orders WHERE order_id < 0")
+    assert text == "Query returned no results."
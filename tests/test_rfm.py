@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from sklearn.metrics import silhouette_score
+
+from src.tools.rfm import _run_rfm, load_rfm, scale, segment, silhouette
+from src.utils.materialize import install
+
+
+def _blobs(k: int, per_cluster: int = 150, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(-10, 10, size=(k, 3))
+    X = np.concatenate([c + rng.normal(0, 0.3, (per_cluster, 3)) for c in centers])
+    labels = np.repeat(np.arange(k), per_cluster)
+    return X, labels
+
+
+def _distances(X):
+    return np.linalg.norm(X[:, None, :] - X[None, :, :], axis=-1)
+
+
+@pytest.mark.parametrize("k", [2, 3, 5])
+def test_silhouette_matches_sklearn(k):
+    X, _ = _blobs(k, per_cluster=40)
+    labels = np.random.default_rng(k).integers(0, k, len(X))
+    assert silhouette(_distances(X), labels, k) == pytest.approx(
+        silhouette_score(X, labels), abs=1e-9
+    )
+
+
+def test_silhouette_counts_singletons_as_zero():
+    X = np.array([[0.0, 0, 0], [0.1, 0, 0], [5.0, 0, 0]])
+    labels = np.array([0, 0, 1])
+    assert silhouette(_distances(X), labels, 2) == pytest.approx(
+        silhouette_score(X, labels)
+    )
+
+
+@pytest.mark.parametrize("k", [3, 4])
+def test_segment_finds_the_number_of_blobs(k):
+    X, truth = _blobs(k)
+    labels, scores = segment(X, min_k=2, max_k=6)
+    assert max(scores, key=scores.get) == k
+    assert int(labels.max()) + 1 == k
+    # Same partition up to label names
+    pairs = set(zip(truth.tolist(), labels.tolist()))
+    assert len(pairs) == k
+
+
+def test_scale_standardizes_and_keeps_constant_columns_at_zero():
+    values = np.array([[1.0, 1, 5], [3.0, 1, 50], [5.0, 1, 500]])
+    X = scale(values)
+    assert np.allclose(X.mean(axis=0), 0)
+    assert np.allclose(X[:, 1], 0)
+    assert np.allclose(X[:, [0, 2]].std(axis=0), 1)
+
+
+def test_summary_and_orders_give_the_same_features(bare_db_path):
+    ids, values, source = load_rfm(bare_db_path)
+    assert source == "orders"
+    install(bare_db_path)
+    summary_ids, summary_values, source = load_rfm(bare_db_path)
+    assert source == "user_rfm"
+    order = np.argsort(ids)
+    summary_order = np.argsort(summary_ids)
+    assert np.array_equal(ids[order], summary_ids[summary_order])
+    assert np.allclose(values[order], summary_values[summary_order])
+
+
+def test_run_rfm_reports_segments(db_path):
+    output = _run_rfm(db_path, keep_frame=False)
+    assert output.startswith("RFM segments of ")
+    assert "(from user_rfm, k=" in output
+    assert "segment,customers,share" in output
+
+
+def test_run_rfm_falls_back_to_orders(bare_db_path):
+    assert "(from orders, k=" in _run_rfm(bare_db_path, keep_frame=False)
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from src.agents.router import (
+    MIN_TRAINING_EXAMPLES,
+    FastPathRouter,
+    compound_agents,
+    looks_like_follow_up,
+)
+
+
+@pytest.fixture
+def router(tmp_path):
+    return FastPathRouter(log_path=tmp_path / "routing.jsonl")
+
+
+@pytest.mark.parametrize(
+    "question, agent",
+    [
+        (
+            "Is the conversion difference between ad_v1 and ad_v2 significant?",
+            "AB_Agent",
+        ),
+        ("Segment customers with RFM clustering", "Segmentation_Agent"),
+        ("What is the monthly revenue trend?", "General_Agent"),
+    ],
+)
+def test_clear_questions_take_the_fast_path(router, question, agent):
+    assert router.route(question)[0] == agent
+
+
+def test_compound_question_falls_back_to_llm(router):
+    question = "Segment customers and test which ad_v1 variant converts better"
+    assert len(compound_agents(question)) > 1
+    assert router.route(question) is None
+
+
+def test_unmatched_question_falls_back_to_llm(router):
+    assert router.route("hello there") is None
+
+
+@pytest.mark.parametrize("question", ["and for mobile?", "plot that", "why?"])
+def test_follow_ups_stay_with_the_active_agent(router, question):
+    agent, reason = router.route(question, active_agent="AB_Agent")
+    assert agent == "AB_Agent"
+    assert reason.startswith("Follow-up")
+
+
+def test_clear_change_of_intent_leaves_the_active_agent(router):
+    agent, _ = router.route("please segment customers", active_agent="AB_Agent")
+    assert agent == "Segmentation_Agent"
+
+
+def test_follow_up_must_open_the_question():
+    assert looks_like_follow_up("And by device?")
+    assert not looks_like_follow_up("Revenue by device and month")
+
+
+def test_stats_count_each_decision(router):
+    router.route("Segment customers with RFM clustering")
+    router.route("plot that", active_agent="General_Agent")
+    router.route("hello there")
+    stats = router.stats()
+    assert (stats["fast_path"], stats["sticky"], stats["llm_fallback"]) == (1, 1, 1)
+    assert stats["avg_route_us"] > 0
+
+
+def test_model_is_trained_from_logged_decisions(router):
+    for i in range(MIN_TRAINING_EXAMPLES // 2):
+        router.record(f"how did campaign wave {i} do", "AB_Agent")
+        router.record(f"who are our loyal buyers group {i}", "Segmentation_Agent")
+    deadline = time.monotonic() + 30
+    while router.stats()["model_trained_on"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert router.stats()["model_trained_on"] >= MIN_TRAINING_EXAMPLES
+    agent, _, source = router.classify("who are our loyal buyers")
+    assert (agent, source) == ("Segmentation_Agent", "model")
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "What's the weather going to do to our sales?",
+        "Write a poem about conversion rates",
+        "Any tips to boost sales?",
+        "How is revenue recognized in accounting?",
+        "What is a conversion funnel?",
+    ],
+)
+def test_out_of_scope_questions_go_to_the_supervisor(router, question):
+    assert router.route(question) is None
+
+
+def test_out_of_scope_follow_ups_are_not_sticky(router):
+    assert router.route("and tell me a joke", active_agent="General_Agent") is None
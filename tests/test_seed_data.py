@@ -0,0 +1,128 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+import seed_data
+from seed_data import (
+    AD_V1_SESSIONS,
+    AD_V2_SESSIONS,
+    NUM_CASUAL_USERS,
+    NUM_REGULAR_USERS,
+    NUM_WHALE_USERS,
+    create_database,
+    seed_products,
+    seed_scaled,
+)
+
+SCALE = 3
+
+
+def _seed(path, seed=7, workers=1):
+    conn = create_database(str(path))
+    seed_products(conn)
+    seed_scaled(conn, SCALE, seed=seed, workers=workers)
+    return conn
+
+
+def _digest(conn) -> str:
+    digest = hashlib.sha256()
+    for table in ("website_sessions", "orders", "order_items"):
+        for row in conn.execute(f"SELECT * FROM {table} ORDER BY rowid"):
+            digest.update(repr(row).encode())
+    return digest.hexdigest()
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Several tasks per kind, so chunk boundaries are exercised
+    monkeypatch.setattr(seed_data, "CHUNK_ROWS", 1000)
+
+
+@pytest.fixture
+def scaled(tmp_path, small_chunks):
+    conn = _seed(tmp_path / "scaled.db")
+    yield conn
+    conn.close()
+
+
+def test_plan_only_depends_on_scale(small_chunks):
+    tasks = seed_data._plan_tasks(SCALE)
+    assert tasks == seed_data._plan_tasks(SCALE)
+    sessions = [t for t in tasks if t[0] == "sessions"]
+    assert sum(t[3] for t in sessions) == (AD_V1_SESSIONS + AD_V2_SESSIONS) * SCALE
+    assert max(t[3] for t in sessions) <= 1000
+    users = sum(t[3] for t in tasks if t[0] == "orders")
+    assert users == (NUM_WHALE_USERS + NUM_REGULAR_USERS + NUM_CASUAL_USERS) * SCALE
+
+
+def test_ad_v1_conversions_skip_segmented_users():
+    _, ((_, user_ids, _, _), _) = seed_data._generate_chunk(
+        ("conversions", "Ad_V1", SCALE, 0), np.random.SeedSequence(0)
+    )
+    segmented = (NUM_WHALE_USERS + NUM_REGULAR_USERS) * SCALE
+    assert user_ids
+    assert all(segmented < user <= seed_data.AB_POOL_USERS * SCALE for user in user_ids)
+    assert len(user_ids) < AD_V1_SESSIONS * SCALE * seed_data.AD_V1_CONVERSION_RATE
+
+
+def test_generate_chunk_is_deterministic():
+    task = ("orders", "whale", 1, 20)
+    a = seed_data._generate_chunk(task, np.random.SeedSequence(1))
+    b = seed_data._generate_chunk(task, np.random.SeedSequence(1))
+    c = seed_data._generate_chunk(task, np.random.SeedSequence(2))
+    assert a == b
+    assert a != c
+
+
+def test_volumes_scale(scaled):
+    sessions = scaled.execute("SELECT COUNT(*) FROM website_sessions").fetchone()[0]
+    assert sessions == (AD_V1_SESSIONS + AD_V2_SESSIONS) * SCALE
+    # Order ids are contiguous across chunks and every item has its order
+    count, max_id = scaled.execute(
+        "SELECT COUNT(*), MAX(order_id) FROM orders"
+    ).fetchone()
+    assert count == max_id
+    orphans = scaled.execute(
+        "SELECT COUNT(*) FROM order_items oi "
+        "LEFT JOIN orders o ON o.order_id = oi.order_id WHERE o.order_id IS NULL"
+    ).fetchone()[0]
+    assert orphans == 0
+
+
+def test_planted_patterns_survive_scaling(scaled):
+    # Ad_V2 users (the second pool) only order through A/B conversions
+    pool = seed_data.AB_POOL_USERS * SCALE
+    sessions, converted = scaled.execute(
+        "SELECT COUNT(*), (SELECT COUNT(*) FROM orders WHERE user_id > ?) "
+        "FROM website_sessions WHERE utm_campaign = 'Ad_V2'",
+        (pool,),
+    ).fetchone()
+    assert converted / sessions == pytest.approx(seed_data.AD_V2_CONVERSION_RATE)
+
+    whales = NUM_WHALE_USERS * SCALE
+    regulars = whales + NUM_REGULAR_USERS * SCALE
+    casuals = regulars + NUM_CASUAL_USERS * SCALE
+    segment = (
+        "SELECT COUNT(*) * 1.0 / COUNT(DISTINCT user_id), AVG(price_usd) "
+        "FROM orders WHERE user_id BETWEEN ? AND ?"
+    )
+    whale = scaled.execute(segment, (1, whales)).fetchone()
+    regular = scaled.execute(segment, (whales + 1, regulars)).fetchone()
+    casual = scaled.execute(segment, (regulars + 1, casuals)).fetchone()
+    assert whale[0] > regular[0] > casual[0]
+    assert whale[1] > regular[1] > casual[1]
+
+
+def test_same_seed_same_data_with_any_worker_count(tmp_path, scaled):
+    expected = _digest(scaled)
+    conn = _seed(tmp_path / "parallel.db", workers=2)
+    try:
+        assert _digest(conn) == expected
+    finally:
+        conn.close()
+    conn = _seed(tmp_path / "other.db", seed=8)
+    try:
+        assert _digest(conn) != expected
+    finally:
+        conn.close()
@@ -0,0 +1,51 @@
+from src.tools.analysis_tools import _run_sql
+from src.utils.sql_cache import SQLResultCache, get_data_version, normalize_sql
+
+
+def test_normalize_sql_ignores_case_whitespace_and_comments():
+    a = normalize_sql("SELECT  COUNT(*)\nFROM orders -- all orders\n;")
+    b = normalize_sql("select count(*) /* total */ from ORDERS")
+    assert a == b == "select count(*) from orders"
+
+
+def test_normalize_sql_keeps_string_literals():
+    assert normalize_sql("SELECT 'A  B'") != normalize_sql("SELECT 'a b'")
+
+
+def test_data_version_changes_on_write(db_path, write_conn):
+    before = get_data_version(db_path)
+    assert get_data_version(db_path) == before
+    write_conn.execute("UPDATE products SET product_name = 'Renamed'")
+    write_conn.commit()
+    assert get_data_version(db_path) != before
+
+
+def test_stale_entry_is_invalidated():
+    cache = SQLResultCache()
+    key = cache.make_key("SELECT 1", "x.db")
+    cache.put(key, (1,), "result")
+    assert cache.get(key, (1,)) == "result"
+    assert cache.get(key, (2,)) is None
+    assert cache.get(key, (1,)) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_lru_eviction_respects_byte_budget():
+    cache = SQLResultCache(max_bytes=60)
+    for i in range(3):
+        cache.put(cache.make_key(f"SELECT {i}", "x.db"), (0,), "v" * 20)
+    assert cache.get(cache.make_key("SELECT 0", "x.db"), (0,)) is None
+    assert cache.get(cache.make_key("SELECT 2", "x.db"), (0,)) == "v" * 20
+    assert cache.stats()["bytes"] <= 60
+
+
+def test_sql_tool_sees_new_rows_after_write(db_path, write_conn):
+    query = "SELECT COUNT(*) AS n FROM products"
+    first = _run_sql(query, db_path)
+    assert _run_sql(query, db_path) == first
+    write_conn.execute(
+        "INSERT INTO products (product_id, created_at, product_name) "
+        "VALUES (99, '2024-01-01', 'New')"
+    )
+    write_conn.commit()
+    assert _run_sql(query, db_path) != first
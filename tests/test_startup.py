@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+from benchmarks.bench_startup import (
+    DEFERRED_MODULES,
+    REPO_ROOT,
+    _child_env,
+    parse_importtime,
+)
+
+
+def test_importing_main_defers_heavy_modules():
+    probe = (
+        "import sys, main; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=REPO_ROOT,
+        env=_child_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert completed.stdout.strip() == ""
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   src.utils.db\n"
+        "import time:       300 |        420 | main\n"
+        "unrelated line\n"
+    )
+    assert parse_importtime(stderr) == [
+        (1, 120, 120, "src.utils.db"),
+        (0, 300, 420, "main"),
+    ]
@@ -0,0 +1,184 @@
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+
+from src.agents.merge import PARALLEL
+from src.utils.streaming import STREAM_MODES, stream_events
+
+
+class FakeGraph:
+    """Replays a fixed (namespace, mode, chunk) stream."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.kwargs = None
+
+    def stream(self, input, config=None, **kwargs):
+        self.kwargs = kwargs
+        yield from self.chunks
+
+
+AGENT_NS = ("General_Agent:1234",)
+TOOL_CALL = {"name": "sql_tool", "args": {"query": "SELECT 1"}, "id": "call_1"}
+PLOT = "plots/plot_1.png"
+
+
+def _agent_run():
+    return [
+        (
+            (),
+            "updates",
+            {
+                "Supervisor": {
+                    "next": "General_Agent",
+                    "messages": [AIMessage(content="Routing to General_Agent")],
+                }
+            },
+        ),
+        (
+            AGENT_NS,
+            "messages",
+            (AIMessageChunk(content="Let me "), {"langgraph_node": "agent"}),
+        ),
+        (
+            AGENT_NS,
+            "messages",
+            (AIMessageChunk(content="check."), {"langgraph_node": "agent"}),
+        ),
+        # Tool output streamed as a message is not a token
+        (
+            AGENT_NS,
+            "messages",
+            (
+                ToolMessage(content="1", tool_call_id="call_1"),
+                {"langgraph_node": "tools"},
+            ),
+        ),
+        (
+            AGENT_NS,
+            "updates",
+            {"agent": {"messages": [AIMessage(content="", tool_calls=[TOOL_CALL])]}},
+        ),
+        (
+            AGENT_NS,
+            "updates",
+            {
+                "tools": {
+                    "messages": [
+                        ToolMessage(
+                            content="[image saved: plots/plot_1.png]",
+                            name="python_tool",
+                            tool_call_id="call_1",
+                            artifact=[{"kind": "image", "value": PLOT}],
+                        )
+                    ]
+                }
+            },
+        ),
+        (
+            (),
+            "updates",
+            {
+                "General_Agent": {
+                    "messages": [AIMessage(content="Revenue grew.")],
+                    "active_agent": "General_Agent",
+                    "visualizations": [PLOT],
+                }
+            },
+        ),
+    ]
+
+
+def test_stream_events_kinds_in_order():
+    graph = FakeGraph(_agent_run())
+    events = list(
+        stream_events(graph, {"messages": [HumanMessage(content="Revenue trend?")]})
+    )
+
+    assert graph.kwargs == {"stream_mode": STREAM_MODES, "subgraphs": True}
+    assert [e.kind for e in events] == [
+        "route",
+        "token",
+        "token",
+        "tool_call",
+        "tool_result",
+        "plot",
+        "answer",
+    ]
+    route, token, _, call, result, plot, answer = events
+    assert route.agent == "General_Agent"
+    assert route.data == "Routing to General_Agent"
+    assert token.agent == "General_Agent" and token.data == "Let me "
+    assert call.data["name"] == "sql_tool"
+    assert call.data["args"] == TOOL_CALL["args"]
+    assert result.data == {
+        "name": "python_tool",
+        "content": "[image saved: plots/plot_1.png]",
+    }
+    # The plot is reported once, though the final update lists it again
+    assert plot.data == PLOT
+    assert answer.agent == "General_Agent"
+    assert answer.data == {"content": "Revenue grew.", "visualizations": [PLOT]}
+
+    elapsed = [e.elapsed for e in events]
+    assert elapsed == sorted(elapsed)
+
+
+def test_supervisor_finish_is_the_answer():
+    graph = FakeGraph(
+        [
+            (
+                (),
+                "updates",
+                {
+                    "Supervisor": {
+                        "next": "FINISH",
+                        "messages": [
+                            AIMessage(content="I can only answer data questions.")
+                        ],
+                    }
+                },
+            )
+        ]
+    )
+    events = list(stream_events(graph, {"messages": []}))
+    assert [(e.kind, e.agent) for e in events] == [("answer", "Supervisor")]
+    assert events[0].data == {
+        "content": "I can only answer data questions.",
+        "visualizations": [],
+    }
+
+
+def test_parallel_route_names_every_branch():
+    graph = FakeGraph(
+        [
+            (
+                (),
+                "updates",
+                {
+                    "Supervisor": {
+                        "next": PARALLEL,
+                        "branches": [
+                            {"agent": "AB_Agent"},
+                            {"agent": "Segmentation_Agent"},
+                        ],
+                        "messages": [AIMessage(content="Splitting the question")],
+                    }
+                },
+            ),
+            (
+                (),
+                "updates",
+                {
+                    "AB_Agent": {
+                        "branch_results": [
+                            {"agent": "AB_Agent", "visualizations": [PLOT]}
+                        ]
+                    }
+                },
+            ),
+        ]
+    )
+    events = list(stream_events(graph, {"messages": []}))
+    assert [(e.kind, e.agent, e.data) for e in events] == [
+        ("route", "AB_Agent, Segmentation_Agent", "Splitting the question"),
+        ("plot", "AB_Agent", PLOT),
+    ]
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+from langgraph.graph import START, MessagesState, StateGraph
+
+from src.tools.tool_node import TOOL_CONCURRENCY, ConcurrentToolNode
+
+
+class Recorder:
+    """Fake python_tool/sql_tool recording run order and peak concurrency."""
+
+    def __init__(self):
+        self.order = []
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _enter(self, name):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.order.append(name)
+
+    def _exit(self):
+        with self._lock:
+            self.running -= 1
+
+    def tools(self):
+        def python_tool(code: str, delay: float) -> str:
+            """Run Python code."""
+            self._enter(code)
+            time.sleep(delay)
+            self._exit()
+            return code
+
+        async def apython_tool(code: str, delay: float) -> str:
+            self._enter(code)
+            await asyncio.sleep(delay)
+            self._exit()
+            return code
+
+        def sql_tool(query: str) -> str:
+            """Run a SQL query."""
+            self._enter(query)
+            time.sleep(0.2)
+            self._exit()
+            return query
+
+        async def asql_tool(query: str) -> str:
+            self._enter(query)
+            await asyncio.sleep(0.2)
+            self._exit()
+            return query
+
+        return [
+            StructuredTool.from_function(
+                func=python_tool, coroutine=apython_tool, name="python_tool"
+            ),
+            StructuredTool.from_function(
+                func=sql_tool, coroutine=asql_tool, name="sql_tool"
+            ),
+        ]
+
+
+def _graph(recorder):
+    """The node needs a graph runtime, so run it as a one-node graph."""
+    builder = StateGraph(MessagesState)
+    builder.add_node("tools", ConcurrentToolNode(recorder.tools()))
+    builder.add_edge(START, "tools")
+    return builder.compile()
+
+
+def _calls():
+    # Earlier python_tool calls take longer: unordered they would finish last
+    calls = [
+        ("python_tool", {"code": "py1", "delay": 0.3}),
+        ("sql_tool", {"query": "q1"}),
+        ("python_tool", {"code": "py2", "delay": 0.1}),
+        ("sql_tool", {"query": "q2"}),
+        ("python_tool", {"code": "py3", "delay": 0.0}),
+        ("sql_tool", {"query": "q3"}),
+    ]
+    tool_calls = [
+        {"name": name, "args": args, "id": f"call_{i}", "type": "tool_call"}
+        for i, (name, args) in enumerate(calls)
+    ]
+    return {"messages": [AIMessage(content="", tool_calls=tool_calls)]}
+
+
+def _check(recorder, result, elapsed):
+    messages = result["messages"][1:]
+    assert [m.tool_call_id for m in messages] == [f"call_{i}" for i in range(6)]
+    assert [m.content for m in messages] == ["py1", "q1", "py2", "q2", "py3", "q3"]
+    started = [name for name in recorder.order if name.startswith("py")]
+    assert started == ["py1", "py2", "py3"]
+    assert 1 < recorder.peak <= TOOL_CONCURRENCY
+    # Serial: 0.4s of python_tool; the SQL calls overlap with it
+    assert elapsed < 0.4 + 3 * 0.2
+
+
+def test_sync_calls_are_ordered_and_concurrent():
+    recorder = Recorder()
+    node = _graph(recorder)
+    start = time.perf_counter()
+    result = node.invoke(_calls())
+    _check(recorder, result, time.perf_counter() - start)
+
+
+def test_async_calls_are_ordered_and_concurrent():
+    recorder = Recorder()
+    node = _graph(recorder)
+    start = time.perf_counter()
+    result = asyncio.run(node.ainvoke(_calls()))
+    _check(recorder, result, time.perf_counter() - start)
+
+
+def test_concurrency_is_bounded(monkeypatch):
+    monkeypatch.setattr("src.tools.tool_node.TOOL_CONCURRENCY", 2)
+    recorder = Recorder()
+    node = _graph(recorder)
+    tool_calls = [
+        {
+            "name": "sql_tool",
+            "args": {"query": f"q{i}"},
+            "id": f"c{i}",
+            "type": "tool_call",
+        }
+        for i in range(5)
+    ]
+    node.invoke({"messages": [AIMessage(content="", tool_calls=tool_calls)]})
+    assert recorder.peak == 2
+    recorder.peak = 0
+    asyncio.run(
+        node.ainvoke({"messages": [AIMessage(content="", tool_calls=tool_calls)]})
+    )
+    assert recorder.peak == 2
@@ -0,0 +1,156 @@
+import io
+import json
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from src.utils.tracing import Tracer, annotate
+
+
+def _run_turn(tracer, thread_id, rows=3, fail_tool=False):
+    """Replay the callbacks of one turn: node -> LLM call -> tool call."""
+    metadata = {"thread_id": thread_id, "langgraph_node": "General_Agent"}
+    root, node, llm, tool = uuid4(), uuid4(), uuid4(), uuid4()
+    tracer.on_chain_start({}, {}, run_id=root, name="LangGraph", metadata={})
+    tracer.on_chain_start(
+        {}, {}, run_id=node, parent_run_id=root, name="General_Agent", metadata=metadata
+    )
+    tracer.on_chat_model_start(
+        {},
+        [[HumanMessage(content="Top products?")]],
+        run_id=llm,
+        parent_run_id=node,
+        invocation_params={"model": "gemini-test"},
+        metadata=metadata,
+    )
+    reply = AIMessage(
+        content="",
+        usage_metadata={"input_tokens": 100, "output_tokens": 20, "total_tokens": 120},
+    )
+    tracer.on_llm_end(
+        LLMResult(generations=[[ChatGeneration(message=reply)]]), run_id=llm
+    )
+    tracer.on_tool_start(
+        {},
+        "SELECT 1",
+        run_id=tool,
+        parent_run_id=node,
+        name="sql_tool",
+        metadata=metadata,
+    )
+    if fail_tool:
+        tracer.on_tool_error(ValueError("bad query"), run_id=tool)
+    else:
+        annotate(rows=rows)
+        tracer.on_tool_end("a,b\n1,2", run_id=tool)
+    tracer.on_chain_end({}, run_id=node)
+    tracer.on_chain_end({}, run_id=root)
+
+
+def test_spans_carry_measurements():
+    tracer = Tracer()
+    _run_turn(tracer, "t1")
+    spans = {span["kind"]: span for span in tracer.spans("t1")}
+    assert spans["node"]["name"] == "General_Agent"
+    assert spans["node"]["iterations"] == 1
+    assert spans["llm"]["name"] == "gemini-test"
+    assert spans["llm"]["node"] == "General_Agent"
+    assert (spans["llm"]["tokens_in"], spans["llm"]["tokens_out"]) == (100, 20)
+    assert spans["llm"]["tokens_estimated"] is False
+    assert spans["tool"]["rows"] == 3
+    assert spans["tool"]["bytes"] == len("a,b\n1,2")
+    assert len({span["run"] for span in spans.values()}) == 1
+
+
+def test_annotate_outside_a_tool_is_ignored():
+    annotate(rows=5)  # must not raise
+
+
+def test_breakdown_aggregates_the_last_run():
+    tracer = Tracer()
+    _run_turn(tracer, "t1", rows=3)
+    _run_turn(tracer, "t1", rows=7)
+    _run_turn(tracer, "t2", rows=100)
+
+    rows = {row["name"]: row for row in tracer.breakdown("t1")}
+    assert set(rows) == {"General_Agent", "gemini-test", "sql_tool"}
+    assert rows["sql_tool"]["calls"] == 1
+    assert rows["sql_tool"]["rows"] == 7
+
+    everything = {row["name"]: row for row in tracer.breakdown("t1", last_run=False)}
+    assert everything["sql_tool"]["calls"] == 2
+    assert everything["sql_tool"]["rows"] == 10
+    assert everything["gemini-test"]["tokens_in"] == 200
+    totals = [row["total_ms"] for row in tracer.breakdown("t1", last_run=False)]
+    assert totals == sorted(totals, reverse=True)
+
+
+def test_export_jsonl_filters_by_thread(tmp_path):
+    tracer = Tracer()
+    _run_turn(tracer, "t1")
+    _run_turn(tracer, "t2")
+    stream = io.StringIO()
+    assert tracer.export_jsonl(stream, thread_id="t2") == 3
+    spans = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert {span["thread_id"] for span in spans} == {"t2"}
+
+    path = tmp_path / "spans.jsonl"
+    tracer.export_jsonl(str(path))
+    tracer.export_jsonl(str(path))
+    assert len(path.read_text().splitlines()) == 12
+
+
+def test_prometheus_export():
+    tracer = Tracer()
+    _run_turn(tracer, "t1", rows=4)
+    _run_turn(tracer, "t1", fail_tool=True)
+    text = tracer.prometheus()
+    tool = 'kind="tool",name="sql_tool"'
+    assert "# TYPE agent_span_duration_seconds histogram" in text
+    assert f'agent_span_duration_seconds_bucket{{{tool},le="+Inf"}} 2' in text
+    assert f"agent_span_duration_seconds_count{{{tool}}} 2" in text
+    assert f"agent_span_errors_total{{{tool}}} 1" in text
+    assert f"agent_tool_rows_total{{{tool}}} 4" in text
+    assert 'agent_llm_input_tokens_total{kind="llm",name="gemini-test"} 200' in text
+    assert 'agent_react_iterations_total{kind="node",name="General_Agent"} 2' in text
+
+
+def test_ring_buffer_drops_oldest_spans():
+    tracer = Tracer(buffer_size=4)
+    _run_turn(tracer, "t1")
+    _run_turn(tracer, "t2")
+    assert [span["thread_id"] for span in tracer.spans()] == ["t1", "t2", "t2", "t2"]
+    # Cumulative metrics are kept for dropped spans
+    assert 'agent_span_duration_seconds_count{kind="tool",name="sql_tool"} 2' in (
+        tracer.prometheus()
+    )
+
+
+@pytest.fixture
+def workdir(db_path, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_workflow_run_is_traced(workdir):
+    from benchmarks.fake_llm import SCENARIOS, scripted_llm_factory
+    from main import create_workflow
+    from src.utils.llm_config import set_llm_factory
+
+    scenario = next(s for s in SCENARIOS if s.name == "general_top_products")
+    tracer = Tracer()
+    set_llm_factory(scripted_llm_factory(SCENARIOS))
+    try:
+        create_workflow().invoke(
+            {"messages": [HumanMessage(content=scenario.question)]},
+            {"configurable": {"thread_id": "traced"}, "callbacks": [tracer]},
+        )
+    finally:
+        set_llm_factory(None)
+
+    rows = {(row["kind"], row["name"]): row for row in tracer.breakdown("traced")}
+    assert ("node", "General_Agent") in rows
+    assert rows[("tool", "sql_tool")]["rows"] == 4
+    assert rows[("node", "General_Agent/agent")]["iterations"] == 2
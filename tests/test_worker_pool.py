@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from src.tools.frame_store import get_frame_store
+from src.tools.worker_pool import WorkerPool
+
+
+@pytest.fixture(scope="module")
+def pool():
+    # Read by the worker processes when they import the module
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("PYTHON_MAX_NAMESPACES", "2")
+        pool = WorkerPool(size=1, timeout=5)
+        pool.start()
+        pool.run("pass", "warm-up")
+    yield pool
+    pool.shutdown()
+
+
+def test_local_namespaces_persist_per_thread():
+    pool = WorkerPool(size=0)
+    pool.run("x = 41", "a")
+    assert pool.run("print(x + 1)", "a")[0].strip() == "42"
+    assert "NameError" in pool.run("print(x)", "b")[0]
+    pool.drop_namespace("a")
+    assert "NameError" in pool.run("print(x)", "a")[0]
+
+
+def test_frames_are_reshipped_after_eviction(pool):
+    handle = get_frame_store().put(pd.DataFrame({"v": [1, 2, 3]}), "t1")
+    code = f"print(load_frame('{handle}')['v'].sum())"
+    assert pool.run(code, "t1")[0].strip() == "6"
+
+    # Two more namespaces push t1 out of the worker (PYTHON_MAX_NAMESPACES=2)
+    pool.run("pass", "t2")
+    pool.run("pass", "t3")
+    worker = pool._workers[0]
+    assert "t1" not in pool._assignments
+    assert not any(tid == "t1" for tid, _ in worker.frames_sent)
+
+    assert pool.run(code, "t1")[0].strip() == "6"
+
+
+def test_drop_namespace_is_sent_with_next_request(pool):
+    pool.run("y = 1", "gone")
+    worker = pool._workers[0]
+    pool.drop_namespace("gone")
+    assert "gone" in worker.pending_drops
+    assert "gone" not in pool._assignments
+
+    namespaces = pool.stats()["workers"][0]["namespaces"]
+    assert "gone" not in namespaces
+    assert not worker.pending_drops
+
+
+def test_timeout_restarts_worker(pool):
+    with pytest.raises(TimeoutError):
+        pool.run("import time; time.sleep(30)", "slow")
+    assert pool.run("print('alive')", "slow")[0].strip() == "alive"
+
+
+def test_frames_survive_a_restart_by_another_thread(pool):
+    handle = get_frame_store().put(pd.DataFrame({"v": [4, 5]}), "keeper")
+    code = f"print(load_frame('{handle}')['v'].sum())"
+    assert pool.run(code, "keeper")[0].strip() == "9"
+    with pytest.raises(TimeoutError):
+        pool.run("import time; time.sleep(30)", "other")
+    assert pool.run(code, "keeper")[0].strip() == "9"
+
+
+def test_drops_queued_during_requests_are_not_lost(pool):
+    pool.run("x = 1", "victim")
+    runner = threading.Thread(
+        target=lambda: [pool.run("pass", "runner") for _ in range(20)]
+    )
+    runner.start()
+    pool.drop_namespace("victim")
+    runner.join()
+    assert "victim" not in pool.stats()["workers"][0]["namespaces"]
+    assert not pool._workers[0].pending_drops
+
+
+def test_shutdown_during_an_evicting_request_does_not_deadlock(pool):
+    pool.run("pass", "fill-1")
+    pool.run("pass", "fill-2")
+    # A new namespace evicts one; the reply arrives while shutdown is waiting
+    runner = threading.Thread(
+        target=pool.run, args=("import time; time.sleep(0.5)", "evicting")
+    )
+    runner.start()
+    time.sleep(0.2)
+    stopper = threading.Thread(target=pool.shutdown)
+    stopper.start()
+    stopper.join(timeout=10)
+    runner.join(timeout=10)
+    assert not stopper.is_alive() and not runner.is_alive()